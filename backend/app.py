@@ -2,33 +2,50 @@
 # This is the main Flask application for the network documentation backend.
 # It initializes the app, database, and registers the API routes.
 
+import time
+_IMPORT_STARTED = time.perf_counter() # Cold-start timing, logged once the module-level app exists
+
 import os
+import logging
 from flask import Flask
 from flask_cors import CORS # For handling Cross-Origin Resource Sharing
 
 # Import initialized extensions
-from .extensions import db, migrate
+from .extensions import db
 
 # Import models to ensure they are registered with SQLAlchemy
-from .models import Location, Rack, PC, PatchPanel, Switch, Connection, ConnectionHop, PdfTemplate, AppSettings
+from .models import Location, Rack, PC, PatchPanel, Switch, Connection, ConnectionHop, PdfTemplate, AppSettings, TableVersion
+
+# Table generation counters and the shared response cache
+from .versioning import init_versioning
+from .cache import init_cache
+from .instrumentation import init_instrumentation
+from .metrics import init_metrics
+from .profiling import init_profiling
+from .labels import init_labels
+from .hot_backup import init_hot_backups
+
+# 'flask' commands (db, bench, loadtest), imported on first use
+from .cli import register_commands
 
 # Import the function to register routes
 from .routes import register_routes
 
-# --- Debugging Start ---
-print("--- app.py: Starting Flask app initialization ---")
-# --- Debugging End ---
-
-def create_app():
+def create_app(test_config=None):
     """
     Factory function to create and configure the Flask application.
+    :param test_config: Optional dictionary of config values applied over the defaults
+                        before the extensions are initialized (used by 'flask bench').
     """
+    started = time.perf_counter()
     app = Flask(__name__)
     CORS(app) # Enable CORS for all routes
 
-    # --- Debugging Start ---
-    print("--- app.py: CORS initialized ---")
-    # --- Debugging End ---
+    # Under gunicorn, send app.logger output to gunicorn's error log at its level
+    gunicorn_logger = logging.getLogger('gunicorn.error')
+    if gunicorn_logger.handlers:
+        app.logger.handlers = gunicorn_logger.handlers
+        app.logger.setLevel(gunicorn_logger.level)
 
     # Database configuration
     # Using SQLite for simplicity. The database file will be stored in the 'instance' folder.
@@ -43,39 +60,90 @@ def create_app():
     app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER_PATH
     app.config['ALLOWED_EXTENSIONS'] = ALLOWED_EXTENSIONS_SET
     app.config['MAX_PDF_FILES'] = MAX_PDF_FILES_LIMIT
-
-    # --- Debugging Start ---
-    print(f"--- app.py: App config set. UPLOAD_FOLDER: {app.config['UPLOAD_FOLDER']}, MAX_PDF_FILES: {app.config['MAX_PDF_FILES']} ---")
-    # --- Debugging End ---
-
-    # Ensure the upload folder exists
-    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-
-    # --- Debugging Start ---
-    print(f"--- app.py: Upload folder checked/created: {app.config['UPLOAD_FOLDER']} ---")
-    # --- Debugging End ---
-
-    # Initialize extensions with the app
+    app.config['MAX_PDF_SIZE'] = 20 * 1024 * 1024 # Bytes per uploaded template
+    app.config['PDF_BLOB_FOLDER'] = os.path.join(UPLOAD_FOLDER_PATH, 'blobs') # Content-addressed files, see utils.blob_path
+    # Internal nginx location mapped to UPLOAD_FOLDER; when set, downloads are answered with
+    # X-Accel-Redirect instead of being streamed by a gunicorn worker (see nginx.conf)
+    app.config['PDF_ACCEL_REDIRECT_PREFIX'] = os.environ.get('PDF_ACCEL_REDIRECT_PREFIX')
+    app.config['PDF_CACHE_MAX_AGE'] = 365 * 24 * 3600 # Content-addressed downloads never change
+
+    # Server-side label printing (see labels.py)
+    app.config['LABEL_RENDER_PROCESSES'] = int(os.environ.get('LABEL_RENDER_PROCESSES', min(os.cpu_count() or 1, 4)))
+    app.config['LABEL_RENDER_CHUNK'] = 50 # Labels per pool task; smaller jobs are rendered in the request's process
+    app.config['LABEL_MAX_PER_REQUEST'] = 5000
+    app.config['LABEL_CACHE_PATH'] = os.path.join(app.instance_path, 'label_cache.db')
+    app.config['LABEL_CACHE_MAX_BYTES'] = 256 * 1024 * 1024
+
+    # NDJSON bulk import (see bulk_import.py)
+    app.config['BULK_IMPORT_BATCH_SIZE'] = int(os.environ.get('BULK_IMPORT_BATCH_SIZE', '2000')) # Records per transaction
+
+    # Link-state ingestion for monitoring (see port_status.py)
+    app.config['PORT_STATUS_FLUSH_INTERVAL'] = float(os.environ.get('PORT_STATUS_FLUSH_INTERVAL', '2')) # Seconds between bulk updates
+    app.config['PORT_STATUS_MAX_PENDING'] = 20000 # Buffered ports that trigger an early flush
+    app.config['PORT_STATUS_MAX_BATCH'] = 10000 # Updates per request
+    app.config['PORT_FLAP_THRESHOLD'] = 3000.0 # Default flap penalty of /ports/flapping (1000 per transition, halved every 15 minutes)
+
+    # Scheduled online backups (see hot_backup.py); HOT_BACKUP_INTERVAL=0 turns them off
+    app.config['HOT_BACKUP_DIR'] = os.environ.get('HOT_BACKUP_DIR', os.path.join(app.instance_path, 'backups'))
+    app.config['HOT_BACKUP_INTERVAL'] = int(os.environ.get('HOT_BACKUP_INTERVAL', 6 * 3600)) # Seconds
+    app.config['HOT_BACKUP_INITIAL_DELAY'] = 300 # When no backup was ever taken, wait this long after startup
+    app.config['HOT_BACKUP_KEEP'] = int(os.environ.get('HOT_BACKUP_KEEP', '7'))
+    app.config['HOT_BACKUP_PAGES'] = 256 # Pages copied per step (1 MiB with 4 KiB pages)
+    app.config['HOT_BACKUP_PAUSE'] = 0.05 # Seconds between steps, during which writers can commit
+
+    # Response cache shared by all workers (see cache.py)
+    app.config['RESPONSE_CACHE_ENABLED'] = os.environ.get('RESPONSE_CACHE_ENABLED', '1') == '1'
+    app.config['RESPONSE_CACHE_PATH'] = os.path.join(app.instance_path, 'response_cache.db')
+    app.config['RESPONSE_CACHE_MAX_BYTES'] = 64 * 1024 * 1024
+    app.config['ROW_JSON_CACHE_SIZE'] = 50000 # Serialized rows kept per worker (see serializers.py)
+
+    # Per-request SQL profiling (see instrumentation.py)
+    app.config['SLOW_REQUEST_MS'] = int(os.environ.get('SLOW_REQUEST_MS', '500'))
+    app.config['SQL_STRICT_LAZY_LOADS'] = os.environ.get('SQL_STRICT_LAZY_LOADS', '0') == '1'
+
+    # On-demand request profiling (see profiling.py); disabled unless PROFILE_TOKEN is set
+    app.config['PROFILE_TOKEN'] = os.environ.get('PROFILE_TOKEN')
+    app.config['PROFILE_DIR'] = os.path.join(app.instance_path, 'profiles')
+    app.config['PROFILE_MIN_INTERVAL'] = float(os.environ.get('PROFILE_MIN_INTERVAL', '10'))
+    app.config['PROFILE_SAMPLE_INTERVAL'] = 0.005
+    app.config['PROFILE_MAX_FILES'] = 50
+
+    if test_config:
+        app.config.update(test_config)
+
+    # Initialize extensions with the app (Flask-Migrate is set up by the 'flask db' command, see cli.py)
     db.init_app(app)
-    migrate.init_app(app, db)
-
-    # --- Debugging Start ---
-    print("--- app.py: SQLAlchemy and Migrate initialized ---")
-    # --- Debugging End ---
+    init_versioning()
+    init_cache(app)
+    init_instrumentation(app)
+    init_metrics(app)
+    init_profiling(app)
+    init_labels(app)
+    init_hot_backups(app)
 
     # Register routes
     register_routes(app)
+    register_commands(app)
 
-    # --- Debugging Start ---
-    print("--- app.py: Routes registered ---")
-    # --- Debugging End ---
-
+    app.logger.info(f"App created in {(time.perf_counter() - started) * 1000:.1f} ms")
     return app
 
-# Create the app instance
-app = create_app()
+# The app instance used by 'gunicorn backend.app:app' and 'flask --app backend/app.py'.
+# It is created on first access (PEP 562 module __getattr__) rather than at import,
+# so importing this module, e.g. for create_app, does not build an app.
+_app = None
+
+def __getattr__(name):
+    global _app
+    if name != 'app':
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _app is None:
+        _app = create_app()
+        _app.logger.info(f"backend.app loaded in {(time.perf_counter() - _IMPORT_STARTED) * 1000:.1f} ms (imports included)")
+    return _app
 
 if __name__ == '__main__':
+    app = create_app()
     # The 'flask db upgrade' command in docker-compose handles initial migration
     # and database creation when running with gunicorn.
     # For local development without docker-compose, you might run:
@@ -0,0 +1,189 @@
+# backend/backup.py
+# This file implements full-database backup archives (/backup) and restores (/restore).
+# An archive is gzip-compressed NDJSON:
+#   {"format": "network-doc-backup", "version": 1, "revision": ..., "created_at": ..., "tables": [...]}
+#   {"table": "<name>", "columns": [...]}    followed by one JSON array per row,
+#   ... (one such section per table, parents before children) ...
+#   {"end": true, "rows": {"<name>": <count>, ...}}
+# Values are the raw SQLite values (dates stay ISO strings, booleans 0/1), so rows round-trip
+# exactly, ids included. The archive is read from a copy taken with the sqlite3 online backup
+# API, so it is one consistent snapshot and the live database is only read-locked while the
+# copy is made, not while the archive streams. PDF template files are not part of the archive.
+
+import gzip
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import zlib
+from datetime import datetime
+
+from .extensions import db
+from .versioning import bump_table_versions
+
+ARCHIVE_FORMAT = 'network-doc-backup'
+ARCHIVE_VERSION = 1
+ARCHIVE_MIMETYPE = 'application/x-ndjson'
+# Tables that describe the database rather than the inventory; restores bump table_versions instead
+SKIPPED_TABLES = ('alembic_version', 'table_versions')
+RESTORE_BATCH_SIZE = 5000
+_FLUSH_BYTES = 64 * 1024
+
+class RestoreError(ValueError):
+    """The archive cannot be restored into this database (bad format or another schema revision)."""
+
+def archive_tables():
+    """The tables in an archive, parents before children (the order rows are restored in)."""
+    return [table for table in db.metadata.sorted_tables if table.name not in SKIPPED_TABLES]
+
+def _schema_revision(connection):
+    """The alembic revision of a database, or None for a schema built with create_all()."""
+    try:
+        row = connection.exec_driver_sql("SELECT version_num FROM alembic_version").first()
+    except Exception:
+        return None
+    return row[0] if row else None
+
+def snapshot_database(path):
+    """
+    Copies the live database to 'path' with the sqlite3 online backup API, in one step.
+    Writers are only blocked for the duration of the page copy, which for a database of
+    tens of megabytes takes milliseconds.
+    """
+    raw = db.engine.raw_connection()
+    try:
+        target = sqlite3.connect(path)
+        try:
+            raw.driver_connection.backup(target)
+        finally:
+            target.close()
+    finally:
+        raw.close()
+
+def stream_archive():
+    """
+    Takes a snapshot and returns a generator of gzip-compressed archive chunks.
+    The generator does not use the app or the session, so it can run after the
+    request context is gone; the snapshot file is removed when it finishes or is closed.
+    """
+    fd, snapshot_path = tempfile.mkstemp(prefix='backup-', suffix='.db')
+    os.close(fd)
+    try:
+        snapshot_database(snapshot_path)
+        with db.engine.connect() as connection:
+            revision = _schema_revision(connection)
+    except Exception:
+        os.remove(snapshot_path)
+        raise
+    # Rows in primary key order: WITHOUT ROWID tables (the port history) have no rowid
+    tables = {table.name: [column.name for column in table.primary_key.columns] or ['rowid'] for table in archive_tables()}
+    return _archive_chunks(snapshot_path, revision, tables)
+
+def _archive_chunks(snapshot_path, revision, tables):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) # wbits 31: gzip container
+    pending = []
+    pending_bytes = 0
+    conn = sqlite3.connect(snapshot_path)
+    try:
+        header = {
+            'format': ARCHIVE_FORMAT, 'version': ARCHIVE_VERSION, 'revision': revision,
+            'created_at': datetime.utcnow().isoformat(), 'tables': list(tables)
+        }
+        pending.append(_dumps(header))
+        counts = {}
+        for table, order_by in tables.items():
+            order = ', '.join(f'"{column}"' for column in order_by)
+            cursor = conn.execute(f'SELECT * FROM "{table}" ORDER BY {order}')
+            pending.append(_dumps({'table': table, 'columns': [d[0] for d in cursor.description]}))
+            counts[table] = 0
+            for row in cursor:
+                line = _dumps(row)
+                pending.append(line)
+                pending_bytes += len(line)
+                counts[table] += 1
+                if pending_bytes >= _FLUSH_BYTES:
+                    chunk = compressor.compress(''.join(pending).encode())
+                    pending, pending_bytes = [], 0
+                    if chunk: # zlib buffers internally and often has nothing to emit yet
+                        yield chunk
+        pending.append(_dumps({'end': True, 'rows': counts}))
+        yield compressor.compress(''.join(pending).encode()) + compressor.flush()
+    finally:
+        conn.close()
+        os.remove(snapshot_path)
+
+def _dumps(value):
+    return json.dumps(value, separators=(',', ':')) + '\n'
+
+def restore_archive(fileobj):
+    """
+    Replaces the contents of every archived table with the rows of a gzip NDJSON archive
+    read from the binary file object 'fileobj', in a single transaction: either the whole
+    archive is loaded or nothing changes. Rows are bulk-inserted in batches through the
+    driver, bypassing the ORM, and the table versions are bumped so every cache refreshes.
+    Raises RestoreError for archives that are malformed, truncated or of another schema revision.
+    :return: A tuple (rows per table, seconds).
+    """
+    started = time.perf_counter()
+    tables = {table.name: table for table in archive_tables()}
+    lines = gzip.GzipFile(fileobj=fileobj, mode='rb')
+    try:
+        header = json.loads(lines.readline() or b'null')
+        if not isinstance(header, dict) or header.get('format') != ARCHIVE_FORMAT:
+            raise RestoreError('Not a backup archive.')
+        if header.get('version') != ARCHIVE_VERSION:
+            raise RestoreError(f"Unsupported archive version {header.get('version')}.")
+
+        counts = {}
+        with db.engine.begin() as connection:
+            revision = _schema_revision(connection)
+            if header.get('revision') != revision:
+                raise RestoreError(
+                    f"The archive was taken at schema revision {header.get('revision')}, this database is at "
+                    f"{revision}. Upgrade (or downgrade) one of them first."
+                )
+            # Foreign keys are only checked at commit, so parents and children can be replaced in any order
+            connection.exec_driver_sql("PRAGMA defer_foreign_keys = ON")
+            for name in reversed(list(tables)):
+                connection.exec_driver_sql(f'DELETE FROM "{name}"')
+
+            insert_sql, table_name, batch, end = None, None, [], None
+            for line in lines:
+                record = json.loads(line)
+                if isinstance(record, list):
+                    if insert_sql is None:
+                        raise RestoreError('The archive has rows before its first table section.')
+                    batch.append(tuple(record))
+                    counts[table_name] += 1
+                    if len(batch) >= RESTORE_BATCH_SIZE:
+                        connection.exec_driver_sql(insert_sql, batch)
+                        batch = []
+                    continue
+
+                if not isinstance(record, dict):
+                    raise RestoreError(f"Malformed archive line (expected a row array or an object): {line[:100].decode(errors='replace').strip()}")
+                if batch:
+                    connection.exec_driver_sql(insert_sql, batch)
+                    batch = []
+                if record.get('end'):
+                    end = record
+                    break
+                table_name, columns = record.get('table'), record.get('columns') or []
+                if table_name not in tables:
+                    raise RestoreError(f"The archive contains an unknown table '{table_name}'.")
+                unknown = set(columns) - set(tables[table_name].columns.keys())
+                if unknown:
+                    raise RestoreError(f"Table '{table_name}' in the archive has unknown columns: {', '.join(sorted(unknown))}.")
+                column_list = ', '.join(f'"{column}"' for column in columns)
+                insert_sql = f'INSERT INTO "{table_name}" ({column_list}) VALUES ({", ".join("?" * len(columns))})'
+                counts[table_name] = 0
+
+            if end is None:
+                raise RestoreError('The archive is truncated (it has no end record).')
+            if end.get('rows') != counts:
+                raise RestoreError('The row counts in the archive do not match its end record.')
+            bump_table_versions(connection, tables)
+    except (OSError, EOFError, json.JSONDecodeError) as e:
+        raise RestoreError(f"The archive could not be read: {e}")
+    return counts, time.perf_counter() - started
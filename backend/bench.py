@@ -0,0 +1,428 @@
+# backend/bench.py
+# This file provides the 'flask bench' commands: a seeded generator that fills a database
+# with a realistic synthetic datacenter through bulk inserts, and a benchmark suite that
+# times the API endpoints against it and writes the results as JSON, so runs from
+# different commits can be compared with 'flask bench compare'.
+#
+#   flask --app backend/app.py bench run --scale small --output before.json
+#   flask --app backend/app.py bench compare before.json after.json
+#   flask --app backend/app.py bench importtime --budget-ms 1500
+
+import csv
+import io
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import click
+import sqlalchemy
+
+from .extensions import db
+from .models import Location, Rack, PC, PatchPanel, Switch, Connection, ConnectionHop, SystemLog
+from .utils import validate_rack_unit_occupancy
+from .versioning import bump_table_versions
+
+# Row counts per table for each preset. 'full' is the size of a large production site.
+SCALES = {
+    'tiny': {'locations': 3, 'racks': 20, 'pcs': 200, 'switches': 10, 'patch_panels': 30, 'connections': 300, 'logs': 500},
+    'small': {'locations': 10, 'racks': 200, 'pcs': 2000, 'switches': 100, 'patch_panels': 300, 'connections': 4000, 'logs': 5000},
+    'full': {'locations': 50, 'racks': 2000, 'pcs': 20000, 'switches': 1000, 'patch_panels': 3000, 'connections': 40000, 'logs': 50000},
+}
+
+RACK_UNITS = 42
+SWITCH_PORTS = 48
+PATCH_PANEL_PORTS = 48
+MAX_SEED_HOPS = 5
+INSERT_BATCH_SIZE = 5000
+CABLE_COLORS = ['blue', 'red', 'green', 'yellow', 'black', 'white', 'orange', 'grey']
+OPERATING_SYSTEMS = ['Windows 11', 'Windows 10', 'Ubuntu 22.04', 'RHEL 9', 'Windows Server 2022']
+
+# --- Generator ---
+def _insert(connection, model, rows):
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        connection.execute(model.__table__.insert(), rows[start:start + INSERT_BATCH_SIZE])
+
+class _RackSpace:
+    """Hands out non-overlapping unit ranges in randomly chosen racks, filling each rack bottom-up."""
+    def __init__(self, rng, rack_ids):
+        self.rng = rng
+        self.next_free = {rack_id: 1 for rack_id in rack_ids}
+
+    def place(self, units):
+        """Returns (rack_id, row_in_rack), or (None, None) if the chosen rack is full."""
+        rack_id = self.rng.choice(list(self.next_free)) if self.next_free else None
+        if rack_id is None:
+            return None, None
+        row = self.next_free[rack_id]
+        if row + units - 1 > RACK_UNITS:
+            return None, None
+        self.next_free[rack_id] = row + units
+        return rack_id, row
+
+def generate_inventory(connection, counts, seed=42):
+    """
+    Bulk-inserts a synthetic inventory with the given row counts using Core executemany,
+    then bumps the table versions. Ids are assigned explicitly, so the database must be empty.
+    Rack placements never overlap, switch ports and patch panel ports are used at most once,
+    and each non-multi-port PC has at most one connection (the rest go to multi-port PCs).
+    :param connection: A SQLAlchemy Connection inside a transaction.
+    :param counts: A dictionary like the entries of SCALES.
+    :param seed: Seed for the random generator; the same seed gives the same data.
+    :return: The counts of rows actually inserted per table.
+    """
+    rng = random.Random(seed)
+    location_ids = list(range(1, counts['locations'] + 1))
+    rack_ids = list(range(1, counts['racks'] + 1))
+
+    _insert(connection, Location, [
+        {'id': i, 'name': f"Site {i:03d}", 'door_number': f"D{rng.randint(1, 400)}", 'description': f"Building {1 + i // 10}, floor {i % 10}"}
+        for i in location_ids
+    ])
+    racks = [
+        {'id': i, 'name': f"R{i:05d}", 'location_id': rng.choice(location_ids), 'total_units': RACK_UNITS,
+         'orientation': rng.choice(['bottom-up', 'top-down']), 'description': None}
+        for i in rack_ids
+    ]
+    _insert(connection, Rack, racks)
+    rack_location = {r['id']: r['location_id'] for r in racks}
+    space = _RackSpace(rng, rack_ids)
+
+    switches = []
+    for i in range(1, counts['switches'] + 1):
+        rack_id, row = space.place(1)
+        switches.append({
+            'id': i, 'name': f"SW{i:05d}", 'ip_address': f"10.{i // 65536}.{(i // 256) % 256}.{i % 256}",
+            'location_id': rack_location[rack_id] if rack_id else rng.choice(location_ids),
+            'rack_id': rack_id, 'row_in_rack': row, 'units_occupied': 1, 'total_ports': SWITCH_PORTS,
+            'source_port': f"Core-{rng.randint(1, 8)}/{rng.randint(1, 48)}", 'model': rng.choice(['C9300-48P', 'C2960X-48', 'EX2300-48T']),
+            'usage': rng.choice(['Access', 'Distribution', 'Servers']), 'description': None
+        })
+    _insert(connection, Switch, switches)
+
+    patch_panels = []
+    for i in range(1, counts['patch_panels'] + 1):
+        rack_id, row = space.place(1)
+        patch_panels.append({
+            'id': i, 'name': f"PP{i:05d}", 'location_id': rack_location[rack_id] if rack_id else rng.choice(location_ids),
+            'rack_id': rack_id, 'row_in_rack': row, 'units_occupied': 1, 'total_ports': PATCH_PANEL_PORTS, 'description': None
+        })
+    _insert(connection, PatchPanel, patch_panels)
+
+    pcs = []
+    for i in range(1, counts['pcs'] + 1):
+        is_server = rng.random() < 0.15
+        rack_id, row, units = None, None, 1
+        if is_server:
+            units = rng.choice([1, 1, 2, 4])
+            rack_id, row = space.place(units)
+            if rack_id is None:
+                units = 1
+        pcs.append({
+            'id': i, 'name': f"PC{i:06d}", 'ip_address': f"172.{16 + i // 65536}.{(i // 256) % 256}.{i % 256}",
+            'username': f"user{rng.randint(1, 5000)}", 'in_domain': rng.random() < 0.8,
+            'operating_system': rng.choice(OPERATING_SYSTEMS), 'model': rng.choice(['OptiPlex 7090', 'ThinkCentre M70q', 'PowerEdge R650']),
+            'office': f"Office {rng.randint(1, 300)}", 'description': None, 'multi_port': rng.random() < 0.1,
+            'type': 'Server' if is_server else 'Workstation', 'usage': None,
+            'row_in_rack': row, 'rack_id': rack_id, 'units_occupied': units,
+            'serial_number': f"SN{rng.getrandbits(40):010X}", 'pc_specification': None, 'monitor_model': None, 'disk_info': None
+        })
+    _insert(connection, PC, pcs)
+
+    switch_ports = [(s, p) for s in range(1, counts['switches'] + 1) for p in range(1, SWITCH_PORTS + 1)]
+    panel_ports = [(pp, p) for pp in range(1, counts['patch_panels'] + 1) for p in range(1, PATCH_PANEL_PORTS + 1)]
+    rng.shuffle(switch_ports)
+    rng.shuffle(panel_ports)
+    single_port_pcs = [pc['id'] for pc in pcs if not pc['multi_port']]
+    multi_port_pcs = [pc['id'] for pc in pcs if pc['multi_port']] or [pc['id'] for pc in pcs]
+    rng.shuffle(single_port_pcs)
+
+    connections, hops = [], []
+    hop_id = 0
+    total_connections = min(counts['connections'], len(switch_ports))
+    for i in range(1, total_connections + 1):
+        pc_id = single_port_pcs.pop() if single_port_pcs else rng.choice(multi_port_pcs)
+        switch_id, switch_port = switch_ports.pop()
+        connections.append({
+            'id': i, 'pc_id': pc_id, 'switch_id': switch_id, 'switch_port': str(switch_port),
+            'is_switch_port_up': rng.random() < 0.9, 'cable_color': rng.choice(CABLE_COLORS), 'cable_label': f"C{i:06d}",
+            'wall_point_label': f"WP-{rng.randint(1, 9999)}", 'wall_point_cable_color': rng.choice(CABLE_COLORS),
+            'wall_point_cable_label': None
+        })
+        for sequence in range(min(rng.randint(0, MAX_SEED_HOPS), len(panel_ports))):
+            patch_panel_id, port = panel_ports.pop()
+            hop_id += 1
+            hops.append({
+                'id': hop_id, 'connection_id': i, 'patch_panel_id': patch_panel_id, 'patch_panel_port': str(port),
+                'is_port_up': rng.random() < 0.95, 'sequence': sequence, 'cable_color': rng.choice(CABLE_COLORS), 'cable_label': None
+            })
+    _insert(connection, Connection, connections)
+    _insert(connection, ConnectionHop, hops)
+
+    started = datetime.utcnow() - timedelta(days=365)
+    _insert(connection, SystemLog, [
+        {'id': i, 'timestamp': started + timedelta(minutes=10 * i), 'action_type': rng.choice(['CREATE', 'UPDATE', 'DELETE']),
+         'entity_type': rng.choice(['PC', 'Switch', 'Connection', 'Rack']), 'entity_id': rng.randint(1, 1000),
+         'entity_name': f"Entity {i}", 'details': {'field': 'value'}, 'is_reverted': False, 'action_by': 'system'}
+        for i in range(1, counts['logs'] + 1)
+    ])
+
+    inserted = {
+        'locations': len(location_ids), 'racks': len(racks), 'switches': len(switches), 'patch_panels': len(patch_panels),
+        'pcs': len(pcs), 'connections': len(connections), 'connection_hops': len(hops), 'logs': counts['logs']
+    }
+    bump_table_versions(connection, [
+        Location.__tablename__, Rack.__tablename__, Switch.__tablename__, PatchPanel.__tablename__, PC.__tablename__,
+        Connection.__tablename__, ConnectionHop.__tablename__, SystemLog.__tablename__
+    ])
+    return inserted
+
+def create_seeded_app(db_path, scale='small', seed=42, config=None):
+    """
+    Creates an app on a fresh SQLite file at db_path, builds the schema and seeds it.
+    Returns (app, inserted_counts). Used by the benchmarks and the load test.
+    """
+    from .app import create_app # Imported here: app.py imports this module to register the CLI
+
+    instance_dir = os.path.dirname(os.path.abspath(db_path))
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.abspath(db_path)}",
+        'RESPONSE_CACHE_PATH': os.path.join(instance_dir, 'response_cache.db'),
+        'PROFILE_DIR': os.path.join(instance_dir, 'profiles'),
+        'LABEL_CACHE_PATH': os.path.join(instance_dir, 'label_cache.db'),
+        'HOT_BACKUP_INTERVAL': 0,
+        **(config or {})
+    })
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as connection:
+            inserted = generate_inventory(connection, SCALES[scale], seed=seed)
+    return app, inserted
+
+# --- Benchmarks ---
+def _summarize(durations):
+    ordered = sorted(durations)
+    p95_index = max(0, int(round(0.95 * len(ordered))) - 1)
+    return {
+        'min_ms': round(ordered[0] * 1000, 3),
+        'median_ms': round(statistics.median(ordered) * 1000, 3),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'p95_ms': round(ordered[p95_index] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+def _time_request(client, method, path, **kwargs):
+    """Sends one request and returns (seconds, response). Raises if the response is an error."""
+    started = time.perf_counter()
+    response = client.open(path, method=method, **kwargs)
+    body = response.get_data() # Streamed bodies are consumed inside the timing
+    elapsed = time.perf_counter() - started
+    if response.status_code >= 400:
+        raise click.ClickException(f"{method} {path} returned {response.status_code}: {body[:200]!r}")
+    return elapsed, response
+
+def _import_csv(iteration, rows):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(['name', 'ip_address', 'type', 'operating_system', 'in_domain'])
+    for i in range(rows):
+        writer.writerow([f"BENCH-IMPORT-{iteration}-{i}", f"192.168.{i // 256}.{i % 256}", 'Workstation', 'Ubuntu 22.04', 'true'])
+    return output.getvalue().encode()
+
+def _scenarios(inserted, import_rows):
+    """
+    Returns [(name, callable(client, iteration) -> (seconds, response or None))].
+    Read-only scenarios come first; the import scenario writes, so it runs last.
+    """
+    mid_switch = max(1, inserted['switches'] // 2)
+    mid_panel = max(1, inserted['patch_panels'] // 2)
+    last_log_page = max(1, inserted['logs'] // 25)
+
+    def get(path):
+        return lambda client, iteration: _time_request(client, 'GET', path)
+
+    def rack_occupancy(client, iteration):
+        # Checks one unit range in every 10th rack, the validation run on each rack-mounted create/update
+        started = time.perf_counter()
+        for rack_id in range(1, inserted['racks'] + 1, 10):
+            validate_rack_unit_occupancy(db.session, rack_id, 20, 2, 'pc')
+        return time.perf_counter() - started, None
+
+    def import_pcs(client, iteration):
+        data = {'file': (io.BytesIO(_import_csv(iteration, import_rows)), 'bench_pcs.csv')}
+        return _time_request(client, 'POST', '/import/pcs', data=data, content_type='multipart/form-data')
+
+    return [
+        ('list_locations', get('/locations')),
+        ('list_racks', get('/racks')),
+        ('list_pcs', get('/pcs')),
+        ('list_available_pcs', get('/available_pcs')),
+        ('list_patch_panels', get('/patch_panels')),
+        ('list_switches', get('/switches')),
+        ('list_connections', get('/connections')),
+        ('connection_detail', get(f"/connections/{max(1, inserted['connections'] // 2)}")),
+        ('switch_ports', get(f"/switches/{mid_switch}/ports")),
+        ('patch_panel_ports', get(f"/patch_panels/{mid_panel}/ports")),
+        ('logs_first_page', get('/logs?page=1')),
+        ('logs_last_page', get(f"/logs?page={last_log_page}")),
+        ('export_pcs', get('/export/pcs')),
+        ('export_connections', get('/export/connections')),
+        ('rack_occupancy', rack_occupancy),
+        ('import_pcs', import_pcs),
+    ]
+
+def run_benchmarks(app, inserted, repeat=5, only=None, import_rows=200):
+    """
+    Runs every scenario 'repeat' times after one untimed-for-stats cold run, whose time
+    is reported separately as 'first_ms' (cold per-worker caches).
+    :return: {scenario_name: {first_ms, min_ms, median_ms, mean_ms, p95_ms, max_ms, queries, bytes}}
+    """
+    results = {}
+    client = app.test_client()
+    with app.app_context():
+        for name, scenario in _scenarios(inserted, import_rows):
+            if only and name not in only:
+                continue
+            first, response = scenario(client, 0)
+            durations = [scenario(client, iteration)[0] for iteration in range(1, repeat + 1)]
+            results[name] = {
+                'first_ms': round(first * 1000, 3),
+                **_summarize(durations),
+                'queries': int(response.headers.get('X-DB-Queries', 0)) if response is not None else None,
+                'bytes': len(response.get_data()) if response is not None else None,
+            }
+            click.echo(f"{name:<22} median {results[name]['median_ms']:>10.2f} ms  first {results[name]['first_ms']:>10.2f} ms", err=True)
+    return results
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# --- CLI ---
+@click.group('bench')
+def bench_cli():
+    """Synthetic data generation and endpoint benchmarks."""
+
+@bench_cli.command('run')
+@click.option('--scale', type=click.Choice(sorted(SCALES)), default='small', show_default=True)
+@click.option('--seed', default=42, show_default=True, help='Seed of the data generator.')
+@click.option('--repeat', default=5, show_default=True, help='Timed runs per scenario.')
+@click.option('--scenario', 'only', multiple=True, help='Only run the named scenario(s).')
+@click.option('--import-rows', default=200, show_default=True, help='Rows per CSV import run.')
+@click.option('--response-cache/--no-response-cache', default=False, show_default=True,
+              help='Serve cacheable lists from the shared response cache (off measures the real work).')
+@click.option('--db', 'db_path', default=None, help='SQLite file to create (default: a temporary directory).')
+@click.option('--output', type=click.Path(dir_okay=False), default=None, help='Write the JSON results here instead of stdout.')
+def bench_run(scale, seed, repeat, only, import_rows, response_cache, db_path, output):
+    """Seeds a fresh database and times the API endpoints against it."""
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix='netdoc-bench-'), 'bench.db')
+    elif os.path.exists(db_path):
+        raise click.ClickException(f"{db_path} already exists; the benchmark needs a fresh database.")
+
+    started = time.perf_counter()
+    app, inserted = create_seeded_app(db_path, scale=scale, seed=seed, config={'RESPONSE_CACHE_ENABLED': response_cache})
+    seed_seconds = time.perf_counter() - started
+    click.echo(f"Seeded {db_path} in {seed_seconds:.1f} s: {inserted}", err=True)
+
+    report = {
+        'meta': {
+            'git_revision': _git_revision(),
+            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'sqlite': sqlite3.sqlite_version,
+            'scale': scale, 'seed': seed, 'repeat': repeat, 'response_cache': response_cache,
+            'rows': inserted, 'seed_seconds': round(seed_seconds, 3),
+        },
+        'scenarios': run_benchmarks(app, inserted, repeat=repeat, only=set(only), import_rows=import_rows),
+    }
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text + '\n')
+        click.echo(f"Results written to {output}", err=True)
+    else:
+        click.echo(text)
+
+@bench_cli.command('seed')
+@click.argument('db_path')
+@click.option('--scale', type=click.Choice(sorted(SCALES)), default='small', show_default=True)
+@click.option('--seed', default=42, show_default=True)
+def bench_seed(db_path, scale, seed):
+    """Creates a new SQLite database at DB_PATH filled with synthetic data."""
+    if os.path.exists(db_path):
+        raise click.ClickException(f"{db_path} already exists.")
+    _, inserted = create_seeded_app(db_path, scale=scale, seed=seed)
+    click.echo(f"Seeded {db_path}: {inserted}")
+
+@bench_cli.command('compare')
+@click.argument('baseline', type=click.File())
+@click.argument('candidate', type=click.File())
+@click.option('--metric', default='median_ms', show_default=True)
+@click.option('--threshold', default=10.0, show_default=True, help='Percent change reported as a regression/improvement.')
+def bench_compare(baseline, candidate, metric, threshold):
+    """Compares two result files scenario by scenario. Exits with status 1 on a regression."""
+    old, new = json.load(baseline)['scenarios'], json.load(candidate)['scenarios']
+    regressions = 0
+    for name in sorted(set(old) & set(new)):
+        before, after = old[name][metric], new[name][metric]
+        change = (after - before) / before * 100 if before else 0.0
+        flag = ''
+        if change > threshold:
+            flag, regressions = 'REGRESSION', regressions + 1
+        elif change < -threshold:
+            flag = 'improved'
+        click.echo(f"{name:<22} {before:>10.2f} -> {after:>10.2f} {metric}  {change:+7.1f}%  {flag}")
+    if regressions:
+        raise SystemExit(1)
+
+# Modules that must not be imported while starting a worker (only specific commands or endpoints use them)
+FORBIDDEN_AT_STARTUP = ('alembic', 'flask_migrate', 'backend.bench', 'backend.loadtest', 'reportlab', 'pypdf')
+
+def measure_startup_imports():
+    """
+    Runs 'create_app()' in a fresh interpreter under '-X importtime'.
+    :return: (total_ms, {module: cumulative_ms}) where total_ms covers every import of the run.
+    """
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'from backend.app import create_app; create_app()'],
+        cwd=project_root, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise click.ClickException(f"create_app() failed:\n{result.stderr[-2000:]}")
+    cumulative = {}
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        cumulative[name.strip()] = int(cumulative_us) / 1000
+        if not name.startswith('  '): # Top-level imports; nested ones are included in their parents
+            total_us += int(cumulative_us)
+    return total_us / 1000, cumulative
+
+@bench_cli.command('importtime')
+@click.option('--budget-ms', default=1500.0, show_default=True, help='Maximum total import time of a worker start.')
+@click.option('--top', default=15, show_default=True, help='Number of slowest modules to list.')
+def bench_importtime(budget_ms, top):
+    """Checks the import time of create_app() against a budget (exit status 1 when over it)."""
+    total_ms, cumulative = measure_startup_imports()
+    for module, ms in sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:top]:
+        click.echo(f"{ms:>9.1f} ms  {module}")
+    forbidden = [m for m in cumulative if any(m == f or m.startswith(f + '.') for f in FORBIDDEN_AT_STARTUP)]
+    click.echo(f"Total import time: {total_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+    if forbidden:
+        click.echo(f"Imported at startup but should be loaded on first use: {', '.join(sorted(forbidden))}")
+    if total_ms > budget_ms or forbidden:
+        raise SystemExit(1)
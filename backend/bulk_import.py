@@ -0,0 +1,415 @@
+# backend/bulk_import.py
+# This file implements the NDJSON bulk import for machine clients ('POST /bulk_import/<entity_type>').
+# The request body is one JSON object per line, optionally gzip-compressed. It is read as a
+# stream and handled in batches of BULK_IMPORT_BATCH_SIZE records; each batch resolves its
+# references and looks up its existing rows with a few set-based queries, is written with
+# bulk statements and committed on its own, and its per-record results are streamed back
+# before the next batch is read. Memory use is bounded by the batch size, whatever the
+# size of the upload.
+#
+# Records use the column names of the entity (see import_sync.FIELDS), plus:
+# - references by name or id: location_name / location_id, rack_name / rack_id,
+#   pc_name / pc_id, switch_name / switch_id, and in hops patch_panel_name / patch_panel_id;
+# - for connections, 'hops': a list of {patch_panel_..., patch_panel_port, is_port_up,
+#   cable_color, cable_label}, in path order. When given, it replaces the connection's hops.
+# Records are matched with existing rows by natural key (see import_sync.NATURAL_KEYS). In
+# mode=insert (the default) an existing key is an error; in mode=upsert the given fields
+# of the existing row are updated.
+#
+# The response is NDJSON as well: {"line": n, "status": "created"|"updated"|"unchanged"|"error",
+# "id": ..., "error": ...} per record, then {"summary": {...}}.
+
+import gzip
+import io
+import json
+import time
+import zlib
+from collections import Counter
+
+from sqlalchemy import select, insert, update, delete, tuple_
+from sqlalchemy.orm.exc import StaleDataError
+
+from .extensions import db
+from .models import Location, Rack, PC, PatchPanel, Switch, ConnectionHop
+from .import_sync import MODELS, NATURAL_KEYS, LOG_ENTITY_TYPES, FIELDS, PLACED_ENTITIES
+from .services import SystemLogService
+from .metrics import record_import
+
+MODES = ('insert', 'upsert')
+REFERENCE_CACHE_SIZE = 100000 # Resolved names/ids kept per request; the cache is emptied when it grows past this
+
+class BulkRecordError(ValueError):
+    pass
+
+# --- Reading the stream ---
+class _PrefixedStream(io.RawIOBase):
+    """A raw stream that returns 'head' (bytes already read from 'stream') and then the rest of 'stream'."""
+    def __init__(self, head, stream):
+        self.head = head
+        self.stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.head[:len(buffer)] if self.head else self.stream.read(len(buffer))
+        self.head = self.head[len(data):] if self.head else b''
+        buffer[:len(data)] = data
+        return len(data)
+
+def iter_lines(stream, compressed=False):
+    """
+    Yields (line number, line) for the non-empty lines of a binary stream, decompressing as it
+    reads if the stream is gzip-compressed (as flagged, or recognised by its magic bytes).
+    """
+    head = stream.read(2)
+    source = io.BufferedReader(_PrefixedStream(head, stream), 64 * 1024)
+    if compressed or head == b'\x1f\x8b':
+        source = gzip.GzipFile(fileobj=source, mode='rb')
+    for number, line in enumerate(source, start=1):
+        if line.strip():
+            yield number, line
+
+def _batches(lines, size):
+    batch = []
+    for item in lines:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+# --- References ---
+class _References:
+    """Resolves names and ids of referenced rows with one query per table and batch, remembering the answers."""
+    TABLES = {'location': Location, 'rack': Rack, 'pc': PC, 'switch': Switch, 'patch_panel': PatchPanel}
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.by_name = {kind: {} for kind in self.TABLES}
+        self.known_ids = {kind: set() for kind in self.TABLES}
+
+    def prefetch(self, wanted):
+        """wanted: {kind: (names, ids)}. Loads the ones not seen yet."""
+        if sum(len(cache) for cache in self.by_name.values()) + sum(len(ids) for ids in self.known_ids.values()) > REFERENCE_CACHE_SIZE:
+            self.clear()
+        connection = db.session.connection()
+        for kind, (names, ids) in wanted.items():
+            model = self.TABLES[kind]
+            names = [n for n in names if n not in self.by_name[kind]]
+            if names:
+                # The lowest id wins for duplicate names, as with .first() in import_data
+                for id_, name in connection.execute(select(model.id, model.name).where(model.name.in_(names)).order_by(model.id.desc())):
+                    self.by_name[kind][name] = id_
+                for name in names:
+                    self.by_name[kind].setdefault(name, None)
+            ids = [i for i in ids if i not in self.known_ids[kind]]
+            if ids:
+                self.known_ids[kind].update(connection.execute(select(model.id).where(model.id.in_(ids))).scalars())
+
+    def resolve(self, record, kind, label, required=False):
+        """
+        The id referenced by record['<kind>_id'] or record['<kind>_name']; None if neither is given
+        (or they are null). Raises BulkRecordError for unknown references.
+        """
+        id_key, name_key = f'{kind}_id', f'{kind}_name'
+        if record.get(id_key) is not None:
+            if not isinstance(record[id_key], int) or record[id_key] not in self.known_ids[kind]:
+                raise BulkRecordError(f"{label} with id {record[id_key]} not found.")
+            return record[id_key]
+        if record.get(name_key) is not None:
+            id_ = self.by_name[kind].get(record[name_key]) if isinstance(record[name_key], str) else None
+            if id_ is None:
+                raise BulkRecordError(f"{label} '{record[name_key]}' not found.")
+            return id_
+        if required:
+            raise BulkRecordError(f"Missing '{name_key}' or '{id_key}'.")
+        return None
+
+def _wanted_references(entity_type, records):
+    wanted = {}
+    def want(kind, record):
+        names, ids = wanted.setdefault(kind, (set(), set()))
+        if isinstance(record.get(f'{kind}_name'), str):
+            names.add(record[f'{kind}_name'])
+        if isinstance(record.get(f'{kind}_id'), int):
+            ids.add(record[f'{kind}_id'])
+    for record in records:
+        if entity_type in ('racks', 'patch_panels', 'switches'):
+            want('location', record)
+        if entity_type in PLACED_ENTITIES:
+            want('rack', record)
+        if entity_type == 'connections':
+            want('pc', record)
+            want('switch', record)
+            for hop in record.get('hops') or []:
+                if isinstance(hop, dict):
+                    want('patch_panel', hop)
+    return wanted
+
+# --- Parsing records ---
+def _check_type(model, column, value):
+    column_type = model.__table__.c[column].type.python_type
+    if value is None:
+        if not model.__table__.c[column].nullable:
+            raise BulkRecordError(f"'{column}' cannot be null.")
+        return value
+    if column_type is bool and not isinstance(value, bool) or column_type is int and (not isinstance(value, int) or isinstance(value, bool)) \
+            or column_type is str and not isinstance(value, str):
+        raise BulkRecordError(f"'{column}' must be of type {column_type.__name__}.")
+    return value
+
+def _parse_record(entity_type, record, references):
+    """Returns (natural key, values, hops or None) for one record. Raises BulkRecordError."""
+    model = MODELS[entity_type]
+    values = {column: _check_type(model, column, record[column]) for column in FIELDS[entity_type] if column in record}
+    if entity_type == 'connections':
+        values['pc_id'] = references.resolve(record, 'pc', 'PC', required=True)
+        values['switch_id'] = references.resolve(record, 'switch', 'Switch', required=True)
+        if not record.get('switch_port'):
+            raise BulkRecordError("Missing 'switch_port'.")
+        values['switch_port'] = str(record['switch_port'])
+        hops = None
+        if 'hops' in record:
+            if not isinstance(record['hops'], list) or not all(isinstance(hop, dict) for hop in record['hops']):
+                raise BulkRecordError("'hops' must be a list of objects.")
+            hops = []
+            for sequence, hop in enumerate(record['hops']):
+                if not hop.get('patch_panel_port'):
+                    raise BulkRecordError(f"Hop {sequence + 1}: missing 'patch_panel_port'.")
+                try:
+                    is_up, color, label = (_check_type(ConnectionHop, column, hop.get(column, default))
+                                           for column, default in (('is_port_up', True), ('cable_color', None), ('cable_label', None)))
+                except BulkRecordError as e:
+                    raise BulkRecordError(f"Hop {sequence + 1}: {e}")
+                hops.append((
+                    sequence, references.resolve(hop, 'patch_panel', f"Hop {sequence + 1}: Patch Panel", required=True),
+                    str(hop['patch_panel_port']), is_up, color, label,
+                ))
+            hops = tuple(hops)
+        return (values['pc_id'], values['switch_id'], values['switch_port']), values, hops
+
+    if not isinstance(record.get('name'), str) or not record['name']:
+        raise BulkRecordError("Missing 'name'.")
+    values['name'] = record['name']
+    if entity_type in ('racks', 'patch_panels', 'switches'):
+        values['location_id'] = references.resolve(record, 'location', 'Location', required=True)
+    if entity_type in PLACED_ENTITIES and ('rack_id' in record or 'rack_name' in record):
+        rack_id = references.resolve(record, 'rack', 'Rack')
+        if rack_id is None:
+            values.update(rack_id=None, row_in_rack=None, units_occupied=1)
+        else:
+            row_in_rack, units_occupied = record.get('row_in_rack'), record.get('units_occupied', 1)
+            if not all(isinstance(v, int) and not isinstance(v, bool) and v >= 1 for v in (row_in_rack, units_occupied)):
+                raise BulkRecordError("'row_in_rack' and 'units_occupied' must be positive integers for rack-mounted devices.")
+            values.update(rack_id=rack_id, row_in_rack=row_in_rack, units_occupied=units_occupied)
+    key = (values['name'], values['location_id']) if entity_type == 'racks' else (values['name'],)
+    return key, values, None
+
+# --- Existing rows and rack units ---
+def _existing_rows(entity_type, keys, columns):
+    """{natural key: row dictionary} for the given keys, with one query."""
+    model = MODELS[entity_type]
+    key_columns = [model.__table__.c[c] for c in NATURAL_KEYS[entity_type]]
+    where = key_columns[0].in_([k[0] for k in keys]) if len(key_columns) == 1 else tuple_(*key_columns).in_(keys)
+    existing = {}
+    for values in db.session.connection().execute(select(*(model.__table__.c[c] for c in columns)).where(where).order_by(model.id.desc())):
+        row = dict(zip(columns, values))
+        existing[tuple(row[c] for c in NATURAL_KEYS[entity_type])] = row # Duplicate keys: the lowest id is matched
+    return existing
+
+def _rack_units(rack_ids):
+    """(rack_id, unit) -> (table, device id, label) for every unit taken in the given racks."""
+    occupied = {}
+    connection = db.session.connection()
+    for table, model, label in (('pcs', PC, 'PC'), ('patch_panels', PatchPanel, 'Patch Panel'), ('switches', Switch, 'Switch')):
+        stmt = select(model.id, model.name, model.rack_id, model.row_in_rack, model.units_occupied).where(
+            model.rack_id.in_(rack_ids), model.row_in_rack.isnot(None)
+        )
+        if model is PC:
+            stmt = stmt.where(PC.type == 'Server')
+        for id_, name, rack_id, row_in_rack, units_occupied in connection.execute(stmt):
+            for unit in range(row_in_rack, row_in_rack + (units_occupied or 1)):
+                occupied[(rack_id, unit)] = (table, id_, f"{label} '{name}'")
+    return occupied
+
+def _check_rack_units(entity_type, parsed, existing, rack_sizes):
+    """Marks records whose placement overlaps another device (in the database or earlier in the batch)."""
+    placed = [p for p in parsed if p['error'] is None and p['values'].get('rack_id')]
+    if not placed:
+        return
+    occupied = _rack_units({p['values']['rack_id'] for p in placed})
+    for p in placed:
+        values, current = p['values'], existing.get(p['key'])
+        own_id = current['id'] if current else None
+        if entity_type == 'pcs' and values.get('type', current['type'] if current else 'Workstation') != 'Server':
+            p['error'] = 'Only Server PCs can be placed in a rack.'
+            continue
+        units = range(values['row_in_rack'], values['row_in_rack'] + values['units_occupied'])
+        if units.stop - 1 > (rack_sizes.get(values['rack_id']) or 0):
+            p['error'] = f"Units {units.start}-{units.stop - 1} do not fit in the rack ({rack_sizes.get(values['rack_id'])}U)."
+            continue
+        taken = next((occupied[(values['rack_id'], u)] for u in units
+                      if (values['rack_id'], u) in occupied and occupied[(values['rack_id'], u)][:2] != (entity_type, own_id)), None)
+        if taken:
+            p['error'] = f"Rack unit(s) is already occupied by {taken[2]}."
+            continue
+        for unit in units:
+            occupied[(values['rack_id'], unit)] = (entity_type, own_id or ('new', p['line']), f"'{values['name']}'")
+
+# --- Batches ---
+def _process_batch(entity_type, batch, mode, references):
+    """Parses, checks and writes one batch in its own transaction. Returns the result dictionaries."""
+    model = MODELS[entity_type]
+    parsed = []
+    for line, raw in batch:
+        try:
+            record = json.loads(raw)
+        except ValueError as e:
+            parsed.append({'line': line, 'error': f"Invalid JSON: {e}"})
+            continue
+        if not isinstance(record, dict):
+            parsed.append({'line': line, 'error': 'Each line must be a JSON object.'})
+            continue
+        parsed.append({'line': line, 'record': record, 'error': None})
+
+    references.prefetch(_wanted_references(entity_type, [p['record'] for p in parsed if p['error'] is None]))
+    seen = {}
+    for p in parsed:
+        if p['error'] is not None:
+            continue
+        try:
+            p['key'], p['values'], p['hops'] = _parse_record(entity_type, p['record'], references)
+        except BulkRecordError as e:
+            p['error'] = str(e)
+            continue
+        if p['key'] in seen:
+            p['error'] = f"Duplicate of line {seen[p['key']]} in the same batch."
+            continue
+        seen[p['key']] = p['line']
+
+    valid = [p for p in parsed if p['error'] is None]
+    columns = list(dict.fromkeys(
+        ['id', 'version_id', *NATURAL_KEYS[entity_type]]
+        + [c for p in valid for c in p['values']]
+        + (['type', 'rack_id', 'row_in_rack', 'units_occupied'] if entity_type == 'pcs' else [])
+    ))
+    existing = _existing_rows(entity_type, list(seen), columns) if seen else {}
+    if entity_type in PLACED_ENTITIES:
+        rack_ids = {p['values']['rack_id'] for p in valid if p['values'].get('rack_id')}
+        rack_sizes = dict(db.session.connection().execute(select(Rack.id, Rack.total_units).where(Rack.id.in_(rack_ids))).all()) if rack_ids else {}
+        _check_rack_units(entity_type, parsed, existing, rack_sizes)
+
+    existing_hops = {}
+    if entity_type == 'connections':
+        hop_owner_ids = [existing[p['key']]['id'] for p in valid if p['error'] is None and p['hops'] is not None and p['key'] in existing]
+        if hop_owner_ids:
+            for hop in db.session.connection().execute(
+                select(ConnectionHop.connection_id, ConnectionHop.sequence, ConnectionHop.patch_panel_id, ConnectionHop.patch_panel_port,
+                       ConnectionHop.is_port_up, ConnectionHop.cable_color, ConnectionHop.cable_label)
+                .where(ConnectionHop.connection_id.in_(hop_owner_ids)).order_by(ConnectionHop.connection_id, ConnectionHop.sequence)
+            ):
+                existing_hops.setdefault(hop[0], []).append(tuple(hop[1:]))
+
+    inserts, updates, hop_replacements = [], [], {}
+    for p in parsed:
+        if p['error'] is not None:
+            continue
+        current = existing.get(p['key'])
+        if current is None:
+            p['status'] = 'created'
+            inserts.append(p)
+            continue
+        p['id'] = current['id']
+        if mode == 'insert':
+            p['error'] = 'Already exists.'
+            continue
+        if entity_type == 'pcs' and p['values'].get('type', 'Server') != 'Server' and 'rack_id' not in p['values'] and current['rack_id'] is not None:
+            p['values'].update(rack_id=None, row_in_rack=None, units_occupied=1) # No longer a server, so it leaves the rack
+        changed = {c: v for c, v in p['values'].items() if current[c] != v}
+        hops_changed = p['hops'] is not None and p['hops'] != tuple(existing_hops.get(current['id'], ()))
+        if changed:
+            updates.append(dict(changed, id=current['id'], version_id=current['version_id']))
+        if hops_changed:
+            hop_replacements[current['id']] = p['hops']
+        p['status'] = 'updated' if changed or hops_changed else 'unchanged'
+
+    try:
+        if inserts:
+            # A plain executemany; RETURNING with sort_by_parameter_order would insert row by row on
+            # SQLite. The new ids are read back by natural key, which this transaction now holds.
+            db.session.execute(insert(model), [p['values'] for p in inserts])
+            created = _existing_rows(entity_type, [p['key'] for p in inserts], ['id', *NATURAL_KEYS[entity_type]])
+            for p in inserts:
+                p['id'] = created[p['key']]['id']
+                if p['hops']:
+                    hop_replacements[p['id']] = p['hops']
+        if updates:
+            db.session.execute(update(model), updates)
+        if hop_replacements:
+            owners = list(hop_replacements)
+            db.session.execute(delete(ConnectionHop).where(ConnectionHop.connection_id.in_(owners)).execution_options(synchronize_session=False))
+            new_hops = [
+                {'connection_id': owner, 'sequence': sequence, 'patch_panel_id': pp_id, 'patch_panel_port': port,
+                 'is_port_up': is_up, 'cable_color': color, 'cable_label': label}
+                for owner, hops in hop_replacements.items() for sequence, pp_id, port, is_up, color, label in hops
+            ]
+            if new_hops:
+                db.session.execute(insert(ConnectionHop), new_hops)
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        for p in parsed:
+            if p['error'] is None:
+                p['error'] = 'The record was changed by another request during the import; nothing in this batch was written. Retry it.'
+    except Exception as e:
+        db.session.rollback()
+        for p in parsed:
+            if p['error'] is None:
+                p['error'] = f"The batch could not be written: {e}"
+
+    results = []
+    for p in parsed:
+        if p['error'] is not None:
+            result = {'line': p['line'], 'status': 'error', 'error': p['error']}
+            if p.get('id'):
+                result['id'] = p['id']
+        else:
+            result = {'line': p['line'], 'status': p['status'], 'id': p['id']}
+        results.append(result)
+    return results
+
+def bulk_import(entity_type, lines, mode, batch_size, source_name):
+    """
+    Imports the records of an iterator of (line number, line) pairs, batch by batch.
+    Yields NDJSON result lines; the last one is the summary. A SystemLog entry with the
+    counts is written at the end.
+    """
+    started = time.perf_counter()
+    references = _References()
+    counts = Counter()
+    read_error = None
+    try:
+        for batch in _batches(lines, batch_size):
+            results = _process_batch(entity_type, batch, mode, references)
+            counts.update(result['status'] for result in results)
+            yield ''.join(_dumps(result) for result in results)
+    except (OSError, EOFError, zlib.error) as e: # A truncated or corrupt upload; the batches before it are committed
+        read_error = f"The request body could not be read: {e}"
+
+    seconds = time.perf_counter() - started
+    summary = {status: counts[status] for status in ('created', 'updated', 'unchanged', 'error')}
+    summary['seconds'] = round(seconds, 3)
+    if read_error:
+        summary['read_error'] = read_error
+    if counts['created'] or counts['updated']:
+        SystemLogService.create_log('BULK_IMPORT', LOG_ENTITY_TYPES[entity_type], None, source_name, details=dict(summary, mode=mode))
+        db.session.commit()
+    record_import(entity_type, counts['created'] + counts['updated'] + counts['unchanged'], counts['error'], seconds)
+    yield _dumps({'summary': summary})
+
+def _dumps(value):
+    return json.dumps(value, separators=(',', ':')) + '\n'
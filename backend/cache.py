@@ -0,0 +1,295 @@
+# backend/cache.py
+# This file implements HTTP caching for GET endpoints: strong ETags derived from
+# the table generation counters, and a response cache for rarely-changing lists.
+# Cache entries hold the pre-serialized (and pre-gzipped) response bytes and live in a
+# small SQLite file next to the main database, so every gunicorn worker shares them.
+# Each entry is stamped with the generation counters (see versioning.py) of the
+# tables it was built from; a write to any of those tables invalidates it.
+
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, request, make_response, g
+
+from .versioning import get_table_versions
+from .metrics import record_cache_lookup
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    stamp TEXT NOT NULL,
+    mimetype TEXT NOT NULL,
+    body BLOB NOT NULL,
+    gzip_body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_entries_last_access ON entries (last_access);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+STAT_NAMES = ('hits', 'misses', 'stores', 'evictions')
+LAST_ACCESS_RESOLUTION = 60 # Seconds; a hit only writes last_access when the stored one is older
+
+class ResponseCache:
+    """
+    A size-bounded, LRU-evicted cache of response bodies stored in SQLite.
+    Connections are opened lazily per thread and re-opened after a fork.
+    Lookups are read-only: hits and misses are counted in this process, and an entry's
+    last_access is only refreshed once per LAST_ACCESS_RESOLUTION, so cached GETs do not
+    queue for SQLite's write lock.
+    """
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lookups = {'hits': 0, 'misses': 0}
+        self._lookups_lock = threading.Lock()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _bump_stat(self, conn, name, amount=1):
+        conn.execute(
+            "INSERT INTO stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount)
+        )
+
+    def _count_lookups(self, hits, misses):
+        with self._lookups_lock:
+            self._lookups['hits'] += hits
+            self._lookups['misses'] += misses
+
+    def _touch(self, conn, accessed):
+        """Refreshes last_access of the {key: stored last_access} entries that are more than LAST_ACCESS_RESOLUTION old."""
+        now = time.time()
+        stale = [(now, key) for key, last_access in accessed.items() if now - last_access > LAST_ACCESS_RESOLUTION]
+        if stale:
+            with conn:
+                conn.executemany("UPDATE entries SET last_access = ? WHERE key = ?", stale)
+
+    def get(self, key, stamp):
+        """
+        Returns (mimetype, body, gzip_body) if an entry for 'key' was stored under
+        the same stamp, otherwise None. Records a hit or a miss either way.
+        """
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT mimetype, body, gzip_body, last_access FROM entries WHERE key = ? AND stamp = ?", (key, stamp)
+        ).fetchone()
+        self._count_lookups(1 if row else 0, 0 if row else 1)
+        if not row:
+            return None
+        self._touch(conn, {key: row[3]})
+        return row[:3]
+
+    def get_many(self, keys_and_stamps):
+        """
+        Batch form of get() for (key, stamp) pairs, in one query per 500 keys.
+        Returns {key: body} for the entries found under their stamp; records hits and misses.
+        """
+        wanted = dict(keys_and_stamps)
+        if not wanted:
+            return {}
+        conn = self._connect()
+        found, accessed = {}, {}
+        keys = list(wanted)
+        for start in range(0, len(keys), 500): # Stay well below SQLite's bound-parameter limit
+            batch = keys[start:start + 500]
+            rows = conn.execute(
+                f"SELECT key, stamp, body, last_access FROM entries WHERE key IN ({','.join('?' * len(batch))})", batch
+            ).fetchall()
+            for key, stamp, body, last_access in rows:
+                if wanted[key] == stamp:
+                    found[key] = body
+                    accessed[key] = last_access
+        self._count_lookups(len(found), len(wanted) - len(found))
+        self._touch(conn, accessed)
+        return found
+
+    def set(self, key, stamp, mimetype, body):
+        """
+        Stores a response body (replacing any older version of the key) and evicts LRU entries
+        over the size bound. Returns the gzip copy, which is made even when the body is too large to keep.
+        """
+        gzip_body = gzip.compress(body, compresslevel=6)
+        self._store([(key, stamp, body, gzip_body)], mimetype)
+        return gzip_body
+
+    def set_many(self, entries, mimetype, compress=True):
+        """
+        Stores (key, stamp, body) entries in one transaction, then evicts LRU entries over the size bound.
+        With compress=False no gzip copy is kept (for bodies that are already compressed, such as PDFs).
+        """
+        self._store([(key, stamp, body, gzip.compress(body, compresslevel=6) if compress else b'') for key, stamp, body in entries], mimetype)
+
+    def _store(self, entries, mimetype):
+        rows = []
+        for key, stamp, body, gzip_body in entries:
+            size = len(body) + len(gzip_body)
+            if size <= self.max_bytes:
+                rows.append((key, stamp, mimetype, body, gzip_body, size, time.time()))
+        if not rows:
+            return
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, stamp, mimetype, body, gzip_body, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._bump_stat(conn, 'stores', len(rows))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            evicted = 0
+            while total > self.max_bytes:
+                oldest = conn.execute("SELECT key, size FROM entries ORDER BY last_access LIMIT 1").fetchone()
+                if not oldest:
+                    break
+                conn.execute("DELETE FROM entries WHERE key = ?", (oldest[0],))
+                total -= oldest[1]
+                evicted += 1
+            if evicted:
+                self._bump_stat(conn, 'evictions', evicted)
+
+    def clear(self):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM entries")
+
+    def stats(self):
+        """
+        Returns the counters plus the current entry count and size. Hits and misses are this
+        worker's (all workers' are in the Prometheus metrics); stores and evictions are shared.
+        """
+        conn = self._connect()
+        stats = {name: 0 for name in STAT_NAMES}
+        stats.update(dict(conn.execute("SELECT name, value FROM stats").fetchall()))
+        with self._lookups_lock:
+            stats.update(self._lookups)
+        entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = stats['hits'] + stats['misses']
+        stats.update({
+            'entries': entries,
+            'size_bytes': size,
+            'max_bytes': self.max_bytes,
+            'hit_rate': round(stats['hits'] / lookups, 4) if lookups else None
+        })
+        return stats
+
+def init_cache(app):
+    """Creates the app's response cache from RESPONSE_CACHE_PATH / RESPONSE_CACHE_MAX_BYTES."""
+    app.extensions['response_cache'] = ResponseCache(
+        app.config['RESPONSE_CACHE_PATH'], app.config['RESPONSE_CACHE_MAX_BYTES']
+    )
+
+def get_cache():
+    return current_app.extensions.get('response_cache')
+
+def _cache_key():
+    """Endpoint path + sorted query string + the negotiated representation."""
+    query = '&'.join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+    accept = request.accept_mimetypes.best_match(['application/json', 'application/msgpack']) or ''
+    return f"{request.path}?{query}|{accept}"
+
+def _table_stamp(table_names):
+    """
+    Returns a string such as 'locations:4,racks:2' for the given tables.
+    Memoized per request so ETag and cache lookups share one version query.
+    """
+    key = tuple(sorted(set(table_names)))
+    stamps = g.setdefault('_table_stamps', {})
+    if key not in stamps:
+        versions = get_table_versions(key)
+        stamps[key] = ','.join(f"{name}:{versions[name]}" for name in key)
+    return stamps[key]
+
+def etag_response(*table_names):
+    """
+    Decorator for GET views whose output only depends on the given tables.
+    Adds a strong ETag built from the tables' versions and the requested
+    representation, and answers a matching If-None-Match with 304 before the
+    view runs. Other methods pass straight through to the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+
+            # Gzip-capable clients may get the pre-compressed body, so the coding is part of the tag
+            coding = 'gzip' if 'gzip' in request.accept_encodings else 'identity'
+            digest = hashlib.sha1(f"{_cache_key()}|{coding}|{_table_stamp(table_names)}".encode()).hexdigest()[:24]
+            etag = f"v1-{digest}"
+
+            if request.if_none_match.contains_weak(etag):
+                record_cache_lookup('etag', 'not_modified')
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache' # Always revalidate; a 304 is a single version lookup
+            response.vary.update(['Accept', 'Accept-Encoding'])
+            return response
+        return wrapper
+    return decorator
+
+def cached_response(*table_names):
+    """
+    Decorator for GET views whose output only depends on the given tables.
+    Other methods pass straight through to the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            if request.method != 'GET' or cache is None or not current_app.config.get('RESPONSE_CACHE_ENABLED', True):
+                return view(*args, **kwargs)
+
+            stamp = _table_stamp(table_names)
+            key = _cache_key()
+            wants_gzip = 'gzip' in request.accept_encodings
+
+            entry = cache.get(key, stamp)
+            record_cache_lookup('response', 'hit' if entry else 'miss')
+            if entry:
+                mimetype, body, gzip_body = entry
+                response = make_response(gzip_body if wants_gzip else body)
+                response.mimetype = mimetype
+                if wants_gzip:
+                    response.headers['Content-Encoding'] = 'gzip'
+                response.vary.update(['Accept', 'Accept-Encoding'])
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.direct_passthrough:
+                gzip_body = cache.set(key, stamp, response.mimetype, response.get_data())
+                if wants_gzip: # Same bytes as a later hit, so both carry the same strong ETag
+                    response.set_data(gzip_body)
+                    response.headers['Content-Encoding'] = 'gzip'
+            response.vary.add('Accept-Encoding')
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
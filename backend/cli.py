@@ -0,0 +1,42 @@
+# backend/cli.py
+# This file registers the app's 'flask' commands. Each one is a lightweight placeholder
+# whose real implementation (Flask-Migrate's 'db' group, bench.py, loadtest.py, discovery.py) is only
+# imported when that command runs, so creating the app does not pay for them.
+
+from importlib import import_module
+
+import click
+from flask.cli import ScriptInfo
+
+class LazyCommand(click.Command):
+    """
+    A command that imports its implementation on first use. Parsing and invocation are
+    handed to the real command (or group) returned by 'loader'.
+    """
+    def __init__(self, name, loader, help):
+        super().__init__(name, help=help, context_settings={'ignore_unknown_options': True, 'allow_extra_args': True})
+        self.loader = loader
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        return self.loader().make_context(info_name, args, parent=parent, **extra)
+
+def _migrate_group():
+    from flask_migrate.cli import db as db_cli_group
+    from .extensions import init_migrate
+    init_migrate(click.get_current_context().ensure_object(ScriptInfo).load_app())
+    return db_cli_group
+
+def _bench_group():
+    return import_module('.bench', __package__).bench_cli
+
+def _loadtest_command():
+    return import_module('.loadtest', __package__).loadtest_command
+
+def _discovery_group():
+    return import_module('.discovery', __package__).discovery_cli
+
+def register_commands(app):
+    app.cli.add_command(LazyCommand('db', _migrate_group, help='Perform database migrations.'))
+    app.cli.add_command(LazyCommand('bench', _bench_group, help='Synthetic data generation and endpoint benchmarks.'))
+    app.cli.add_command(LazyCommand('loadtest', _loadtest_command, help='Replay frontend traffic against a local gunicorn.'))
+    app.cli.add_command(LazyCommand('discovery', _discovery_group, help='Reconcile saved switch output with the documented connections.'))
@@ -11,9 +11,5 @@ class Config:
     UPLOAD_FOLDER = os.path.join(os.path.abspath(os.path.dirname(__file__)), UPLOAD_FOLDER_RELATIVE)
     ALLOWED_EXTENSIONS = {'pdf'}
     MAX_PDF_FILES = 5
-
-    # Global Constants
-    MAX_HOPS = 5 # Maximum number of hops for connections export/import
-
-    # Ensure the upload folder exists when config is accessed
-    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
\ No newline at end of file
+    MAX_PDF_SIZE = 20 * 1024 * 1024
+    PDF_BLOB_FOLDER = os.path.join(UPLOAD_FOLDER, 'blobs')
@@ -0,0 +1,101 @@
+# backend/connection_csv.py
+# This file implements the long format of the connections CSV ('format=long' on
+# /export/connections and /import/connections). The default (wide) format has one row per
+# connection with a group of hop columns per hop; the long format has one row per hop:
+#
+#   connection_id,pc_name,switch_name,switch_port,...,hop,patch_panel_name,patch_panel_port,...
+#   17,PC-01,SW-01,12,...,1,PP-A,3,...
+#   17,PC-01,SW-01,12,...,2,PP-B,7,...
+#   18,PC-02,SW-01,13,...,,,,...          <- a connection without hops
+#
+# The connection columns repeat on each of its rows, and the rows of a connection must be
+# consecutive (as exported). On import the rows are grouped back into connections, which
+# are then handled exactly like wide rows, so both formats share one import path.
+
+import re
+
+from sqlalchemy import select
+
+from .extensions import db
+from .models import PC, PatchPanel, Switch, Connection, ConnectionHop
+
+CONNECTION_COLUMNS = [
+    'pc_name', 'switch_name', 'switch_port', 'is_switch_port_up', 'cable_color', 'cable_label',
+    'wall_point_label', 'wall_point_cable_color', 'wall_point_cable_label',
+]
+# Long column -> the suffix of the wide 'hop<n>_...' column it maps to
+HOP_COLUMNS = {
+    'patch_panel_name': 'patch_panel_name', 'patch_panel_port': 'patch_panel_port', 'is_port_up': 'is_port_up',
+    'hop_cable_color': 'cable_color', 'hop_cable_label': 'cable_label',
+}
+LONG_COLUMNS = ['connection_id'] + CONNECTION_COLUMNS + ['hop'] + list(HOP_COLUMNS)
+
+_WIDE_HOP_COLUMN = re.compile(r'^hop(\d+)_patch_panel_name$')
+
+def hop_numbers(columns):
+    """The (1-based) hop numbers that have a 'hop<n>_patch_panel_name' column among the given wide columns, in order."""
+    return sorted(int(m.group(1)) for m in map(_WIDE_HOP_COLUMN.match, columns) if m)
+
+def long_rows():
+    """Yields the long-format rows of every connection, hops in sequence order, read with one query."""
+    stmt = select(
+        Connection.id, PC.name, Switch.name, Connection.switch_port, Connection.is_switch_port_up,
+        Connection.cable_color, Connection.cable_label, Connection.wall_point_label,
+        Connection.wall_point_cable_color, Connection.wall_point_cable_label,
+        PatchPanel.name, ConnectionHop.patch_panel_port, ConnectionHop.is_port_up,
+        ConnectionHop.cable_color, ConnectionHop.cable_label,
+    ).outerjoin(PC, PC.id == Connection.pc_id).outerjoin(Switch, Switch.id == Connection.switch_id).outerjoin(
+        ConnectionHop, ConnectionHop.connection_id == Connection.id
+    ).outerjoin(PatchPanel, PatchPanel.id == ConnectionHop.patch_panel_id).order_by(
+        Connection.id, ConnectionHop.sequence, ConnectionHop.id
+    )
+    previous_id, number = None, 0
+    for row in db.session.execute(stmt.execution_options(yield_per=1000)):
+        connection_id, hop = row[0], row[10:]
+        number = number + 1 if connection_id == previous_id else 1
+        previous_id = connection_id
+        has_hop = hop[1] is not None # patch_panel_port is NOT NULL, so None means no hop row
+        yield list(row[:10]) + ([number] + list(hop) if has_hop else [None] * (1 + len(hop)))
+
+def _group_key(row_dict):
+    return row_dict.get('connection_id') or (row_dict.get('pc_name'), row_dict.get('switch_name'), row_dict.get('switch_port'))
+
+def group_long_rows(reader, header):
+    """
+    Groups the rows of a long-format file back into connections.
+    :param reader: A csv.reader positioned after the header row.
+    :param header: The (stripped) header.
+    :return: A generator of (row number of the connection's first row, wide row dictionary),
+        in the form import_data reads wide rows. Connections without hops get an empty
+        'hop1_patch_panel_name', so a sync still sees the hop columns and clears their hops.
+    """
+    group, group_key, first_row = None, None, None
+    for i, row_data in enumerate(reader):
+        if not row_data:
+            continue
+        row_dict = dict(zip(header, row_data))
+        key = _group_key(row_dict)
+        if group is not None and key != group_key:
+            yield first_row, _to_wide(group, header)
+            group = None
+        if group is None:
+            group, group_key, first_row = [], key, i + 2 # Row numbers as in import_data's messages
+        group.append(row_dict)
+    if group is not None:
+        yield first_row, _to_wide(group, header)
+
+def _to_wide(rows, header):
+    wide = {column: rows[0][column] for column in CONNECTION_COLUMNS if column in header}
+    if 'patch_panel_name' in header:
+        wide['hop1_patch_panel_name'] = ''
+    position = 0
+    for row_dict in rows:
+        if not row_dict.get('patch_panel_name') and not row_dict.get('patch_panel_port'):
+            continue
+        position += 1
+        number = row_dict.get('hop')
+        number = int(number) if number and number.isdigit() and int(number) > 0 else position
+        for long_column, suffix in HOP_COLUMNS.items():
+            if long_column in header:
+                wide[f'hop{number}_{suffix}'] = row_dict[long_column]
+    return wide
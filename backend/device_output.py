@@ -0,0 +1,266 @@
+# backend/device_output.py
+# This file parses saved switch command output for 'flask discovery' (see discovery.py).
+# A file may hold the output of one command or a whole session log; text sections are
+# split at prompt lines ('SW-01#show interfaces status') and recognized by their content:
+#   show interfaces status          -> 'interface_status': interface, description, status, vlan, up
+#   show lldp/cdp neighbors [detail] -> 'neighbors': interface, device, ip, port, protocol
+#   show mac address-table          -> 'mac_table': interface, mac, vlan
+# JSON files are either Arista-style '| json' output (interfaceStatuses, lldpNeighbors,
+# unicastTable) or {"hostname": ..., "interface_status": [...], "neighbors": [...],
+# "mac_table": [...]} with the entry keys above, or a list of such objects.
+# Nothing here touches the app or the database, so parse_file can run in a worker process.
+
+import json
+import os
+import re
+
+SECTION_KINDS = ('interface_status', 'neighbors', 'mac_table')
+
+# Interface name prefixes and the short form they are normalized to
+_INTERFACE_PREFIXES = {
+    'hundredgigabitethernet': 'hu', 'hundredgige': 'hu', 'hu': 'hu', 'fortygigabitethernet': 'fo', 'fo': 'fo',
+    'twentyfivegigabitethernet': 'twe', 'twentyfivegige': 'twe', 'twe': 'twe', 'tengigabitethernet': 'te', 'ten': 'te', 'te': 'te',
+    'twogigabitethernet': 'tw', 'tw': 'tw', 'fivegigabitethernet': 'fi', 'fi': 'fi', 'gigabitethernet': 'gi', 'gig': 'gi', 'gi': 'gi',
+    'fastethernet': 'fa', 'fa': 'fa', 'ethernet': 'eth', 'eth': 'eth', 'et': 'eth', 'port-channel': 'po', 'po': 'po',
+    'management': 'mgmt', 'ma': 'mgmt', 'mgmt': 'mgmt', 'vlan': 'vl', 'vl': 'vl',
+}
+LOGICAL_INTERFACES = ('po', 'vl', 'mgmt') # Not cabled ports: never matched with a documented connection
+
+_UP_STATUSES = {'connected', 'up'}
+_DOWN_STATUSES = {
+    'notconnect', 'notconnected', 'notconnec', 'disabled', 'err-disabled', 'errdisabled', 'down', 'inactive',
+    'sfpabsent', 'xcvrabsent', 'suspended', 'suspnd', 'linkflapdisabled', 'adminisdown',
+}
+
+_PROMPT = re.compile(r'^(?P<host>[A-Za-z0-9][\w.\-]*)(?:\([\w\-]+\))?[#>]\s*(?P<command>\S.*)?$')
+_MAC = r'(?:[0-9a-fA-F]{4}\.[0-9a-fA-F]{4}\.[0-9a-fA-F]{4}|(?:[0-9a-fA-F]{2}[:-]){5}[0-9a-fA-F]{2})'
+_MAC_ROW = re.compile(r'^\s*[*+GRO]?\s*(?P<vlan>\d+)\s+(?P<mac>' + _MAC + r')\s+(?P<rest>.*\S)\s*$')
+_INTERFACE_NAME = re.compile(r'^([a-z][a-z\-]*?)(\d.*)$')
+_NUMBERED = re.compile(r'^\d+(?:/\d+)*(?:\.\d+)?$')
+
+def normalize_interface(name):
+    """
+    A comparable form of an interface name: 'GigabitEthernet1/0/12', 'Gi1/0/12' and
+    'Gig 1/0/12' all become 'gi1/0/12'. Plain port numbers ('12') are returned as they are.
+    """
+    text = re.sub(r'\s+', '', str(name or '')).lower()
+    match = _INTERFACE_NAME.match(text)
+    if match and match.group(1) in _INTERFACE_PREFIXES:
+        return _INTERFACE_PREFIXES[match.group(1)] + match.group(2)
+    return text
+
+def port_number(key):
+    """The last number of a normalized interface name ('gi1/0/12' -> 12), or None for logical interfaces."""
+    if key.startswith(LOGICAL_INTERFACES):
+        return None
+    match = re.search(r'(\d+)(?:\.\d+)?$', key)
+    return int(match.group(1)) if match else None
+
+def link_up(status):
+    """True/False for a link status word ('connected', 'notconnect', ...), None when it says neither."""
+    status = (status or '').strip().lower()
+    if status in _UP_STATUSES:
+        return True
+    if status in _DOWN_STATUSES:
+        return False
+    return None
+
+def _short_host(name):
+    return name.split('.')[0] if name and not re.match(r'^\d+\.\d+\.\d+\.\d+$', name) else name
+
+# --- Text output ---
+def _split_sections(text):
+    """[(hostname or None, lines)], one per prompt in the text (the whole text if it has none)."""
+    sections, host, lines = [], None, []
+    for line in text.splitlines():
+        match = _PROMPT.match(line)
+        if match and (match.group('command') or '').lower().startswith(('sh', 'disp')):
+            if lines:
+                sections.append((host, lines))
+            host, lines = match.group('host'), []
+            continue
+        lines.append(line)
+    if lines:
+        sections.append((host, lines))
+    return sections
+
+def _columns(header, names):
+    """Start offsets of the named columns in a header line (None for missing ones)."""
+    starts = []
+    for name in names:
+        match = re.search(r'(?:^|\s)(' + re.escape(name) + r')(?:\s|$)', header)
+        starts.append(match.start(1) if match else None)
+    return starts
+
+def _parse_interface_status(lines):
+    entries = []
+    header_at = next(i for i, line in enumerate(lines) if re.match(r'^\s*Port\s+Name\s+Status\b', line))
+    name_at, status_at = _columns(lines[header_at], ['Name', 'Status'])
+    for line in lines[header_at + 1:]:
+        if not line.strip() or set(line.strip()) <= {'-', ' '}:
+            continue
+        interface = line[:name_at].strip()
+        rest = line[status_at:].split()
+        if not interface or ' ' in interface or not rest:
+            continue
+        entries.append({
+            'interface': interface, 'description': line[name_at:status_at].strip(), 'status': rest[0],
+            'vlan': rest[1] if len(rest) > 1 else None, 'up': link_up(rest[0]),
+        })
+    return entries
+
+def _interface_tokens(tokens):
+    """Splits an interface name written with a space ('Gig 1/0/1') off the front of tokens."""
+    if len(tokens) > 1 and tokens[0].isalpha() and _NUMBERED.match(tokens[1]):
+        return tokens[0] + tokens[1], tokens[2:]
+    return (tokens[0], tokens[1:]) if tokens else (None, [])
+
+def _parse_neighbor_table(lines, protocol):
+    entries = []
+    local_label = 'Local Intf' if protocol == 'lldp' else 'Local Intrfce'
+    header_at = next(i for i, line in enumerate(lines) if line.startswith('Device ID') and local_label in line)
+    local_at = lines[header_at].index(local_label)
+    pending_device = None
+    for line in lines[header_at + 1:]:
+        if not line.strip() or line.startswith('Total ') or line.startswith('Capability Codes'):
+            continue
+        device = line[:local_at].strip()
+        rest = line[local_at:].split() if len(line) > local_at else []
+        if device and not rest: # CDP puts long device ids on a line of their own
+            pending_device = device
+            continue
+        if not device and pending_device:
+            device, pending_device = pending_device, None
+        interface, rest = _interface_tokens(rest)
+        if not device or not interface:
+            continue
+        port = None
+        if rest:
+            port = rest[-1]
+            if len(rest) > 1 and rest[-2].isalpha() and _NUMBERED.match(rest[-1]):
+                port = rest[-2] + rest[-1]
+        entries.append({'interface': interface, 'device': device, 'ip': None, 'port': port, 'protocol': protocol})
+    return entries
+
+def _detail_value(block, pattern):
+    match = re.search(pattern, block, re.MULTILINE)
+    return match.group(1).strip() if match else None
+
+def _parse_neighbor_detail(lines, protocol):
+    entries = []
+    for block in re.split(r'^-{10,}\s*$', '\n'.join(lines), flags=re.MULTILINE):
+        if protocol == 'cdp':
+            device = _detail_value(block, r'^Device ID:\s*(\S+)')
+            interface = _detail_value(block, r'^Interface:\s*([^,]+),')
+            port = _detail_value(block, r'Port ID \(outgoing port\):\s*(\S+)')
+            ip = _detail_value(block, r'^\s*IP(?:v4)? [Aa]ddress:\s*(\S+)')
+        else:
+            device = _detail_value(block, r'^System Name:\s*(\S+)')
+            interface = _detail_value(block, r'^Local Intf:\s*(\S+)')
+            port = _detail_value(block, r'^Port id:\s*(\S+)')
+            ip = _detail_value(block, r'^\s*IP:\s*(\S+)')
+            device = device or _detail_value(block, r'^Chassis id:\s*(\S+)')
+        if device and interface:
+            entries.append({'interface': interface, 'device': device, 'ip': ip, 'port': port, 'protocol': protocol})
+    return entries
+
+def _parse_mac_table(lines):
+    entries = []
+    for line in lines:
+        match = _MAC_ROW.match(line)
+        if not match:
+            continue
+        interface = match.group('rest').split()[-1]
+        if not re.search(r'\d', interface) or interface.upper().startswith(('CPU', 'ROUTER', 'SWITCH', 'DROP')):
+            continue
+        entries.append({'interface': interface, 'mac': match.group('mac').lower(), 'vlan': int(match.group('vlan'))})
+    return entries
+
+def _parse_text_section(lines):
+    """(kind, entries) for a block of command output, recognized by its header; None if unknown."""
+    text = '\n'.join(lines)
+    if re.search(r'^\s*Port\s+Name\s+Status\b', text, re.MULTILINE):
+        return 'interface_status', _parse_interface_status(lines)
+    if re.search(r'^Device ID:', text, re.MULTILINE):
+        return 'neighbors', _parse_neighbor_detail(lines, 'cdp')
+    if re.search(r'^Local Intf:', text, re.MULTILINE):
+        return 'neighbors', _parse_neighbor_detail(lines, 'lldp')
+    if re.search(r'^Device ID\s.*Local Intf\b', text, re.MULTILINE):
+        return 'neighbors', _parse_neighbor_table(lines, 'lldp')
+    if re.search(r'^Device ID\s.*Local Intrfce\b', text, re.MULTILINE):
+        return 'neighbors', _parse_neighbor_table(lines, 'cdp')
+    if re.search(r'Mac Address', text, re.IGNORECASE) and _MAC_ROW.search(text):
+        return 'mac_table', _parse_mac_table(lines)
+    return None
+
+# --- JSON output ---
+def _json_sections(document, hostname=None):
+    if isinstance(document, list):
+        return [section for item in document for section in _json_sections(item, hostname)]
+    if not isinstance(document, dict):
+        raise ValueError('Expected a JSON object or a list of objects.')
+    hostname = document.get('hostname') or document.get('switch') or hostname
+    sections = []
+    for kind in SECTION_KINDS:
+        if isinstance(document.get(kind), list):
+            entries = [dict(entry) for entry in document[kind] if isinstance(entry, dict) and entry.get('interface')
+                       and (kind != 'neighbors' or entry.get('device'))] # A neighbor without a device name cannot be matched
+            for entry in entries:
+                if kind == 'interface_status':
+                    entry.setdefault('up', link_up(entry.get('status')))
+                elif kind == 'neighbors':
+                    entry.setdefault('protocol', 'lldp')
+                elif entry.get('mac'):
+                    entry['mac'] = str(entry['mac']).lower()
+            sections.append({'hostname': hostname, 'kind': kind, 'entries': entries})
+    if isinstance(document.get('interfaceStatuses'), dict):
+        sections.append({'hostname': hostname, 'kind': 'interface_status', 'entries': [
+            {'interface': name, 'description': status.get('description', ''), 'status': status.get('linkStatus'),
+             'vlan': status['vlanInformation'].get('vlanId') if isinstance(status.get('vlanInformation'), dict) else None, 'up': link_up(status.get('linkStatus'))}
+            for name, status in document['interfaceStatuses'].items() if isinstance(status, dict)
+        ]})
+    if isinstance(document.get('lldpNeighbors'), list):
+        sections.append({'hostname': hostname, 'kind': 'neighbors', 'entries': [
+            {'interface': n.get('port'), 'device': n.get('neighborDevice'), 'ip': None, 'port': n.get('neighborPort'), 'protocol': 'lldp'}
+            for n in document['lldpNeighbors'] if isinstance(n, dict) and n.get('port') and n.get('neighborDevice')
+        ]})
+    unicast_table = document.get('unicastTable')
+    if isinstance(unicast_table, dict) and isinstance(unicast_table.get('tableEntries'), list):
+        sections.append({'hostname': hostname, 'kind': 'mac_table', 'entries': [
+            {'interface': e.get('interface'), 'mac': str(e.get('macAddress', '')).lower(), 'vlan': e.get('vlanId')}
+            for e in unicast_table['tableEntries'] if isinstance(e, dict) and re.search(r'\d', str(e.get('interface') or ''))
+        ]})
+    return sections
+
+# --- Files ---
+def parse_file(path):
+    """
+    Parses one saved output file. Never raises: returns {'file', 'sections', 'error'}, where each
+    section is {'hostname', 'kind', 'entries'}. Sections without a hostname are attributed to a
+    switch by the file name in discovery.py.
+    """
+    result = {'file': path, 'sections': [], 'error': None}
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        if text.lstrip().startswith(('{', '[')):
+            result['sections'] = _json_sections(json.loads(text))
+        else:
+            for host, lines in _split_sections(text):
+                parsed = _parse_text_section(lines)
+                if parsed:
+                    result['sections'].append({'hostname': _short_host(host), 'kind': parsed[0], 'entries': parsed[1]})
+        if not result['sections']:
+            result['error'] = 'No interface status, neighbor or MAC address table output recognized.'
+    except (OSError, ValueError) as e:
+        result['error'] = str(e)
+    except Exception as e: # Output shaped in a way no parser expects; the other files are still reconciled
+        result['error'] = f"Unreadable output ({type(e).__name__}: {e})"
+        result['sections'] = []
+    return result
+
+def hostname_hints(path):
+    """Switch names a file may be named after: 'SW-01.txt', 'sw-01_lldp.txt', 'sw-01.corp.local.json'."""
+    stem = os.path.basename(path)
+    stem = re.sub(r'\.(txt|log|out|json|cfg)$', '', stem, flags=re.IGNORECASE)
+    return list(dict.fromkeys([stem, re.split(r'__|_', stem)[0], _short_host(stem)]))
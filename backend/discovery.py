@@ -0,0 +1,292 @@
+# backend/discovery.py
+# This file provides 'flask discovery': it audits the documented connections against saved
+# switch output (see device_output.py for the formats). The files are parsed in a process
+# pool; the results are matched with the switches, PCs and connections of one database
+# snapshot, by host name or IP address and by port, and written as a reconciliation report:
+#   missing     - a port with a PC (or unknown activity) on it, but no documented connection
+#   stale       - a documented connection on a port that is down, or that the switch does not have
+#   mismatched  - a documented port with another PC on it, or a PC found on another port
+#   port_status - documented connections whose is_switch_port_up differs from the observed link
+# With --apply the port status changes are written in one bulk update.
+#
+#   flask --app backend/app.py discovery ingest dumps/ --output report.json
+#   flask --app backend/app.py discovery ingest dumps/*.txt --apply
+
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import select, update
+from sqlalchemy.orm.exc import StaleDataError
+
+from .extensions import db
+from .models import PC, Switch, Connection
+from .services import SystemLogService
+from .device_output import parse_file, hostname_hints, normalize_interface, port_number
+
+MAC_UPLINK_THRESHOLD = 8 # Ports that learned more MAC addresses than this are treated as uplinks
+SERIAL_PARSE_FILES = 4 # Fewer files than this are parsed in-process; a pool costs more than it saves
+
+class DiscoveryError(Exception):
+    """The port status updates could not be applied."""
+
+# --- Parsing ---
+def _collect_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names) if not name.startswith('.'))
+        else:
+            files.append(path)
+    return files
+
+def parse_files(paths, workers=None):
+    """Parses the files (directories are walked) in a process pool. Returns the parse_file results in order."""
+    files = _collect_files(paths)
+    if len(files) < SERIAL_PARSE_FILES or workers == 1:
+        return [parse_file(path) for path in files]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(parse_file, files, chunksize=max(1, len(files) // (4 * (workers or os.cpu_count() or 1)))))
+
+# --- Matching ---
+def _host_key(name):
+    """Case-insensitive host name without the domain part; IP addresses are kept whole."""
+    name = (name or '').strip().lower()
+    return name if name.replace('.', '').isdigit() else name.split('.')[0]
+
+class _Inventory:
+    """The switches, PCs and connections to reconcile against, read in a single read transaction."""
+    def __init__(self):
+        with db.engine.connect() as connection:
+            connection.exec_driver_sql("BEGIN") # One snapshot for all the selects below; rolled back on close
+            switches = connection.execute(select(Switch.id, Switch.name, Switch.ip_address)).all()
+            pcs = connection.execute(select(PC.id, PC.name, PC.ip_address)).all()
+            connections = connection.execute(select(
+                Connection.id, Connection.version_id, Connection.pc_id, Connection.switch_id,
+                Connection.switch_port, Connection.is_switch_port_up
+            )).all()
+        self.switch_names = {s.id: s.name for s in switches}
+        self.pc_names = {pc.id: pc.name for pc in pcs}
+        self.switches = self._index(switches)
+        self.pcs = self._index(pcs)
+        self.connections_by_switch = defaultdict(list)
+        self.connections_by_pc = defaultdict(list)
+        for conn in connections:
+            self.connections_by_switch[conn.switch_id].append(conn)
+            self.connections_by_pc[conn.pc_id].append(conn)
+
+    @staticmethod
+    def _index(rows):
+        """{host key or IP: id}; the lowest id wins for duplicate names or addresses."""
+        index = {}
+        for row in sorted(rows, key=lambda r: r.id):
+            index.setdefault(_host_key(row.name), row.id)
+            if row.ip_address:
+                index.setdefault(row.ip_address.strip(), row.id)
+        return index
+
+    def find_switch(self, *names):
+        return next((self.switches[_host_key(n)] for n in names if n and _host_key(n) in self.switches), None)
+
+    def find_pc(self, *names):
+        return next((self.pcs[_host_key(n)] for n in names if n and _host_key(n) in self.pcs), None)
+
+class _Port:
+    __slots__ = ('interface', 'up', 'description', 'vlan', 'neighbors', 'macs')
+
+    def __init__(self, interface):
+        self.interface, self.up, self.description, self.vlan = interface, None, None, None
+        self.neighbors, self.macs = [], set()
+
+def _observations(parsed, inventory, report):
+    """{switch_id: {port key: _Port}} and the ids of switches with interface status output."""
+    observed = defaultdict(dict)
+    full_status = set()
+    for result in parsed:
+        if result['error']:
+            report['parse_errors'].append({'file': result['file'], 'error': result['error']})
+        hints = hostname_hints(result['file'])
+        for section in result['sections']:
+            switch_id = inventory.find_switch(section['hostname'], *hints)
+            if switch_id is None:
+                report['unmatched_switches'].append({'file': result['file'], 'hostname': section['hostname'], 'kind': section['kind']})
+                continue
+            if section['kind'] == 'interface_status':
+                full_status.add(switch_id)
+            ports = observed[switch_id]
+            for entry in section['entries']:
+                key = normalize_interface(entry['interface'])
+                port = ports.get(key) or ports.setdefault(key, _Port(entry['interface']))
+                if section['kind'] == 'interface_status':
+                    port.up, port.description, port.vlan = entry.get('up'), entry.get('description'), entry.get('vlan')
+                elif section['kind'] == 'neighbors':
+                    port.neighbors.append(entry)
+                elif entry.get('mac'):
+                    port.macs.add(entry['mac'])
+    return observed, full_status
+
+def _resolve_ports(ports, connections):
+    """{port key: [connections]} for the documented connections whose port was observed, and the rest."""
+    by_number = defaultdict(list)
+    for key in ports:
+        number = port_number(key)
+        if number is not None:
+            by_number[number].append(key)
+    resolved, unresolved = defaultdict(list), []
+    for conn in connections:
+        key = normalize_interface(conn.switch_port)
+        if key not in ports and key.isdigit() and len(by_number.get(int(key), ())) == 1:
+            key = by_number[int(key)][0] # A documented '12' is the switch's only port numbered 12
+        if key in ports:
+            resolved[key].append(conn)
+        else:
+            unresolved.append(conn)
+    return resolved, unresolved
+
+def reconcile(parsed, inventory):
+    """Builds the reconciliation report (see the top of this file) from parse_file results."""
+    report = {
+        'files': len(parsed), 'parse_errors': [], 'unmatched_switches': [],
+        'missing': [], 'stale': [], 'mismatched': [], 'port_status': [],
+    }
+    observed, full_status = _observations(parsed, inventory, report)
+    report['switches'] = len(observed)
+
+    for switch_id, ports in sorted(observed.items()):
+        switch = inventory.switch_names[switch_id]
+        resolved, unresolved = _resolve_ports(ports, inventory.connections_by_switch.get(switch_id, []))
+        for key, port in sorted(ports.items()):
+            if port_number(key) is None:
+                continue
+            uplink = len(port.macs) > MAC_UPLINK_THRESHOLD or str(port.vlan).lower() == 'trunk'
+            observed_pc, evidence, unknown = None, [], []
+            for neighbor in port.neighbors:
+                if inventory.find_switch(neighbor['device'], neighbor.get('ip')):
+                    uplink = True
+                    continue
+                pc_id = inventory.find_pc(neighbor['device'], neighbor.get('ip'))
+                if pc_id is not None:
+                    observed_pc = pc_id
+                    evidence.append(neighbor['protocol'])
+                else:
+                    unknown.append(neighbor['device'])
+            if observed_pc is None and port.description:
+                observed_pc = inventory.find_pc(port.description)
+                if observed_pc is not None:
+                    evidence.append('description')
+            base = {'switch': switch, 'interface': port.interface}
+
+            documented = resolved.get(key, [])
+            for conn in documented:
+                if port.up is not None and port.up != conn.is_switch_port_up:
+                    report['port_status'].append(dict(
+                        base, connection_id=conn.id, version_id=conn.version_id, switch_port=conn.switch_port,
+                        is_switch_port_up=conn.is_switch_port_up, observed_up=port.up
+                    ))
+            if documented:
+                documented_pcs = {conn.pc_id for conn in documented}
+                if observed_pc is not None and observed_pc not in documented_pcs:
+                    report['mismatched'].append(dict(
+                        base, reason='different_pc', connection_ids=[c.id for c in documented], switch_port=documented[0].switch_port,
+                        documented_pc=inventory.pc_names.get(documented[0].pc_id), observed_pc=inventory.pc_names[observed_pc], evidence=evidence
+                    ))
+                elif port.up is False and not port.neighbors and not port.macs:
+                    for conn in documented:
+                        report['stale'].append(dict(
+                            base, reason='port_down', connection_id=conn.id, switch_port=conn.switch_port,
+                            pc=inventory.pc_names.get(conn.pc_id)
+                        ))
+                continue
+
+            if observed_pc is not None:
+                elsewhere = inventory.connections_by_pc.get(observed_pc, [])
+                if elsewhere:
+                    report['mismatched'].append(dict(
+                        base, reason='moved', observed_pc=inventory.pc_names[observed_pc], evidence=evidence,
+                        documented_at=[{'connection_id': c.id, 'switch': inventory.switch_names.get(c.switch_id), 'switch_port': c.switch_port} for c in elsewhere]
+                    ))
+                else:
+                    report['missing'].append(dict(base, pc=inventory.pc_names[observed_pc], evidence=evidence))
+            elif not uplink and (port.up or port.neighbors or port.macs):
+                report['missing'].append(dict(
+                    base, pc=None, neighbors=unknown, mac_count=len(port.macs),
+                    evidence=[e for e, seen in (('link_up', port.up), ('neighbor', unknown), ('mac', port.macs)) if seen]
+                ))
+
+        if switch_id in full_status: # The switch listed all its ports: documented ports it lacks are stale
+            for conn in unresolved:
+                report['stale'].append({
+                    'switch': switch, 'interface': None, 'reason': 'port_not_found', 'connection_id': conn.id,
+                    'switch_port': conn.switch_port, 'pc': inventory.pc_names.get(conn.pc_id),
+                })
+
+    report['summary'] = {
+        'files': len(parsed), 'switches': len(observed), 'parse_errors': len(report['parse_errors']),
+        'unmatched_switches': len(report['unmatched_switches']),
+        **{name: len(report[name]) for name in ('missing', 'stale', 'mismatched', 'port_status')},
+    }
+    return report
+
+# --- Applying ---
+def apply_port_status(changes, source_name):
+    """
+    Writes the observed link state of 'port_status' report entries in one bulk update and logs it.
+    version_id makes the update fail (DiscoveryError, nothing written) for connections edited since
+    the snapshot was read.
+    """
+    try:
+        db.session.execute(update(Connection), [
+            {'id': c['connection_id'], 'version_id': c['version_id'], 'is_switch_port_up': c['observed_up']} for c in changes
+        ])
+        SystemLogService.create_log('DISCOVERY', 'Connection', None, source_name, details={
+            'port_status_updates': len(changes),
+            'sample': [{k: c[k] for k in ('connection_id', 'switch', 'switch_port', 'observed_up')} for c in changes[:50]],
+        })
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        raise DiscoveryError('Some connections were changed while the files were reconciled. Nothing was changed; run it again.')
+    except Exception:
+        db.session.rollback()
+        raise
+
+# --- Command ---
+@click.group('discovery')
+def discovery_cli():
+    """Reconciles saved switch output with the documented connections."""
+
+@discovery_cli.command('ingest')
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('--workers', type=int, default=None, help='Parser processes (default: one per CPU).')
+@click.option('--apply', 'apply_changes', is_flag=True, help='Write the observed port up/down states to the connections.')
+@click.option('--output', type=click.Path(dir_okay=False), default=None, help='Write the JSON report here instead of stdout.')
+@with_appcontext
+def discovery_ingest(paths, workers, apply_changes, output):
+    """Parses the saved outputs in PATHS (files or directories) and reports missing, stale and mismatched connections."""
+    started = time.perf_counter()
+    parsed = parse_files(paths, workers)
+    parse_seconds = time.perf_counter() - started
+    report = reconcile(parsed, _Inventory())
+    report['summary']['parse_seconds'] = round(parse_seconds, 3)
+    report['summary']['seconds'] = round(time.perf_counter() - started, 3)
+
+    if apply_changes and report['port_status']:
+        try:
+            apply_port_status(report['port_status'], f"discovery ({report['files']} files)")
+        except DiscoveryError as e:
+            raise click.ClickException(str(e))
+        report['summary']['port_status_applied'] = len(report['port_status'])
+    click.echo(json.dumps(report['summary']), err=True)
+
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text + '\n')
+        click.echo(f"Report written to {output}", err=True)
+    else:
+        click.echo(text)
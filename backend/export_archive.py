@@ -0,0 +1,227 @@
+# backend/export_archive.py
+# This file implements the full CSV export ('GET /export/all'): a ZIP archive with the CSV of
+# every entity, in the same columns as /export/<entity_type>, plus a manifest.json:
+#   {"format": "network-doc-csv-export", "created_at": ..., "revision": ...,
+#    "files": [{"name": "pcs.csv", "entity_type": "pcs", "rows": ..., "bytes": ..., "sha256": ...}, ...]}
+# The live database is first copied with the online backup API (see backup.snapshot_database),
+# so every CSV describes the same moment. Each entity is then written by its own thread, from
+# its own read connection to that copy, into a spooled temporary file. The archive is streamed
+# to the client as the entities finish, so the wall time is close to that of the largest table.
+
+import csv
+import hashlib
+import io
+import json
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.orm import aliased
+from sqlalchemy.pool import NullPool
+
+from .extensions import db
+from .models import Location, Rack, PC, PatchPanel, Switch, Connection, ConnectionHop
+from .backup import snapshot_database, _schema_revision
+from .utils import WIDE_EXPORT_HOPS
+
+ARCHIVE_FORMAT = 'network-doc-csv-export'
+ENTITY_TYPES = ['locations', 'racks', 'pcs', 'patch_panels', 'switches', 'connections']
+SPOOL_BYTES = 8 * 1024 * 1024 # Per-entity CSV kept in memory up to this size, then on disk
+_FLUSH_BYTES = 64 * 1024
+
+# --- Per-entity rows: (header, iterable of rows), read through 'connection' ---
+def _locations(connection):
+    header = ['id', 'name', 'door_number', 'description']
+    stmt = select(Location.id, Location.name, Location.door_number, Location.description).order_by(Location.id)
+    return header, connection.execute(stmt)
+
+def _racks(connection):
+    header = ['id', 'name', 'location_id', 'location_name', 'location_door_number', 'description', 'total_units', 'orientation']
+    stmt = select(
+        Rack.id, Rack.name, Rack.location_id, Location.name, Location.door_number, Rack.description, Rack.total_units, Rack.orientation
+    ).outerjoin(Location, Location.id == Rack.location_id).order_by(Rack.id)
+    return header, connection.execute(stmt)
+
+def _pcs(connection):
+    header = [
+        'id', 'name', 'ip_address', 'username', 'in_domain', 'operating_system', 'model', 'office', 'description',
+        'multi_port', 'type', 'usage', 'row_in_rack', 'units_occupied', 'rack_id', 'rack_name', 'serial_number',
+        'pc_specification', 'monitor_model', 'disk_info'
+    ]
+    stmt = select(
+        PC.id, PC.name, PC.ip_address, PC.username, PC.in_domain, PC.operating_system, PC.model, PC.office, PC.description,
+        PC.multi_port, PC.type, PC.usage, PC.row_in_rack, PC.units_occupied, PC.rack_id, Rack.name, PC.serial_number,
+        PC.pc_specification, PC.monitor_model, PC.disk_info
+    ).outerjoin(Rack, Rack.id == PC.rack_id).order_by(PC.id)
+    return header, connection.execute(stmt)
+
+def _patch_panels(connection):
+    header = ['id', 'name', 'location_id', 'location_name', 'location_door_number', 'row_in_rack', 'units_occupied', 'rack_id', 'rack_name', 'total_ports', 'description']
+    stmt = select(
+        PatchPanel.id, PatchPanel.name, PatchPanel.location_id, Location.name, Location.door_number, PatchPanel.row_in_rack,
+        PatchPanel.units_occupied, PatchPanel.rack_id, Rack.name, PatchPanel.total_ports, PatchPanel.description
+    ).outerjoin(Location, Location.id == PatchPanel.location_id).outerjoin(Rack, Rack.id == PatchPanel.rack_id).order_by(PatchPanel.id)
+    return header, connection.execute(stmt)
+
+def _switches(connection):
+    header = ['id', 'name', 'ip_address', 'location_id', 'location_name', 'location_door_number', 'row_in_rack', 'units_occupied', 'rack_id', 'rack_name', 'total_ports', 'source_port', 'model', 'description', 'usage']
+    stmt = select(
+        Switch.id, Switch.name, Switch.ip_address, Switch.location_id, Location.name, Location.door_number, Switch.row_in_rack,
+        Switch.units_occupied, Switch.rack_id, Rack.name, Switch.total_ports, Switch.source_port, Switch.model, Switch.description, Switch.usage
+    ).outerjoin(Location, Location.id == Switch.location_id).outerjoin(Rack, Rack.id == Switch.rack_id).order_by(Switch.id)
+    return header, connection.execute(stmt)
+
+def _connections(connection):
+    """The wide connections CSV: one row per connection, 11 hop columns per hop (at least WIDE_EXPORT_HOPS groups)."""
+    hop_counts = select(func.count().label('hops')).select_from(ConnectionHop).group_by(ConnectionHop.connection_id).subquery()
+    longest = connection.execute(select(func.max(hop_counts.c.hops))).scalar()
+    hop_groups = max(WIDE_EXPORT_HOPS, longest or 0)
+    header = [
+        'connection_id', 'pc_id', 'pc_name', 'pc_ip_address', 'cable_color', 'cable_label',
+        'switch_id', 'switch_name', 'switch_ip_address', 'switch_port', 'is_switch_port_up',
+    ]
+    for i in range(1, hop_groups + 1):
+        header.extend([
+            f'hop{i}_patch_panel_id', f'hop{i}_patch_panel_name', f'hop{i}_patch_panel_location_name', f'hop{i}_patch_panel_location_door_number',
+            f'hop{i}_patch_panel_row_in_rack', f'hop{i}_patch_panel_rack_id', f'hop{i}_patch_panel_rack_name',
+            f'hop{i}_patch_panel_port', f'hop{i}_is_port_up', f'hop{i}_cable_color', f'hop{i}_cable_label'
+        ])
+    return header, _connection_rows(connection, hop_groups)
+
+def _connection_rows(connection, hop_groups):
+    # Connections and hops are read with two ordered queries and merged, instead of one query per connection
+    connections = connection.execute(select(
+        Connection.id, PC.id, PC.name, PC.ip_address, Connection.cable_color, Connection.cable_label,
+        Switch.id, Switch.name, Switch.ip_address, Connection.switch_port, Connection.is_switch_port_up,
+    ).outerjoin(PC, PC.id == Connection.pc_id).outerjoin(Switch, Switch.id == Connection.switch_id).order_by(Connection.id))
+    hop_location, hop_rack = aliased(Location), aliased(Rack)
+    hop_rows = iter(connection.execute(select(
+        ConnectionHop.connection_id, PatchPanel.id, PatchPanel.name, hop_location.name, hop_location.door_number,
+        PatchPanel.row_in_rack, PatchPanel.rack_id, hop_rack.name, ConnectionHop.patch_panel_port,
+        ConnectionHop.is_port_up, ConnectionHop.cable_color, ConnectionHop.cable_label,
+    ).outerjoin(PatchPanel, PatchPanel.id == ConnectionHop.patch_panel_id).outerjoin(
+        hop_location, hop_location.id == PatchPanel.location_id
+    ).outerjoin(hop_rack, hop_rack.id == PatchPanel.rack_id).order_by(
+        ConnectionHop.connection_id, ConnectionHop.sequence
+    )))
+    hop = next(hop_rows, None)
+    for conn in connections:
+        row = list(conn)
+        while hop is not None and hop[0] < conn[0]: # Hops of connections that do not exist
+            hop = next(hop_rows, None)
+        count = 0
+        while hop is not None and hop[0] == conn[0]:
+            row.extend(hop[1:])
+            count += 1
+            hop = next(hop_rows, None)
+        row.extend([''] * 11 * (hop_groups - count))
+        yield row
+
+ENTITY_ROWS = {
+    'locations': _locations, 'racks': _racks, 'pcs': _pcs,
+    'patch_panels': _patch_panels, 'switches': _switches, 'connections': _connections,
+}
+
+# --- Writing ---
+def _write_entity(engine, entity_type):
+    """Writes one entity's CSV into a spooled temporary file. Returns its manifest entry and the file."""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    digest = hashlib.sha256()
+    rows = 0
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        data = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        digest.update(data)
+        spool.write(data)
+
+    try:
+        with engine.connect() as connection:
+            header, data_rows = ENTITY_ROWS[entity_type](connection)
+            writer.writerow(header)
+            for row in data_rows:
+                writer.writerow(row)
+                rows += 1
+                if buffer.tell() >= _FLUSH_BYTES:
+                    flush()
+            flush()
+    except Exception:
+        spool.close()
+        raise
+    entry = {'name': f'{entity_type}.csv', 'entity_type': entity_type, 'rows': rows, 'bytes': spool.tell(), 'sha256': digest.hexdigest()}
+    spool.seek(0)
+    return entry, spool
+
+class _ChunkSink(io.RawIOBase):
+    """A write-only, unseekable file for zipfile; the written bytes are collected for the response."""
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def stream_export():
+    """
+    Takes a snapshot and returns a generator of ZIP archive chunks. Like backup.stream_archive,
+    the generator does not use the app or the session, so it can run after the request context
+    is gone; the snapshot file is removed when it finishes or is closed.
+    """
+    fd, snapshot_path = tempfile.mkstemp(prefix='export-', suffix='.db')
+    os.close(fd)
+    try:
+        snapshot_database(snapshot_path)
+        with db.engine.connect() as connection:
+            revision = _schema_revision(connection)
+    except Exception:
+        os.remove(snapshot_path)
+        raise
+    return _archive_chunks(snapshot_path, revision)
+
+def _archive_chunks(snapshot_path, revision):
+    engine = create_engine(f'sqlite:///{snapshot_path}', poolclass=NullPool) # One connection per worker, closed after use
+    executor = ThreadPoolExecutor(max_workers=len(ENTITY_TYPES), thread_name_prefix='export')
+    futures = [executor.submit(_write_entity, engine, entity_type) for entity_type in ENTITY_TYPES]
+    sink = _ChunkSink()
+    manifest = {'format': ARCHIVE_FORMAT, 'created_at': datetime.utcnow().isoformat(), 'revision': revision, 'files': []}
+    try:
+        with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for future in as_completed(futures): # Whichever entity is ready first goes first
+                entry, spool = future.result()
+                try:
+                    with archive.open(entry['name'], 'w', force_zip64=True) as member:
+                        while True:
+                            data = spool.read(_FLUSH_BYTES)
+                            if not data:
+                                break
+                            member.write(data)
+                            if len(sink.chunks) > 16:
+                                yield sink.drain()
+                finally:
+                    spool.close()
+                manifest['files'].append(entry)
+                yield sink.drain()
+            manifest['files'].sort(key=lambda e: ENTITY_TYPES.index(e['entity_type']))
+            archive.writestr('manifest.json', json.dumps(manifest, indent=2))
+        yield sink.drain()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        for future in futures:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                future.result()[1].close()
+        engine.dispose()
+        os.remove(snapshot_path)
@@ -2,9 +2,16 @@
 # This file initializes Flask extensions like SQLAlchemy and Flask-Migrate.
 
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 
-# Initialize SQLAlchemy and Migrate instances
-# These will be initialized with the Flask app in app.py
+# Initialize the SQLAlchemy instance
+# It will be initialized with the Flask app in app.py
 db = SQLAlchemy()
-migrate = Migrate()
+
+def init_migrate(app):
+    """
+    Initializes Flask-Migrate for the app. Only the 'flask db' commands need it, and it
+    imports Alembic (a large share of the startup time), so cli.py calls this on first use.
+    """
+    from flask_migrate import Migrate
+    if 'migrate' not in app.extensions:
+        Migrate(app, db)
@@ -0,0 +1,62 @@
+# backend/gunicorn_conf.py
+# Gunicorn settings for the backend, loaded by start.sh with '-c backend/gunicorn_conf.py'.
+# Every setting can be overridden through the environment variables below.
+#
+#   GUNICORN_WORKER_CLASS  sync (default), gthread (threads per worker, for slow I/O-bound
+#                          endpoints such as exports and streams) or gevent (needs the
+#                          'gevent' package, which is not in requirements.txt)
+#   GUNICORN_WORKERS       default: 2 x CPUs + 1, capped at 8
+#   GUNICORN_THREADS       default: 4 for gthread, otherwise 1
+#   GUNICORN_PRELOAD       1 (default, except for gevent) loads the app once in the master
+#   GUNICORN_BIND, GUNICORN_TIMEOUT
+
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+
+# SQLite serializes writers, so past a handful of processes extra workers only add lock contention
+workers = int(os.environ.get('GUNICORN_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+threads = int(os.environ.get('GUNICORN_THREADS', 4 if worker_class == 'gthread' else 1))
+worker_connections = 1000 # gevent only
+
+# With preload the app is imported once and the workers share its memory (and the warmed
+# caches) copy-on-write. gevent must monkey-patch before the app is imported, so it defaults off.
+preload_app = os.environ.get('GUNICORN_PRELOAD', '0' if worker_class == 'gevent' else '1') == '1'
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120')) # Large CSV imports and exports run for a while
+keepalive = 5
+
+def _loaded_app(server):
+    """Returns the Flask app loaded by the master (preload only), or None."""
+    if not server.cfg.preload_app:
+        return None
+    return server.app.wsgi()
+
+def when_ready(server):
+    """Runs in the master once it listens, before any worker is forked: warm the caches."""
+    app = _loaded_app(server)
+    if app is not None:
+        from backend.startup import warm_up
+        warm_up(app)
+
+def post_fork(server, worker):
+    """
+    Drops the pooled database connections inherited from the master without closing them
+    (close=False), so the child never touches the parent's SQLite handles.
+    """
+    app = _loaded_app(server)
+    if app is not None:
+        from backend.extensions import db
+        with app.app_context():
+            db.engine.dispose(close=False)
+
+def child_exit(server, worker):
+    """
+    Removes the Prometheus metric files of a worker that exited, so its gauges stop
+    being reported (counters and histograms it recorded are kept in the totals).
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
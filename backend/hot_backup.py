@@ -0,0 +1,202 @@
+# backend/hot_backup.py
+# This file implements scheduled online backups of the live SQLite database.
+# Every gunicorn worker starts a scheduler thread on its first request (not the master's
+# warm-up requests, see startup.py: a master thread would outlive every fork); the threads
+# compete for an flock on HOT_BACKUP_DIR/.leader, and only the holder takes backups
+# (when it exits, another worker takes over on its next poll).
+# A backup copies the database with the sqlite3 online backup API, HOT_BACKUP_PAGES pages
+# per step with a pause in between, so writers are never blocked for more than one step.
+# The copy is checked, gzip-compressed into HOT_BACKUP_DIR/network_doc-<timestamp>.db.gz
+# and the oldest snapshots beyond HOT_BACKUP_KEEP are deleted. The outcome of the last run
+# is kept in HOT_BACKUP_DIR/status.json, shared by all workers (see /backup/status).
+
+import fcntl
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app, request
+
+from .extensions import db
+from .startup import WARM_UP_ENVIRON
+
+SNAPSHOT_PREFIX = 'network_doc-'
+SNAPSHOT_SUFFIX = '.db.gz'
+MAX_RESTARTS = 3 # Incremental copies restarted by concurrent writes before falling back to a single step
+
+_scheduler_pid = None
+_scheduler_lock = threading.Lock()
+
+class _BackupRestarted(Exception):
+    pass
+
+def _status_path(backup_dir):
+    return os.path.join(backup_dir, 'status.json')
+
+def read_status(backup_dir):
+    """Returns the recorded outcome of the last backups, or an empty dictionary."""
+    try:
+        with open(_status_path(backup_dir)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_status(backup_dir, status):
+    temp_path = _status_path(backup_dir) + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(status, f, indent=2)
+    os.replace(temp_path, _status_path(backup_dir)) # Readers never see a half-written file
+
+def list_snapshots(backup_dir):
+    """Returns the stored snapshots, newest first."""
+    if not os.path.isdir(backup_dir):
+        return []
+    snapshots = []
+    for name in os.listdir(backup_dir):
+        if name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX):
+            stat = os.stat(os.path.join(backup_dir, name))
+            snapshots.append({'name': name, 'size': stat.st_size, 'created_at': stat.st_mtime})
+    return sorted(snapshots, key=lambda s: s['name'], reverse=True)
+
+def _copy_database(db_path, target_path, pages, pause):
+    """
+    Copies db_path to target_path in steps of 'pages' pages. A write from another connection
+    restarts an incremental copy; after MAX_RESTARTS the copy is done in one step instead,
+    which holds the read lock for the whole (short) copy. Returns (pages, restarts).
+    """
+    source = sqlite3.connect(db_path, timeout=30)
+    try:
+        restarts = 0
+        progress = {'remaining': None, 'total': 0}
+        def on_progress(status, remaining, total):
+            nonlocal restarts
+            if progress['remaining'] is not None and remaining >= progress['remaining']: # Restarted, not advancing
+                restarts += 1
+                if restarts >= MAX_RESTARTS:
+                    raise _BackupRestarted()
+            progress.update(remaining=remaining, total=total)
+            if remaining:
+                time.sleep(pause) # The source is unlocked between steps; let writers commit
+
+        target = sqlite3.connect(target_path)
+        try:
+            try:
+                source.backup(target, pages=pages, progress=on_progress)
+            except _BackupRestarted:
+                source.backup(target) # pages=-1: everything in one step
+        finally:
+            target.close()
+        return progress['total'], restarts
+    finally:
+        source.close()
+
+def _check_copy(path):
+    conn = sqlite3.connect(path)
+    try:
+        result = conn.execute("PRAGMA quick_check").fetchone()[0]
+    finally:
+        conn.close()
+    if result != 'ok':
+        raise RuntimeError(f"Backup copy failed its integrity check: {result}")
+
+def _rotate(backup_dir, keep):
+    for snapshot in list_snapshots(backup_dir)[keep:]:
+        os.remove(os.path.join(backup_dir, snapshot['name']))
+
+def run_hot_backup(config, db_path):
+    """
+    Takes one backup of db_path into config['HOT_BACKUP_DIR'] and records the outcome in
+    status.json. Returns the updated status. Errors are recorded rather than raised.
+    """
+    backup_dir = config['HOT_BACKUP_DIR']
+    os.makedirs(backup_dir, exist_ok=True)
+    status = read_status(backup_dir)
+    started = time.time()
+    status.update({'last_started_at': started, 'running': True, 'leader_pid': os.getpid()})
+    _write_status(backup_dir, status)
+
+    copy_path = os.path.join(backup_dir, '.in_progress.db')
+    name = f"{SNAPSHOT_PREFIX}{datetime.utcfromtimestamp(started).strftime('%Y%m%dT%H%M%S')}{SNAPSHOT_SUFFIX}"
+    try:
+        pages, restarts = _copy_database(db_path, copy_path, config['HOT_BACKUP_PAGES'], config['HOT_BACKUP_PAUSE'])
+        copied = time.time()
+        _check_copy(copy_path)
+        with open(copy_path, 'rb') as src, gzip.open(os.path.join(backup_dir, name + '.tmp'), 'wb', compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(os.path.join(backup_dir, name + '.tmp'), os.path.join(backup_dir, name))
+        _rotate(backup_dir, config['HOT_BACKUP_KEEP'])
+        status.update({
+            'last_success_at': time.time(),
+            'last_file': name,
+            'last_size_bytes': os.path.getsize(os.path.join(backup_dir, name)),
+            'last_pages': pages,
+            'last_restarts': restarts,
+            'last_copy_seconds': round(copied - started, 3),
+            'last_error': None,
+        })
+    except Exception as e:
+        status['last_error'] = str(e)
+    finally:
+        if os.path.exists(copy_path):
+            os.remove(copy_path)
+    status.update({'running': False, 'last_finished_at': time.time(), 'last_duration_seconds': round(time.time() - started, 3)})
+    _write_status(backup_dir, status)
+    return status
+
+def _try_become_leader(backup_dir):
+    """Returns the open, exclusively locked leader file, or None if another process holds it."""
+    os.makedirs(backup_dir, exist_ok=True)
+    f = open(os.path.join(backup_dir, '.leader'), 'a')
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f # Kept open (and locked) for the life of the process
+
+def _scheduler_loop(app):
+    config = app.config
+    backup_dir = config['HOT_BACKUP_DIR']
+    interval = config['HOT_BACKUP_INTERVAL']
+    first_due = time.time() + config['HOT_BACKUP_INITIAL_DELAY']
+    with app.app_context():
+        db_path = db.engine.url.database
+    leader = None
+    while True:
+        time.sleep(min(interval, 60))
+        if leader is None:
+            leader = _try_become_leader(backup_dir)
+            if leader is None:
+                continue
+            app.logger.info(f"Process {os.getpid()} now schedules the hot backups")
+        last_started = read_status(backup_dir).get('last_started_at')
+        due = last_started + interval if last_started else first_due
+        if time.time() < due:
+            continue
+        status = run_hot_backup(config, db_path)
+        if status.get('last_error'):
+            app.logger.error(f"Hot backup failed: {status['last_error']}")
+        else:
+            app.logger.info(f"Hot backup {status['last_file']} written in {status['last_duration_seconds']} s")
+
+def _start_scheduler():
+    """before_request hook: starts this worker's scheduler thread on its first request."""
+    global _scheduler_pid
+    if _scheduler_pid == os.getpid() or request.environ.get(WARM_UP_ENVIRON):
+        return
+    with _scheduler_lock:
+        if _scheduler_pid == os.getpid():
+            return
+        _scheduler_pid = os.getpid()
+        app = current_app._get_current_object()
+        threading.Thread(target=_scheduler_loop, args=(app,), name='hot-backup', daemon=True).start()
+
+def init_hot_backups(app):
+    """Registers the scheduler start hook. Scheduled backups are off when HOT_BACKUP_INTERVAL is 0."""
+    if app.config['HOT_BACKUP_INTERVAL'] > 0:
+        app.before_request(_start_scheduler)
@@ -0,0 +1,431 @@
+# backend/import_sync.py
+# This file implements the sync mode of the CSV import ('POST /import/<entity_type>?mode=sync').
+# A normal import only adds rows and skips the ones that already exist. A sync instead makes
+# the table match the file:
+# - rows are matched with the table by natural key (see NATURAL_KEYS);
+# - new keys are inserted, and existing rows whose values differ are updated;
+# - with delete_missing, rows whose key is not in the file are deleted.
+# Only the columns present in the file are compared and written, so a file without e.g. a
+# 'description' column leaves descriptions alone. The table and the name lookups are read
+# once, the plan is computed in memory, and it is applied with bulk statements in a single
+# transaction, together with one SystemLog entry summarising the changes. Updates carry the
+# version_id read with the plan, so a row changed by someone else meanwhile aborts the sync.
+
+import time
+from collections import defaultdict
+
+from sqlalchemy import select, insert, update, delete
+
+from .extensions import db
+from .models import Location, Rack, PC, PatchPanel, Switch, Connection, ConnectionHop
+from .services import SystemLogService
+from .connection_csv import hop_numbers
+
+NATURAL_KEYS = {
+    'locations': ('name',),
+    'racks': ('name', 'location_id'),
+    'pcs': ('name',),
+    'patch_panels': ('name',),
+    'switches': ('name',),
+    'connections': ('pc_id', 'switch_id', 'switch_port'),
+}
+MODELS = {
+    'locations': Location, 'racks': Rack, 'pcs': PC,
+    'patch_panels': PatchPanel, 'switches': Switch, 'connections': Connection,
+}
+LOG_ENTITY_TYPES = {
+    'locations': 'Location', 'racks': 'Rack', 'pcs': 'PC',
+    'patch_panels': 'Patch Panel', 'switches': 'Switch', 'connections': 'Connection',
+}
+LOG_SAMPLE_SIZE = 50 # Names listed per kind of change in the SystemLog entry
+DELETE_CHUNK = 500 # Ids per 'IN (...)' list, well below SQLite's bound parameter limit
+
+# --- Value parsing ---
+def _text(value):
+    return value if value else None
+
+def _bool(default):
+    def parse(value):
+        return value.lower() == 'true' if value else default
+    return parse
+
+def _int(default):
+    def parse(value):
+        return int(value) if value else default
+    return parse
+
+def _text_or(default):
+    def parse(value):
+        return value or default
+    return parse
+
+# Plain columns: CSV column (= model attribute) -> parser. References (location_name, rack_name,
+# pc_name, ...) and the rack placement are resolved separately.
+FIELDS = {
+    'locations': {'door_number': _text, 'description': _text},
+    'racks': {'description': _text, 'total_units': _int(42), 'orientation': _text_or('bottom-up')},
+    'pcs': {
+        'ip_address': _text, 'username': _text, 'in_domain': _bool(False), 'operating_system': _text,
+        'model': _text, 'office': _text, 'description': _text, 'multi_port': _bool(False),
+        'type': _text_or('Workstation'), 'usage': _text, 'serial_number': _text, 'pc_specification': _text,
+        'monitor_model': _text, 'disk_info': _text,
+    },
+    'patch_panels': {'total_ports': _int(1), 'description': _text},
+    'switches': {
+        'ip_address': _text, 'total_ports': _int(1), 'source_port': _text, 'model': _text,
+        'description': _text, 'usage': _text,
+    },
+    'connections': {
+        'is_switch_port_up': _bool(True), 'cable_color': _text, 'cable_label': _text, 'wall_point_label': _text,
+        'wall_point_cable_color': _text, 'wall_point_cable_label': _text,
+    },
+}
+PLACED_ENTITIES = ('pcs', 'patch_panels', 'switches')
+
+class SyncError(Exception):
+    """A sync that cannot be applied at all (as opposed to per-row errors)."""
+
+class _Lookups:
+    """Name -> id maps of every table a row can reference, read once per sync."""
+    def __init__(self, connection):
+        def names(model):
+            return {name: id_ for id_, name in connection.execute(select(model.id, model.name).order_by(model.id.desc()))}
+        # Ordered by id descending, so for duplicate rack names the lowest id wins, as with .first() in import_data
+        self.locations = names(Location)
+        self.racks = names(Rack)
+        self.pcs = names(PC)
+        self.switches = names(Switch)
+        self.patch_panels = names(PatchPanel)
+        self.rack_sizes = dict(connection.execute(select(Rack.id, Rack.total_units)).all())
+
+class _Plan:
+    def __init__(self):
+        self.inserts = [] # (row number, label, values)
+        self.updates = [] # (row number, label, values including id and version_id, changed fields)
+        self.deletes = [] # (id, label)
+        self.new_hops = {} # Index into inserts -> hops of the new connection
+        self.hop_replacements = {} # Connection id -> its new hops (replacing all of its current ones)
+        self.unchanged = 0
+        self.errors = []
+
+    def error(self, row, message):
+        self.errors.append(f"Row {row}: {message}" if row else message)
+
+    def to_dict(self):
+        return {
+            'inserted': len(self.inserts),
+            'updated': len(self.updates),
+            'deleted': len(self.deletes),
+            'unchanged': self.unchanged,
+            'error_count': len(self.errors),
+        }
+
+# --- Row parsing ---
+def _parse_row(entity_type, row_dict, header, lookups, existing):
+    """
+    Parses one file row into (natural key, label, values) where values holds only the
+    columns the file manages. Raises ValueError for rows that cannot be synced.
+    :param existing: The table's rows by natural key (a PC's type, when the file has no 'type' column).
+    """
+    values = {}
+    for column, parse in FIELDS[entity_type].items():
+        if column in header:
+            try:
+                values[column] = parse(row_dict.get(column))
+            except ValueError:
+                raise ValueError(f"Invalid '{column}' value '{row_dict.get(column)}'.")
+
+    if entity_type == 'connections':
+        pc_name, switch_name, switch_port = row_dict.get('pc_name'), row_dict.get('switch_name'), row_dict.get('switch_port')
+        if not pc_name or not switch_name or not switch_port:
+            raise ValueError("Missing 'pc_name', 'switch_name', or 'switch_port'.")
+        if pc_name not in lookups.pcs:
+            raise ValueError(f"PC '{pc_name}' not found.")
+        if switch_name not in lookups.switches:
+            raise ValueError(f"Switch '{switch_name}' not found.")
+        values.update(pc_id=lookups.pcs[pc_name], switch_id=lookups.switches[switch_name], switch_port=switch_port)
+        return (values['pc_id'], values['switch_id'], switch_port), f"{pc_name} -> {switch_name}:{switch_port}", values
+
+    name = row_dict.get('name')
+    if not name:
+        raise ValueError("Missing 'name' field.")
+    values['name'] = name
+    if entity_type in ('racks', 'patch_panels', 'switches'):
+        location_name = row_dict.get('location_name')
+        if not location_name:
+            raise ValueError("Missing 'location_name' field.")
+        if location_name not in lookups.locations:
+            raise ValueError(f"Location '{location_name}' not found.")
+        values['location_id'] = lookups.locations[location_name]
+    key = (name, values['location_id']) if entity_type == 'racks' else (name,)
+    if entity_type in PLACED_ENTITIES and 'rack_name' in header:
+        device_type = None
+        if entity_type == 'pcs': # The file's type, else the one the row keeps (new rows get the column default)
+            device_type = values['type'] if 'type' in header else (existing.get(key) or {}).get('type', 'Workstation')
+        values.update(_parse_placement(row_dict, lookups, device_type))
+    return key, name, values
+
+def _parse_placement(row_dict, lookups, device_type=None):
+    """The rack fields of a row; device_type is a PC's type (None for other devices)."""
+    rack_name = row_dict.get('rack_name')
+    if not rack_name or device_type not in (None, 'Server'):
+        return {'rack_id': None, 'row_in_rack': None, 'units_occupied': 1} # Only servers are rack-mounted PCs
+    if rack_name not in lookups.racks:
+        raise ValueError(f"Rack '{rack_name}' not found.")
+    try:
+        row_in_rack = int(row_dict.get('row_in_rack') or 0)
+        units_occupied = int(row_dict.get('units_occupied') or 1)
+    except ValueError:
+        row_in_rack = units_occupied = 0
+    if row_in_rack < 1 or units_occupied < 1:
+        raise ValueError("Invalid 'row_in_rack' or 'units_occupied'. Must be positive integers for rack-mounted devices.")
+    return {'rack_id': lookups.racks[rack_name], 'row_in_rack': row_in_rack, 'units_occupied': units_occupied}
+
+def _parse_hops(row_dict, numbers, lookups):
+    """The hops of a connection row, as (sequence, patch_panel_id, port, is_port_up, cable_color, cable_label) tuples."""
+    hops = []
+    for number in numbers:
+        pp_name = row_dict.get(f'hop{number}_patch_panel_name')
+        pp_port = row_dict.get(f'hop{number}_patch_panel_port')
+        if not pp_name or not pp_port:
+            continue
+        if pp_name not in lookups.patch_panels:
+            raise ValueError(f"Hop {number}: Patch Panel '{pp_name}' not found.")
+        hops.append((
+            number - 1, lookups.patch_panels[pp_name], pp_port,
+            _bool(True)(row_dict.get(f'hop{number}_is_port_up')),
+            _text(row_dict.get(f'hop{number}_cable_color')), _text(row_dict.get(f'hop{number}_cable_label')),
+        ))
+    return tuple(hops)
+
+def _loose_key(entity_type, row_dict, lookups):
+    """What identifies a row that failed to parse: its name, or for connections its key if it resolves."""
+    if entity_type != 'connections':
+        return row_dict.get('name')
+    return (lookups.pcs.get(row_dict.get('pc_name')), lookups.switches.get(row_dict.get('switch_name')), row_dict.get('switch_port'))
+
+# --- Planning ---
+def _referenced_ids(connection, entity_type):
+    """Ids of the rows of the entity's table that rows of other tables still point to."""
+    if entity_type == 'locations':
+        columns = (Rack.location_id, PatchPanel.location_id, Switch.location_id)
+    elif entity_type == 'racks':
+        columns = (PC.rack_id, PatchPanel.rack_id, Switch.rack_id)
+    elif entity_type == 'pcs':
+        columns = (Connection.pc_id,)
+    elif entity_type == 'switches':
+        columns = (Connection.switch_id,)
+    elif entity_type == 'patch_panels':
+        columns = (ConnectionHop.patch_panel_id,)
+    else:
+        return set()
+    referenced = set()
+    for column in columns:
+        referenced.update(connection.execute(select(column).where(column.isnot(None)).distinct()).scalars())
+    return referenced
+
+def _occupied_units(connection, entity_type, kept_rows):
+    """
+    (rack_id, unit) -> device label for the units that stay occupied whatever the file says:
+    devices of the other placed tables, and the rows of this table the sync does not move.
+    """
+    occupied = {}
+    def claim(label, rack_id, row_in_rack, units_occupied):
+        for unit in range(row_in_rack, row_in_rack + (units_occupied or 1)):
+            occupied[(rack_id, unit)] = label
+
+    for other_type, model, label in (('pcs', PC, 'PC'), ('patch_panels', PatchPanel, 'Patch Panel'), ('switches', Switch, 'Switch')):
+        if other_type == entity_type:
+            continue
+        stmt = select(model.name, model.rack_id, model.row_in_rack, model.units_occupied).where(
+            model.rack_id.isnot(None), model.row_in_rack.isnot(None)
+        )
+        if model is PC:
+            stmt = stmt.where(PC.type == 'Server')
+        for name, rack_id, row_in_rack, units_occupied in connection.execute(stmt):
+            claim(f"{label} '{name}'", rack_id, row_in_rack, units_occupied)
+    for row in kept_rows:
+        if row['rack_id'] and row['row_in_rack'] is not None and (entity_type != 'pcs' or row['type'] == 'Server'):
+            claim(f"'{row['name']}'", row['rack_id'], row['row_in_rack'], row['units_occupied'])
+    return occupied
+
+def plan_sync(entity_type, rows, header, delete_missing=False):
+    """
+    Computes the changes that make the entity's table match the file.
+    :param rows: (row number, row dictionary) pairs, numbered as in import_data's messages.
+    :param header: The file's (stripped) column names.
+    :param delete_missing: Also delete the rows whose key is not in the file.
+    :return: A _Plan. Rows that cannot be synced are listed in plan.errors and left untouched.
+    """
+    if entity_type not in MODELS:
+        raise ValueError('Invalid entity type for import.')
+    header = set(header)
+    model = MODELS[entity_type]
+    connection = db.session.connection() # Core reads in the sync's transaction; no ORM objects are built
+    lookups = _Lookups(connection)
+    key_columns = NATURAL_KEYS[entity_type]
+    columns = list(dict.fromkeys(
+        ['id', 'version_id', *key_columns, *(c for c in FIELDS[entity_type] if c in header)]
+        + (['name', 'location_id'] if entity_type in ('patch_panels', 'switches') else [])
+        + (['rack_id', 'row_in_rack', 'units_occupied'] if entity_type in PLACED_ENTITIES else [])
+        + (['type'] if entity_type == 'pcs' else [])
+    ))
+    existing = {}
+    for values in connection.execute(select(*(model.__table__.c[c] for c in columns)).order_by(model.id.desc())):
+        row = dict(zip(columns, values))
+        existing[tuple(row[c] for c in key_columns)] = row # Duplicate keys: the lowest id is matched
+    numbers = hop_numbers(header) if entity_type == 'connections' else [] # Hop column groups in the file
+    existing_hops = defaultdict(tuple)
+    if numbers:
+        hop_columns = (ConnectionHop.connection_id, ConnectionHop.sequence, ConnectionHop.patch_panel_id, ConnectionHop.patch_panel_port,
+                       ConnectionHop.is_port_up, ConnectionHop.cable_color, ConnectionHop.cable_label)
+        for hop in connection.execute(select(*hop_columns).order_by(ConnectionHop.connection_id, ConnectionHop.sequence)):
+            existing_hops[hop[0]] += (tuple(hop[1:]),)
+
+    plan = _Plan()
+    seen = {} # Key -> file row
+    named = set() # Names (connections: keys) of every row, valid or not; these are never deleted
+    parsed = [] # (row number, key, label, values, hops)
+    for row, row_dict in rows:
+        try:
+            key, label, values = _parse_row(entity_type, row_dict, header, lookups, existing)
+            if key in seen:
+                raise ValueError(f"'{label}' is also in row {seen[key]}. Skipped.")
+            seen[key] = row
+            hops = _parse_hops(row_dict, numbers, lookups) if numbers else None
+        except ValueError as e:
+            plan.error(row, str(e))
+            named.add(_loose_key(entity_type, row_dict, lookups))
+            continue
+        named.add(key if entity_type == 'connections' else label)
+        parsed.append((row, key, label, values, hops))
+
+    referenced = _referenced_ids(connection, entity_type) if delete_missing else set()
+    kept = [r for k, r in existing.items() if k not in seen]
+    if delete_missing:
+        for row in kept:
+            if entity_type == 'connections':
+                label, name = f"connection {row['id']}", (row['pc_id'], row['switch_id'], row['switch_port'])
+            else:
+                label = name = row['name']
+            if name in named:
+                continue # Its row in the file has errors
+            if row['id'] in referenced:
+                plan.error(None, f"'{label}' is not in the file but is still referenced by other records. Not deleted.")
+            else:
+                plan.deletes.append((row['id'], label))
+        deleted_ids = {id_ for id_, _ in plan.deletes}
+        kept = [r for r in kept if r['id'] not in deleted_ids]
+
+    occupied = None
+    if entity_type in PLACED_ENTITIES and 'rack_name' in header:
+        occupied = _occupied_units(connection, entity_type, kept)
+
+    for row, key, label, values, hops in parsed:
+        current = existing.get(key)
+        if occupied is not None and values['rack_id']:
+            rack_size = lookups.rack_sizes.get(values['rack_id']) or 0
+            units = range(values['row_in_rack'], values['row_in_rack'] + values['units_occupied'])
+            taken = next((occupied[(values['rack_id'], u)] for u in units if (values['rack_id'], u) in occupied), None)
+            if taken:
+                plan.error(row, f"Rack unit(s) is already occupied by {taken}. '{label}' skipped.")
+                if current and current['rack_id'] and current['row_in_rack'] is not None: # Not moved, so it keeps its units
+                    for unit in range(current['row_in_rack'], current['row_in_rack'] + (current['units_occupied'] or 1)):
+                        occupied.setdefault((current['rack_id'], unit), f"'{current['name']}'")
+                continue
+            if units.stop - 1 > rack_size:
+                plan.error(row, f"'{label}' would occupy units {units.start}-{units.stop - 1}, but the rack has {rack_size}U. Skipped.")
+                continue
+            for unit in units:
+                occupied[(values['rack_id'], unit)] = f"'{label}'"
+
+        if current is None:
+            plan.inserts.append((row, label, values))
+            if hops:
+                plan.new_hops[len(plan.inserts) - 1] = hops
+            continue
+        changed = sorted(column for column, value in values.items() if current[column] != value)
+        hops_changed = hops is not None and hops != existing_hops[current['id']]
+        if changed:
+            plan.updates.append((row, label, dict({c: values[c] for c in changed}, id=current['id'], version_id=current['version_id']), changed))
+        if hops_changed:
+            plan.hop_replacements[current['id']] = hops
+            if not changed:
+                plan.updates.append((row, label, None, ['hops']))
+        if not changed and not hops_changed:
+            plan.unchanged += 1
+    return plan
+
+# --- Applying ---
+def _hop_values(connection_id, hops):
+    return [
+        {'connection_id': connection_id, 'sequence': sequence, 'patch_panel_id': pp_id, 'patch_panel_port': port,
+         'is_port_up': is_up, 'cable_color': color, 'cable_label': label}
+        for sequence, pp_id, port, is_up, color, label in hops
+    ]
+
+def _delete_ids(column, ids):
+    model = column.class_
+    for i in range(0, len(ids), DELETE_CHUNK):
+        db.session.execute(
+            delete(model).where(column.in_(ids[i:i + DELETE_CHUNK])).execution_options(synchronize_session=False)
+        )
+
+def _log_details(plan, delete_missing, seconds):
+    return {
+        'mode': 'sync',
+        'delete_missing': delete_missing,
+        'counts': plan.to_dict(),
+        'seconds': round(seconds, 3),
+        'inserted': [label for _, label, _ in plan.inserts[:LOG_SAMPLE_SIZE]],
+        'updated': {label: changed for _, label, _, changed in plan.updates[:LOG_SAMPLE_SIZE]},
+        'deleted': [label for _, label in plan.deletes[:LOG_SAMPLE_SIZE]],
+        'truncated': max(len(plan.inserts), len(plan.updates), len(plan.deletes)) > LOG_SAMPLE_SIZE,
+    }
+
+def apply_sync(entity_type, plan, source_name, delete_missing=False, started=None):
+    """
+    Applies a plan from plan_sync in the current session's transaction and commits it
+    together with a SYNC SystemLog entry. Raises SyncError (after rolling back) if a row
+    to update was changed by another request since the plan was made.
+    """
+    from sqlalchemy.orm.exc import StaleDataError
+
+    model = MODELS[entity_type]
+    try:
+        new_hops = []
+        if plan.inserts:
+            values = [v for _, _, v in plan.inserts]
+            if entity_type == 'connections':
+                ids = db.session.execute(insert(model).returning(model.id, sort_by_parameter_order=True), values).scalars().all()
+                for index, hops in plan.new_hops.items():
+                    new_hops += _hop_values(ids[index], hops)
+            else:
+                db.session.execute(insert(model), values)
+        updates = [v for _, _, v, _ in plan.updates if v is not None]
+        if updates:
+            db.session.execute(update(model), updates)
+        if plan.hop_replacements:
+            _delete_ids(ConnectionHop.connection_id, list(plan.hop_replacements))
+            for connection_id, hops in plan.hop_replacements.items():
+                new_hops += _hop_values(connection_id, hops)
+        if new_hops:
+            db.session.execute(insert(ConnectionHop), new_hops)
+        if plan.deletes:
+            ids = [id_ for id_, _ in plan.deletes]
+            if entity_type == 'connections':
+                _delete_ids(ConnectionHop.connection_id, ids)
+            _delete_ids(model.id, ids)
+
+        seconds = time.perf_counter() - started if started is not None else 0.0
+        SystemLogService.create_log(
+            'SYNC', LOG_ENTITY_TYPES[entity_type], None, source_name,
+            details=_log_details(plan, delete_missing, seconds)
+        )
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        raise SyncError('Some records were changed by another request during the sync. Nothing was changed; run the sync again.')
+    except Exception:
+        db.session.rollback()
+        raise
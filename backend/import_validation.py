@@ -0,0 +1,301 @@
+# backend/import_validation.py
+# This file implements the dry-run mode of the CSV import ('POST /import/<entity_type>?dry_run=1').
+# The whole file is checked against one read snapshot of the database, loaded with one
+# query per table into in-memory indexes (names, occupied rack units, occupied ports),
+# and against the rows before it in the same file. Nothing is written, and no query runs
+# per row. The checks follow the rules import_data applies row by row (including the port,
+# PC and rack unit conflicts), so the report predicts which rows it will skip.
+
+from collections import Counter
+
+from sqlalchemy import select
+
+from .extensions import db
+from .models import Location, Rack, PC, PatchPanel, Switch, Connection, ConnectionHop
+from .connection_csv import hop_numbers
+
+# A conflict makes import_data skip (or fail) the row; a warning only drops part of it
+CONFLICT = 'conflict'
+WARNING = 'warning'
+
+class DbSnapshot:
+    """
+    The rows of every inventory table that an import is checked against, read in a single
+    read transaction so all indexes describe the same moment.
+    """
+    def __init__(self):
+        with db.engine.connect() as connection:
+            connection.exec_driver_sql("BEGIN") # One snapshot for all the selects below; rolled back on close
+            def rows(*columns):
+                return connection.execute(select(*columns)).all()
+
+            self.locations = {name: id_ for id_, name in rows(Location.id, Location.name)}
+            racks = rows(Rack.id, Rack.name, Rack.location_id, Rack.total_units)
+            pcs = rows(PC.id, PC.name, PC.type, PC.multi_port, PC.rack_id, PC.row_in_rack, PC.units_occupied)
+            patch_panels = rows(PatchPanel.id, PatchPanel.name, PatchPanel.total_ports, PatchPanel.rack_id, PatchPanel.row_in_rack, PatchPanel.units_occupied)
+            switches = rows(Switch.id, Switch.name, Switch.total_ports, Switch.rack_id, Switch.row_in_rack, Switch.units_occupied)
+            connections = rows(Connection.id, Connection.pc_id, Connection.switch_id, Connection.switch_port)
+            hops = rows(ConnectionHop.connection_id, ConnectionHop.patch_panel_id, ConnectionHop.patch_panel_port)
+
+        # import_data resolves racks by name alone with .first(), i.e. the lowest id
+        self.racks_by_name = {}
+        for rack in sorted(racks, key=lambda r: r.id):
+            self.racks_by_name.setdefault(rack.name, rack)
+        self.rack_keys = {(rack.name, rack.location_id) for rack in racks}
+        self.pcs = {pc.name: pc for pc in pcs}
+        self.pc_names = {pc.id: pc.name for pc in pcs}
+        self.patch_panels = {pp.name: pp for pp in patch_panels}
+        self.switches = {s.name: s for s in switches}
+
+        # (rack_id, unit) -> (device type, device name), for every unit a device covers
+        self.rack_units = {}
+        for device_type, devices in (('pc', pcs), ('patch_panel', patch_panels), ('switch', switches)):
+            for device in devices:
+                if device.rack_id and device.row_in_rack is not None and (device_type != 'pc' or device.type == 'Server'):
+                    for unit in range(device.row_in_rack, device.row_in_rack + (device.units_occupied or 1)):
+                        self.rack_units[(device.rack_id, unit)] = (device_type, device.name)
+
+        pc_by_connection = {c.id: c.pc_id for c in connections}
+        self.connection_keys = {(c.pc_id, c.switch_id, c.switch_port) for c in connections}
+        self.switch_ports = {(c.switch_id, c.switch_port): self.pc_names.get(c.pc_id) for c in connections}
+        self.patch_panel_ports = {
+            (h.patch_panel_id, h.patch_panel_port): self.pc_names.get(pc_by_connection.get(h.connection_id)) for h in hops
+        }
+        self.connected_pcs = {c.pc_id for c in connections}
+
+class ImportReport:
+    """Collects the findings of a dry run and the would-be outcome of every row."""
+    def __init__(self, entity_type, row_count):
+        self.entity_type = entity_type
+        self.row_count = row_count
+        self.findings = []
+        self.outcomes = Counter()
+        self._row_conflicts = 0
+
+    def add(self, severity, row, code, message):
+        self.findings.append({'severity': severity, 'row': row, 'code': code, 'message': message})
+        if severity == CONFLICT:
+            self._row_conflicts += 1
+
+    def conflict(self, row, code, message):
+        self.add(CONFLICT, row, code, message)
+
+    def warning(self, row, code, message):
+        self.add(WARNING, row, code, message)
+
+    def begin_row(self):
+        self._row_conflicts = 0
+
+    def end_row(self, outcome):
+        """Records what import_data would do with the row: 'create', 'update' or, after a conflict, 'skip'."""
+        self.outcomes['skip' if self._row_conflicts else outcome] += 1
+
+    def to_dict(self):
+        conflicts = [f for f in self.findings if f['severity'] == CONFLICT]
+        warnings = [f for f in self.findings if f['severity'] == WARNING]
+        return {
+            'dry_run': True,
+            'entity_type': self.entity_type,
+            'row_count': self.row_count,
+            'would_create': self.outcomes['create'],
+            'would_update': self.outcomes['update'],
+            'would_skip': self.outcomes['skip'],
+            'conflict_count': len(conflicts),
+            'warning_count': len(warnings),
+            'summary': dict(Counter(f['code'] for f in self.findings)),
+            'conflicts': conflicts,
+            'warnings': warnings,
+        }
+
+def _positive_int(value):
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number >= 1 else None
+
+class _RackUnits:
+    """Rack units taken in the database plus those claimed by earlier rows of the file."""
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.claimed = {}
+
+    def check(self, report, row, device_type, name, label, rack, row_in_rack, units):
+        if row_in_rack + units - 1 > (rack.total_units or 0):
+            report.conflict(row, 'rack_units_out_of_range',
+                            f"{label} would occupy units {row_in_rack}-{row_in_rack + units - 1}, but rack '{rack.name}' has {rack.total_units}U.")
+        for unit in range(row_in_rack, row_in_rack + units):
+            key = (rack.id, unit)
+            occupant = self.snapshot.rack_units.get(key)
+            if occupant and occupant != (device_type, name): # A PC update may keep its own units
+                report.conflict(row, 'rack_units_occupied',
+                                f"Unit {unit} of rack '{rack.name}' is already occupied by {occupant[0].replace('_', ' ')} '{occupant[1]}'.")
+                return
+            if key in self.claimed and self.claimed[key][1:] != (device_type, name):
+                report.conflict(row, 'rack_units_claimed_in_file',
+                                f"Unit {unit} of rack '{rack.name}' is also claimed by row {self.claimed[key][0]}.")
+                return
+        for unit in range(row_in_rack, row_in_rack + units):
+            self.claimed[(rack.id, unit)] = (row, device_type, name)
+
+def _check_placement(report, row, snapshot, rack_units, row_dict, device_type, name, label):
+    """The rack_name/row_in_rack/units_occupied checks shared by servers, patch panels and switches."""
+    rack_name = row_dict.get('rack_name')
+    if not rack_name:
+        return
+    rack = snapshot.racks_by_name.get(rack_name)
+    if not rack:
+        report.warning(row, 'rack_not_found', f"Rack '{rack_name}' not found; {label} would be imported without a rack.")
+        return
+    row_in_rack = _positive_int(row_dict.get('row_in_rack'))
+    units = _positive_int(row_dict.get('units_occupied', 1))
+    if row_in_rack is None or units is None:
+        report.conflict(row, 'invalid_rack_position', f"Invalid 'row_in_rack' or 'units_occupied' for {label}; both must be positive integers.")
+        return
+    rack_units.check(report, row, device_type, name, label, rack, row_in_rack, units)
+
+def validate_import(entity_type, rows):
+    """
+    Checks every row of an import file without writing anything.
+    :param entity_type: One of the entity types accepted by import_data.
+    :param rows: (row number, row dictionary keyed by the stripped header) pairs, numbered
+        as in import_data's messages (the header is row 1).
+    :return: A report dictionary (see ImportReport.to_dict).
+    """
+    if entity_type not in ('locations', 'racks', 'pcs', 'patch_panels', 'switches', 'connections'):
+        raise ValueError('Invalid entity type for import.')
+    snapshot = DbSnapshot()
+    report = ImportReport(entity_type, len(rows))
+    rack_units = _RackUnits(snapshot)
+    first_row_of = {} # Natural key -> first file row using it
+    switch_ports = {} # (switch_id, port) -> file row
+    patch_panel_ports = {}
+    connected_pcs = {} # pc_id -> file row, for single-port PCs
+
+    def duplicate(row, key, label, updates=False):
+        if key in first_row_of:
+            if updates: # import_data updates the row again
+                report.warning(row, 'duplicate_in_file', f"{label} is also defined in row {first_row_of[key]}; this row would update it again.")
+                return False
+            report.conflict(row, 'duplicate_in_file', f"{label} is also defined in row {first_row_of[key]}.")
+            return True
+        first_row_of[key] = row
+        return False
+
+    for row, row_dict in rows:
+        report.begin_row()
+        outcome = 'create'
+        name = row_dict.get('name')
+
+        if entity_type == 'locations':
+            if not name:
+                report.conflict(row, 'missing_field', "Missing 'name' field.")
+            elif not duplicate(row, name, f"Location '{name}'") and name in snapshot.locations:
+                report.conflict(row, 'already_exists', f"Location '{name}' already exists.")
+
+        elif entity_type == 'racks':
+            location_name = row_dict.get('location_name')
+            if not name or not location_name:
+                report.conflict(row, 'missing_field', "Missing 'name' or 'location_name' field.")
+            elif location_name not in snapshot.locations:
+                report.conflict(row, 'location_not_found', f"Location '{location_name}' not found for Rack '{name}'.")
+            elif not duplicate(row, (name, location_name), f"Rack '{name}' in '{location_name}'"):
+                if (name, snapshot.locations[location_name]) in snapshot.rack_keys:
+                    report.conflict(row, 'already_exists', f"Rack '{name}' already exists in this location.")
+            if row_dict.get('total_units') and _positive_int(row_dict['total_units']) is None:
+                report.conflict(row, 'invalid_number', f"Invalid 'total_units' value '{row_dict['total_units']}'.")
+
+        elif entity_type == 'pcs':
+            if not name:
+                report.conflict(row, 'missing_field', "Missing 'name' field.")
+            else:
+                updated = name in snapshot.pcs or name in first_row_of # import_data updates existing PCs
+                duplicate(row, name, f"PC '{name}'", updates=True)
+                outcome = 'update' if updated else 'create'
+                if row_dict.get('type', 'Workstation') == 'Server':
+                    _check_placement(report, row, snapshot, rack_units, row_dict, 'pc', name, f"PC '{name}'")
+
+        elif entity_type in ('patch_panels', 'switches'):
+            label = 'Patch Panel' if entity_type == 'patch_panels' else 'Switch'
+            existing = snapshot.patch_panels if entity_type == 'patch_panels' else snapshot.switches
+            location_name = row_dict.get('location_name')
+            if not name or not location_name:
+                report.conflict(row, 'missing_field', "Missing 'name' or 'location_name' field.")
+            elif location_name not in snapshot.locations:
+                report.conflict(row, 'location_not_found', f"Location '{location_name}' not found for {label} '{name}'.")
+            elif not duplicate(row, name, f"{label} '{name}'"):
+                if name in existing:
+                    report.conflict(row, 'already_exists', f"{label} '{name}' already exists.")
+                else:
+                    _check_placement(report, row, snapshot, rack_units, row_dict, 'switch' if entity_type == 'switches' else 'patch_panel', name, f"{label} '{name}'")
+            if row_dict.get('total_ports') and _positive_int(row_dict['total_ports']) is None:
+                report.conflict(row, 'invalid_number', f"Invalid 'total_ports' value '{row_dict['total_ports']}'.")
+
+        elif entity_type == 'connections':
+            _check_connection(report, row, row_dict, snapshot, switch_ports, patch_panel_ports, connected_pcs, duplicate)
+
+        report.end_row(outcome)
+    return report.to_dict()
+
+def port_in_range(port, total_ports):
+    """False for a numeric port beyond total_ports. Shared with import_data."""
+    number = _positive_int(port)
+    return number is None or not total_ports or number <= total_ports # Non-numeric port names are not range-checked
+
+def _check_connection(report, row, row_dict, snapshot, switch_ports, patch_panel_ports, connected_pcs, duplicate):
+    pc_name = row_dict.get('pc_name')
+    switch_name = row_dict.get('switch_name')
+    switch_port = row_dict.get('switch_port')
+    if not pc_name or not switch_name or not switch_port:
+        report.conflict(row, 'missing_field', "Missing 'pc_name', 'switch_name', or 'switch_port'.")
+        return
+    pc = snapshot.pcs.get(pc_name)
+    switch = snapshot.switches.get(switch_name)
+    if not pc:
+        report.conflict(row, 'pc_not_found', f"PC '{pc_name}' not found.")
+    if not switch:
+        report.conflict(row, 'switch_not_found', f"Switch '{switch_name}' not found.")
+    if not pc or not switch:
+        return
+    if duplicate(row, (pc.id, switch.id, switch_port), f"The connection of PC '{pc_name}' to '{switch_name}' port {switch_port}"):
+        return
+    if (pc.id, switch.id, switch_port) in snapshot.connection_keys:
+        report.conflict(row, 'already_exists', f"Connection between PC '{pc_name}', Switch '{switch_name}' port '{switch_port}' already exists.")
+        return
+
+    if not port_in_range(switch_port, switch.total_ports):
+        report.conflict(row, 'port_out_of_range', f"Switch '{switch_name}' has {switch.total_ports} ports; port {switch_port} does not exist.")
+    port_key = (switch.id, switch_port)
+    if port_key in snapshot.switch_ports:
+        report.conflict(row, 'port_occupied', f"Port {switch_port} of switch '{switch_name}' is already used by PC '{snapshot.switch_ports[port_key]}'.")
+    elif port_key in switch_ports:
+        report.conflict(row, 'port_claimed_in_file', f"Port {switch_port} of switch '{switch_name}' is also claimed by row {switch_ports[port_key]}.")
+    else:
+        switch_ports[port_key] = row
+
+    if not pc.multi_port:
+        if pc.id in snapshot.connected_pcs:
+            report.conflict(row, 'pc_already_connected', f"PC '{pc_name}' is not multi-port and already has a connection.")
+        elif pc.id in connected_pcs:
+            report.conflict(row, 'pc_connected_in_file', f"PC '{pc_name}' is not multi-port and is also connected in row {connected_pcs[pc.id]}.")
+        else:
+            connected_pcs[pc.id] = row
+
+    for j in [number - 1 for number in hop_numbers(row_dict)]:
+        pp_name = row_dict.get(f'hop{j+1}_patch_panel_name')
+        pp_port = row_dict.get(f'hop{j+1}_patch_panel_port')
+        if not pp_name or not pp_port:
+            continue
+        patch_panel = snapshot.patch_panels.get(pp_name)
+        if not patch_panel:
+            report.warning(row, 'patch_panel_not_found', f"Hop {j+1}: Patch Panel '{pp_name}' not found; the hop would be skipped.")
+            continue
+        if not port_in_range(pp_port, patch_panel.total_ports):
+            report.conflict(row, 'port_out_of_range', f"Hop {j+1}: Patch Panel '{pp_name}' has {patch_panel.total_ports} ports; port {pp_port} does not exist.")
+        hop_key = (patch_panel.id, pp_port)
+        if hop_key in snapshot.patch_panel_ports:
+            report.conflict(row, 'port_occupied', f"Hop {j+1}: Port {pp_port} of patch panel '{pp_name}' is already used by PC '{snapshot.patch_panel_ports[hop_key]}'.")
+        elif hop_key in patch_panel_ports:
+            report.conflict(row, 'port_claimed_in_file', f"Hop {j+1}: Port {pp_port} of patch panel '{pp_name}' is also claimed by row {patch_panel_ports[hop_key]}.")
+        else:
+            patch_panel_ports[hop_key] = row
@@ -0,0 +1,123 @@
+# backend/instrumentation.py
+# This file records per-request SQL statistics using SQLAlchemy engine events:
+# statement count, total DB time and the slowest statements. They are reported in
+# the Server-Timing / X-DB-Queries response headers and in a slow-request log.
+# It also detects lazy relationship loads (the N+1 pattern) and, in strict mode,
+# raises when one happens inside an endpoint marked with @no_lazy_loads.
+
+import heapq
+import os
+import time
+from functools import wraps
+
+from flask import g, request, has_request_context, current_app
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .extensions import db
+
+SLOWEST_STATEMENTS_KEPT = 5
+_PROCESS_STARTED = time.time()
+_first_request_pid = None # pid that already logged its first request (reset by forking)
+
+class LazyLoadError(RuntimeError):
+    """Raised in strict mode when a lazy relationship load happens in a no-lazy-load endpoint."""
+
+def _new_stats():
+    return {'count': 0, 'db_time': 0.0, 'lazy_loads': 0, 'slowest': []}
+
+def get_request_sql_stats():
+    """Returns the SQL statistics of the current request, or None outside a request."""
+    if not has_request_context():
+        return None
+    return g.get('sql_stats')
+
+# --- Engine events ---
+# The start time lives on the statement's execution context, not on the pooled connection,
+# so a statement that raises (after_cursor_execute never fires) leaves nothing behind
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_query_start', None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats = get_request_sql_stats()
+    if stats is None:
+        return
+    stats['count'] += 1
+    stats['db_time'] += elapsed
+    # Min-heap of (elapsed, sequence, statement) keeping the N slowest statements
+    entry = (elapsed, stats['count'], statement[:300])
+    if len(stats['slowest']) < SLOWEST_STATEMENTS_KEPT:
+        heapq.heappush(stats['slowest'], entry)
+    else:
+        heapq.heappushpop(stats['slowest'], entry)
+
+# --- ORM events ---
+def _do_orm_execute(orm_execute_state):
+    if not (orm_execute_state.is_relationship_load and orm_execute_state.lazy_loaded_from is not None):
+        return
+    stats = get_request_sql_stats()
+    if stats is None:
+        return
+    stats['lazy_loads'] += 1
+    if g.get('no_lazy_loads') and current_app.config.get('SQL_STRICT_LAZY_LOADS'):
+        instance = orm_execute_state.lazy_loaded_from.class_.__name__
+        raise LazyLoadError(f"Lazy load from {instance} during {request.method} {request.path}; add an eager load or use read_models.")
+
+def no_lazy_loads(view):
+    """Marks a list endpoint: GET requests to it must not trigger lazy relationship loads."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method == 'GET':
+            g.no_lazy_loads = True
+        return view(*args, **kwargs)
+    return wrapper
+
+# --- Request hooks ---
+def _start_request():
+    g.sql_stats = _new_stats()
+    g.request_start = time.perf_counter()
+
+def _finish_request(response):
+    stats = g.get('sql_stats')
+    if stats is None:
+        return response
+    total_ms = (time.perf_counter() - g.request_start) * 1000
+    db_ms = stats['db_time'] * 1000
+
+    response.headers['X-DB-Queries'] = str(stats['count'])
+    response.headers['Server-Timing'] = (
+        f'db;dur={db_ms:.1f};desc="{stats["count"]} queries", app;dur={total_ms:.1f}'
+    )
+    if stats['lazy_loads']:
+        response.headers['X-DB-Lazy-Loads'] = str(stats['lazy_loads'])
+
+    global _first_request_pid
+    if _first_request_pid != os.getpid():
+        _first_request_pid = os.getpid()
+        current_app.logger.info(
+            f"First request in process {os.getpid()}: {request.method} {request.path} took {total_ms:.1f} ms "
+            f"({time.time() - _PROCESS_STARTED:.1f} s after import)"
+        )
+
+    if total_ms >= current_app.config.get('SLOW_REQUEST_MS', 500):
+        slowest = sorted(stats['slowest'], reverse=True)
+        current_app.logger.warning(
+            "Slow request %s %s: %.1f ms total, %.1f ms in %d queries (%d lazy loads). Slowest: %s",
+            request.method, request.full_path, total_ms, db_ms, stats['count'], stats['lazy_loads'],
+            '; '.join(f"{elapsed * 1000:.1f} ms: {statement}" for elapsed, _, statement in slowest)
+        )
+    return response
+
+def init_instrumentation(app):
+    """Registers the engine, ORM and request hooks. Engine events are registered once per process."""
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(db.session, 'do_orm_execute', _do_orm_execute)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
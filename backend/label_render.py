@@ -0,0 +1,100 @@
+# backend/label_render.py
+# This file renders cable and port labels into PDF pages (see labels.py for the selection,
+# the page cache and the process pool). It runs inside the pool's worker processes, so it
+# only depends on reportlab and pypdf and never on the Flask app or the database.
+# Each label is a plain dictionary (see labels.label_from_connection) and becomes one
+# single-page PDF: the template's first page with the label text drawn on top of it.
+
+import io
+
+from pypdf import PdfReader, PdfWriter
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+LAYOUT_VERSION = 1 # Bump when the drawing below changes, so cached pages are re-rendered
+
+MARGIN = 36 # Points (half an inch)
+TITLE_SIZE = 16
+TEXT_SIZE = 10
+PORT_LABEL_WIDTH = 150
+PORT_LABEL_HEIGHT = 42
+
+# Template pages parsed in this process, by path. Template paths name a single upload
+# whose content never changes, so entries never go stale.
+_templates = {}
+
+def _template_page(template_path):
+    if template_path not in _templates:
+        _templates[template_path] = PdfReader(template_path).pages[0]
+    return _templates[template_path]
+
+def _draw_label(c, label, width, height):
+    """Draws one label: the cable label block at the top, one small box per port below it."""
+    y = height - MARGIN - TITLE_SIZE
+    c.setFont('Helvetica-Bold', TITLE_SIZE)
+    c.drawString(MARGIN, y, label['title'])
+    c.setFont('Helvetica', TEXT_SIZE)
+    for line in label['lines']:
+        y -= TEXT_SIZE * 1.5
+        c.drawString(MARGIN, y, line)
+
+    # Port labels, laid out left to right and wrapped onto further rows
+    x = MARGIN
+    y -= TEXT_SIZE * 2 + PORT_LABEL_HEIGHT
+    for port in label['ports']:
+        if x + PORT_LABEL_WIDTH > width - MARGIN:
+            x = MARGIN
+            y -= PORT_LABEL_HEIGHT + 8
+        if y < MARGIN:
+            break # The page is full; the cable label above still lists every hop
+        c.rect(x, y, PORT_LABEL_WIDTH, PORT_LABEL_HEIGHT)
+        c.setFont('Helvetica-Bold', TEXT_SIZE + 2)
+        c.drawString(x + 6, y + PORT_LABEL_HEIGHT - 16, port['device'][:22])
+        c.setFont('Helvetica', TEXT_SIZE)
+        c.drawString(x + 6, y + 8, f"Port {port['port']} -> {port['peer']}"[:28])
+        x += PORT_LABEL_WIDTH + 8
+
+def render_pages(template_path, labels):
+    """
+    Renders each label onto the first page of the template (or a blank A4 page when
+    template_path is None). Returns one single-page PDF, as bytes, per label, in order.
+    """
+    template = _template_page(template_path) if template_path else None
+    if template is not None:
+        width, height = float(template.mediabox.width), float(template.mediabox.height)
+    else:
+        width, height = A4
+
+    # All overlays are drawn in one reportlab document, then split and merged page by page
+    overlay_buffer = io.BytesIO()
+    c = canvas.Canvas(overlay_buffer, pagesize=(width, height))
+    for label in labels:
+        _draw_label(c, label, width, height)
+        c.showPage()
+    c.save()
+    overlays = PdfReader(overlay_buffer).pages
+
+    pages = []
+    for overlay in overlays:
+        writer = PdfWriter()
+        if template is not None:
+            page = writer.add_page(template)
+            page.merge_page(overlay)
+        else:
+            writer.add_page(overlay)
+        out = io.BytesIO()
+        writer.write(out)
+        pages.append(out.getvalue())
+    return pages
+
+def merge_pages(pages, out):
+    """
+    Concatenates single-page PDFs (as returned by render_pages) into one document written
+    to the file object 'out'. Every page carries its own copy of the template's fonts and
+    images; identical objects are collapsed so the merged file holds them once.
+    """
+    writer = PdfWriter()
+    for body in pages:
+        writer.add_page(PdfReader(io.BytesIO(body)).pages[0])
+    writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+    writer.write(out)
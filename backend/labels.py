@@ -0,0 +1,120 @@
+# backend/labels.py
+# This file implements server-side label printing for /print/labels.
+# A selection of connections becomes one label page per connection, drawn onto the
+# default (or a chosen) PDF template and merged into a single document:
+# - rendered pages are kept in a page cache, a ResponseCache (see cache.py) in its own
+#   SQLite file, keyed by connection and stamped with the version key of every row the
+#   label is built from, so unchanged labels are never rendered twice;
+# - the pages that are missing are rendered in chunks by a process pool, because
+#   merging text onto a template page is CPU-bound (see label_render.py).
+# reportlab and pypdf are only imported when the first labels are printed.
+
+import hashlib
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app
+
+from .cache import ResponseCache
+from .metrics import record_cache_lookup
+
+_pool = None
+_pool_pid = None
+
+def label_from_connection(conn):
+    """Builds the label dictionary drawn by label_render from a read_models connection dictionary."""
+    pc = conn['pc'] or {}
+    switch = conn['switch'] or {}
+    pc_name = pc.get('name', '?')
+    switch_name = switch.get('name', '?')
+    hops = conn['hops']
+
+    path = [pc_name] + [f"{hop['patch_panel']['name']}:{hop['patch_panel_port']}" for hop in hops if hop['patch_panel']]
+    path.append(f"{switch_name}:{conn['switch_port']}")
+    lines = [
+        f"PC: {pc_name}" + (f" ({pc['ip_address']})" if pc.get('ip_address') else ''),
+        f"Switch: {switch_name} port {conn['switch_port']}",
+        "Path: " + ' -> '.join(path),
+    ]
+    if conn['cable_color']:
+        lines.append(f"Cable colour: {conn['cable_color']}")
+    if conn['wall_point_label']:
+        lines.append(f"Wall point: {conn['wall_point_label']}")
+
+    ports = [{'device': switch_name, 'port': conn['switch_port'], 'peer': pc_name}]
+    ports += [
+        {'device': hop['patch_panel']['name'], 'port': hop['patch_panel_port'], 'peer': pc_name}
+        for hop in hops if hop['patch_panel']
+    ]
+    return {'title': conn['cable_label'] or f"Connection {conn['id']}", 'lines': lines, 'ports': ports}
+
+def _get_pool():
+    """
+    The process pool of this (gunicorn worker) process, created on first use.
+    Pool processes are spawned rather than forked, so they never inherit the worker's
+    database connections or threads; they only import label_render.
+    """
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        _pool = ProcessPoolExecutor(
+            max_workers=current_app.config['LABEL_RENDER_PROCESSES'],
+            mp_context=multiprocessing.get_context('spawn')
+        )
+        _pool_pid = os.getpid()
+    return _pool
+
+def _render(template_path, labels):
+    """Renders labels to single-page PDFs, across the pool when there is more than one chunk of work."""
+    from . import label_render
+
+    chunk_size = current_app.config['LABEL_RENDER_CHUNK']
+    if len(labels) <= chunk_size:
+        return label_render.render_pages(template_path, labels) # Not worth the round trip to the pool
+    chunks = [labels[i:i + chunk_size] for i in range(0, len(labels), chunk_size)]
+    global _pool
+    try:
+        results = _get_pool().map(label_render.render_pages, [template_path] * len(chunks), chunks)
+        return [page for chunk_pages in results for page in chunk_pages]
+    except BrokenProcessPool:
+        _pool = None # A pool process died (e.g. killed for memory); start a new pool next time
+        raise
+
+def render_labels(rows, template_path, template_key):
+    """
+    Renders one label page per connection in the read_models.ConnectionRowSet 'rows' and
+    merges them in row order. template_key identifies the template's content (its hash).
+    Returns (file, stats): a temporary file positioned at the start of the merged PDF,
+    and a dictionary with the page, cache-hit and rendered counts.
+    """
+    from . import label_render
+
+    cache = current_app.extensions['label_page_cache']
+    stamps = {}
+    for m in rows.mappings:
+        key = f"label:{template_key}:{label_render.LAYOUT_VERSION}:{m['id']}"
+        stamps[key] = hashlib.sha1(repr(rows.version_key(m)).encode()).hexdigest()
+    keys = list(stamps)
+    pages = cache.get_many(stamps.items())
+
+    missing = [(key, m) for key, m in zip(keys, rows.mappings) if key not in pages]
+    record_cache_lookup('label_page', 'hit', len(pages))
+    record_cache_lookup('label_page', 'miss', len(missing))
+    if missing:
+        rendered = _render(template_path, [label_from_connection(rows.build(m)) for _, m in missing])
+        new_pages = [(key, stamps[key], body) for (key, _), body in zip(missing, rendered)]
+        cache.set_many(new_pages, 'application/pdf', compress=False)
+        pages.update((key, body) for key, _, body in new_pages)
+
+    out = tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024)
+    label_render.merge_pages([pages[key] for key in keys], out)
+    out.seek(0)
+    return out, {'pages': len(keys), 'cached': len(keys) - len(missing), 'rendered': len(missing)}
+
+def init_labels(app):
+    """Creates the label page cache from LABEL_CACHE_PATH / LABEL_CACHE_MAX_BYTES."""
+    app.extensions['label_page_cache'] = ResponseCache(
+        app.config['LABEL_CACHE_PATH'], app.config['LABEL_CACHE_MAX_BYTES']
+    )
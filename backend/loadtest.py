@@ -0,0 +1,310 @@
+# backend/loadtest.py
+# This file provides 'flask loadtest': it seeds a temporary database (see bench.py), boots
+# the app under gunicorn on a local port and replays a weighted mix of the calls the
+# frontend makes, from concurrent clients. It reports latency percentiles, throughput
+# and error / 'database is locked' rates per endpoint, so worker counts and SQLite
+# settings can be compared on evidence.
+#
+#   flask --app backend/app.py loadtest --workers 4 --clients 16 --duration 60
+#   flask --app backend/app.py loadtest --mix fetch_all=1,connection_update=1 --worker-class gthread --threads 4
+
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+
+import click
+
+from .bench import SCALES, create_seeded_app
+
+# Relative weights of the user actions replayed by each client
+DEFAULT_MIX = {
+    'fetch_all': 4,           # App.js fetchAllData: the six list endpoints plus /pdf_templates
+    'port_status': 4,         # Opening a switch or patch panel port view
+    'connection_update': 2,   # Editing a connection (the frontend re-sends all fields and hops)
+    'connection_create': 1,   # Creating a connection and deleting it again
+    'logs': 2,                # Paging through the system log
+    'csv_import': 0.2,        # Importing a small PC CSV
+}
+
+FETCH_ALL_PATHS = ['/pcs', '/patch_panels', '/switches', '/connections', '/locations', '/racks', '/pdf_templates']
+IMPORT_ROWS = 20
+
+def parse_mix(text):
+    """Parses 'fetch_all=4,logs=1' into a weight dictionary; unknown action names are rejected."""
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise click.BadParameter(f"Unknown action '{name}'. Use: {', '.join(DEFAULT_MIX)}")
+        try:
+            mix[name] = float(weight or 1)
+        except ValueError:
+            raise click.BadParameter(f"Invalid weight '{weight}' for '{name}'")
+    return mix
+
+class Recorder:
+    """Collects per-endpoint latencies and outcomes from all client threads."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.locked = defaultdict(int)
+
+    def record(self, label, seconds, status, body):
+        with self._lock:
+            self.latencies[label].append(seconds)
+            if status is None or status >= 500 or status in (400, 409):
+                self.errors[label] += 1
+            if body and b'database is locked' in body:
+                self.locked[label] += 1
+
+    def report(self, elapsed):
+        endpoints = {}
+        total = 0
+        for label in sorted(self.latencies):
+            durations = sorted(self.latencies[label])
+            count = len(durations)
+            total += count
+            endpoints[label] = {
+                'requests': count,
+                'throughput_rps': round(count / elapsed, 2),
+                'p50_ms': round(_percentile(durations, 50) * 1000, 2),
+                'p95_ms': round(_percentile(durations, 95) * 1000, 2),
+                'p99_ms': round(_percentile(durations, 99) * 1000, 2),
+                'max_ms': round(durations[-1] * 1000, 2),
+                'error_rate': round(self.errors[label] / count, 4),
+                'lock_rate': round(self.locked[label] / count, 4),
+            }
+        return {
+            'total_requests': total,
+            'throughput_rps': round(total / elapsed, 2),
+            'error_rate': round(sum(self.errors.values()) / total, 4) if total else None,
+            'lock_rate': round(sum(self.locked.values()) / total, 4) if total else None,
+            'endpoints': endpoints,
+        }
+
+def _percentile(ordered, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+class Client:
+    """One simulated frontend user. Each request opens a new connection, like the sync workers expect."""
+    def __init__(self, base_url, recorder, rng, inventory):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.rng = rng
+        self.inventory = inventory
+
+    def request(self, label, method, path, json_body=None, body=None, content_type=None):
+        headers = {}
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            content_type = 'application/json'
+        if content_type:
+            headers['Content-Type'] = content_type
+        req = urllib.request.Request(self.base_url + path, data=body, method=method, headers=headers)
+        started = time.perf_counter()
+        status, payload = None, None
+        try:
+            with urllib.request.urlopen(req, timeout=120) as response:
+                status, payload = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, payload = e.code, e.read()
+        except OSError:
+            pass
+        self.recorder.record(label, time.perf_counter() - started, status, payload)
+        return status, payload
+
+    # --- Actions (see DEFAULT_MIX) ---
+    def fetch_all(self):
+        for path in FETCH_ALL_PATHS:
+            self.request(f"GET {path}", 'GET', path)
+
+    def port_status(self):
+        if self.rng.random() < 0.5:
+            self.request('GET /switches/<id>/ports', 'GET', f"/switches/{self.rng.randint(1, self.inventory['switches'])}/ports")
+        else:
+            self.request('GET /patch_panels/<id>/ports', 'GET', f"/patch_panels/{self.rng.randint(1, self.inventory['patch_panels'])}/ports")
+
+    def connection_update(self):
+        conn_id = self.rng.randint(1, self.inventory['connections'])
+        status, payload = self.request('GET /connections/<id>', 'GET', f"/connections/{conn_id}")
+        if status != 200:
+            return
+        current = json.loads(payload)
+        update = {key: current[key] for key in (
+            'pc_id', 'switch_id', 'switch_port', 'cable_color', 'cable_label',
+            'wall_point_label', 'wall_point_cable_color', 'wall_point_cable_label')}
+        update['is_switch_port_up'] = not current['is_switch_port_up']
+        update['hops'] = [{
+            'patch_panel_id': hop['patch_panel']['id'], 'patch_panel_port': hop['patch_panel_port'],
+            'is_port_up': hop['is_port_up'], 'sequence': hop['sequence'],
+            'cable_color': hop['cable_color'], 'cable_label': hop['cable_label']
+        } for hop in current['hops']]
+        self.request('PUT /connections/<id>', 'PUT', f"/connections/{conn_id}", json_body=update)
+
+    def connection_create(self):
+        status, payload = self.request('POST /connections', 'POST', '/connections', json_body={
+            'pc_id': self.rng.choice(self.inventory['multi_port_pc_ids']),
+            'switch_id': self.rng.randint(1, self.inventory['switches']),
+            'switch_port': f"LT-{uuid.uuid4().hex[:8]}", # Outside the generated 1..48 range, so it never collides
+            'is_switch_port_up': True,
+            'hops': []
+        })
+        if status == 201:
+            self.request('DELETE /connections/<id>', 'DELETE', f"/connections/{json.loads(payload)['id']}")
+
+    def logs(self):
+        page = self.rng.randint(1, max(1, self.inventory['logs'] // 25))
+        self.request('GET /logs', 'GET', f"/logs?page={page}&per_page=25")
+
+    def csv_import(self):
+        boundary = uuid.uuid4().hex
+        batch = uuid.uuid4().hex[:8]
+        rows = ['name,ip_address,type,operating_system,in_domain']
+        rows += [f"LT-{batch}-{i},192.168.{i // 256}.{i % 256},Workstation,Ubuntu 22.04,true" for i in range(IMPORT_ROWS)]
+        body = (
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"loadtest.csv\"\r\n"
+            f"Content-Type: text/csv\r\n\r\n" + '\n'.join(rows) + f"\r\n--{boundary}--\r\n"
+        ).encode()
+        self.request('POST /import/pcs', 'POST', '/import/pcs', body=body, content_type=f"multipart/form-data; boundary={boundary}")
+
+def _run_clients(base_url, inventory, mix, clients, duration, seed):
+    recorder = Recorder()
+    deadline = time.monotonic() + duration
+    actions, weights = zip(*[(name, weight) for name, weight in mix.items() if weight > 0])
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        client = Client(base_url, recorder, rng, inventory)
+        while time.monotonic() < deadline:
+            getattr(client, rng.choices(actions, weights)[0])()
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder.report(time.perf_counter() - started)
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def _wait_until_up(base_url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise click.ClickException(f"gunicorn exited with status {process.returncode}")
+        try:
+            urllib.request.urlopen(base_url + '/locations', timeout=2).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise click.ClickException(f"gunicorn did not answer within {timeout} s")
+
+def _boot_gunicorn(db_path, workers, threads, worker_class, port, log_path):
+    """Starts gunicorn with the app factory pointed at the seeded database. Returns the Popen."""
+    instance_dir = os.path.dirname(db_path)
+    config = {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{db_path}",
+        'RESPONSE_CACHE_PATH': os.path.join(instance_dir, 'response_cache.db'),
+        'PROFILE_DIR': os.path.join(instance_dir, 'profiles'),
+        'LABEL_CACHE_PATH': os.path.join(instance_dir, 'label_cache.db'),
+        'HOT_BACKUP_INTERVAL': 0,
+    }
+    metrics_dir = os.path.join(instance_dir, 'prometheus')
+    os.makedirs(metrics_dir, exist_ok=True)
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=metrics_dir)
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [
+        sys.executable, '-m', 'gunicorn',
+        '-c', os.path.join(project_root, 'backend', 'gunicorn_conf.py'),
+        '-w', str(workers), '--threads', str(threads), '-k', worker_class,
+        '-b', f"127.0.0.1:{port}", '--timeout', '120',
+        f"backend.app:create_app({config!r})"
+    ]
+    log = open(log_path, 'w')
+    return subprocess.Popen(command, cwd=project_root, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+def _inventory_from_db(app):
+    """Reads the id ranges the clients pick from."""
+    from .extensions import db
+    from .models import PC, Switch, PatchPanel, Connection, SystemLog
+    with app.app_context():
+        multi_port = [pc_id for (pc_id,) in db.session.query(PC.id).filter(PC.multi_port.is_(True)).limit(1000)]
+        return {
+            'switches': db.session.query(db.func.max(Switch.id)).scalar() or 1,
+            'patch_panels': db.session.query(db.func.max(PatchPanel.id)).scalar() or 1,
+            'connections': db.session.query(db.func.max(Connection.id)).scalar() or 1,
+            'logs': db.session.query(SystemLog).count(),
+            'multi_port_pc_ids': multi_port or [db.session.query(db.func.min(PC.id)).scalar()],
+        }
+
+@click.command('loadtest')
+@click.option('--scale', type=click.Choice(sorted(SCALES)), default='small', show_default=True)
+@click.option('--seed', default=42, show_default=True)
+@click.option('--workers', default=4, show_default=True, help='gunicorn worker processes.')
+@click.option('--threads', default=1, show_default=True, help='Threads per worker (gthread worker class).')
+@click.option('--worker-class', default='sync', show_default=True, help='gunicorn worker class (sync, gthread, gevent).')
+@click.option('--clients', default=8, show_default=True, help='Concurrent simulated users.')
+@click.option('--duration', default=30.0, show_default=True, help='Seconds to run the load.')
+@click.option('--mix', default=None, help=f"Action weights, e.g. 'fetch_all=4,logs=1'. Actions: {', '.join(DEFAULT_MIX)}.")
+@click.option('--output', type=click.Path(dir_okay=False), default=None, help='Write the JSON report here instead of stdout.')
+def loadtest_command(scale, seed, workers, threads, worker_class, clients, duration, mix, output):
+    """Boots the app under gunicorn on a seeded temporary database and replays frontend traffic."""
+    mix = parse_mix(mix)
+    work_dir = tempfile.mkdtemp(prefix='netdoc-loadtest-')
+    db_path = os.path.join(work_dir, 'loadtest.db')
+    app, inserted = create_seeded_app(db_path, scale=scale, seed=seed)
+    inventory = _inventory_from_db(app)
+    click.echo(f"Seeded {db_path}: {inserted}", err=True)
+
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    log_path = os.path.join(work_dir, 'gunicorn.log')
+    process = _boot_gunicorn(db_path, workers, threads, worker_class, port, log_path)
+    try:
+        boot_started = time.perf_counter()
+        _wait_until_up(base_url, process)
+        click.echo(f"gunicorn up on {base_url} after {time.perf_counter() - boot_started:.2f} s (log: {log_path})", err=True)
+        click.echo(f"Running {clients} clients for {duration:.0f} s with mix {mix}", err=True)
+        results = _run_clients(base_url, inventory, mix, clients, duration, seed)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    report = {
+        'meta': {
+            'scale': scale, 'seed': seed, 'rows': inserted, 'workers': workers, 'threads': threads,
+            'worker_class': worker_class, 'clients': clients, 'duration': duration, 'mix': mix,
+        },
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text + '\n')
+        click.echo(f"Report written to {output}", err=True)
+    else:
+        click.echo(text)
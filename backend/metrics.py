@@ -0,0 +1,103 @@
+# backend/metrics.py
+# This file defines the Prometheus metrics served at /metrics.
+# Under gunicorn every worker is a separate process, so when PROMETHEUS_MULTIPROC_DIR
+# is set (see start.sh) prometheus_client keeps the values in per-process mmap files
+# in that directory, and /metrics aggregates all of them. gunicorn_conf.py removes the
+# files of workers that exit. Without the variable (flask run) the metrics are in-process.
+
+import os
+import time
+
+from flask import request, g, make_response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from prometheus_client import (
+    CollectorRegistry, Counter, Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+
+from .instrumentation import get_request_sql_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests handled.', ['method', 'route', 'status']
+)
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time spent handling a request.', ['method', 'route'], buckets=LATENCY_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Size of response bodies (streamed responses are not counted).',
+    ['method', 'route'], buckets=SIZE_BUCKETS
+)
+DB_TIME = Histogram(
+    'db_time_seconds', 'Time a request spent executing SQL statements.', ['method', 'route'], buckets=LATENCY_BUCKETS
+)
+DB_QUERIES = Histogram(
+    'db_queries_per_request', 'SQL statements executed per request.', ['method', 'route'],
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 1000)
+)
+IMPORT_ROWS = Counter(
+    'import_rows_total', 'CSV import rows processed.', ['entity_type', 'result']
+)
+IMPORT_SECONDS = Counter(
+    'import_duration_seconds_total', 'Time spent in CSV imports; rows/s = rate(import_rows_total) / rate(this).',
+    ['entity_type']
+)
+CACHE_LOOKUPS = Counter(
+    'cache_lookups_total', 'Cache lookups by cache and result (hit, miss, not_modified).', ['cache', 'result']
+)
+SQLITE_LOCKED = Counter(
+    'sqlite_database_locked_total', 'Statements that failed because SQLite stayed locked past the busy timeout.'
+)
+
+def _route_label():
+    """The URL rule (e.g. '/racks/<int:rack_id>') rather than the path, to keep label cardinality bounded."""
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+def record_cache_lookup(cache, result, amount=1):
+    if amount:
+        CACHE_LOOKUPS.labels(cache=cache, result=result).inc(amount)
+
+def record_import(entity_type, success_count, error_count, seconds):
+    IMPORT_ROWS.labels(entity_type=entity_type, result='success').inc(success_count)
+    IMPORT_ROWS.labels(entity_type=entity_type, result='error').inc(error_count)
+    IMPORT_SECONDS.labels(entity_type=entity_type).inc(seconds)
+
+# --- Hooks ---
+def _handle_db_error(exception_context):
+    """Engine event: counts 'database is locked' errors (the busy timeout expired while waiting for a lock)."""
+    if 'database is locked' in str(exception_context.original_exception):
+        SQLITE_LOCKED.inc()
+
+def _observe_request(response):
+    start = g.get('request_start')
+    if start is None:
+        return response
+    method, route = request.method, _route_label()
+    REQUESTS.labels(method=method, route=route, status=str(response.status_code)).inc()
+    REQUEST_LATENCY.labels(method=method, route=route).observe(time.perf_counter() - start)
+    if not response.is_streamed:
+        RESPONSE_SIZE.labels(method=method, route=route).observe(response.calculate_content_length() or 0)
+    stats = get_request_sql_stats()
+    if stats is not None:
+        DB_TIME.labels(method=method, route=route).observe(stats['db_time'])
+        DB_QUERIES.labels(method=method, route=route).observe(stats['count'])
+    return response
+
+def metrics_response():
+    """Builds the /metrics response, aggregated across workers in multiprocess mode."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    response = make_response(generate_latest(registry))
+    response.headers['Content-Type'] = CONTENT_TYPE_LATEST
+    return response
+
+def init_metrics(app):
+    """Registers the request and engine hooks. The endpoint itself is in routes/admin.py."""
+    if not event.contains(Engine, 'handle_error', _handle_db_error):
+        event.listen(Engine, 'handle_error', _handle_db_error)
+    app.after_request(_observe_request)
@@ -0,0 +1,42 @@
+"""Add updated_at and version_id to inventory tables
+
+Revision ID: be1200d03364
+Revises: a40b28a99449
+Create Date: 2026-10-19 05:09:13.362805
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'be1200d03364'
+down_revision = 'a40b28a99449'
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ['locations', 'racks', 'pcs', 'patch_panels', 'switches', 'connections', 'connection_hops']
+
+
+def upgrade():
+    for table in VERSIONED_TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+            batch_op.add_column(sa.Column('version_id', sa.Integer(), nullable=False, server_default='1'))
+
+        # Backfill: existing rows count as modified at migration time, version 1
+        op.execute(f"UPDATE {table} SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL")
+
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+            batch_op.create_index(batch_op.f(f'ix_{table}_updated_at'), ['updated_at'], unique=False)
+            batch_op.create_index(batch_op.f(f'ix_{table}_version_id'), ['version_id'], unique=False)
+
+
+def downgrade():
+    for table in reversed(VERSIONED_TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f'ix_{table}_version_id'))
+            batch_op.drop_index(batch_op.f(f'ix_{table}_updated_at'))
+            batch_op.drop_column('version_id')
+            batch_op.drop_column('updated_at')
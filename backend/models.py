@@ -3,6 +3,21 @@
 
 from .extensions import db # Import db from extensions.py
 from datetime import datetime # Import datetime for timestamping
+from sqlalchemy.orm import declared_attr
+
+class RowVersionMixin:
+    """
+    Adds an indexed modification timestamp and version counter to a model.
+    The ORM increments version_id on every UPDATE (it is the mapper's version_id_col,
+    so concurrent writers also get optimistic locking); bulk Core UPDATEs that do not
+    set the columns themselves fall back to the column onupdate expressions.
+    """
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    version_id = db.Column(db.Integer, nullable=False, default=1, onupdate=db.literal_column('version_id') + 1, index=True)
+
+    @declared_attr
+    def __mapper_args__(cls):
+        return {'version_id_col': cls.version_id}
 
 class SystemLog(db.Model):
     __tablename__ = 'system_logs'
@@ -31,7 +46,7 @@ class SystemLog(db.Model):
         }
 
 
-class Location(db.Model):
+class Location(RowVersionMixin, db.Model):
     __tablename__ = 'locations'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
@@ -47,7 +62,7 @@ class Location(db.Model):
             'description': self.description
         }
 
-class Rack(db.Model):
+class Rack(RowVersionMixin, db.Model):
     __tablename__ = 'racks'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -72,7 +87,7 @@ class Rack(db.Model):
             'orientation': self.orientation,
         }
 
-class PC(db.Model):
+class PC(RowVersionMixin, db.Model):
     __tablename__ = 'pcs'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
@@ -124,7 +139,7 @@ class PC(db.Model):
             'disk_info': self.disk_info,
         }
 
-class PatchPanel(db.Model):
+class PatchPanel(RowVersionMixin, db.Model):
     __tablename__ = 'patch_panels'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
@@ -153,7 +168,7 @@ class PatchPanel(db.Model):
             'rack': self.rack.to_dict() if self.rack else None,
         }
 
-class Switch(db.Model):
+class Switch(RowVersionMixin, db.Model):
     __tablename__ = 'switches'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
@@ -190,7 +205,7 @@ class Switch(db.Model):
             'rack': self.rack.to_dict() if self.rack else None,
         }
 
-class Connection(db.Model):
+class Connection(RowVersionMixin, db.Model):
     __tablename__ = 'connections'
     id = db.Column(db.Integer, primary_key=True)
     pc_id = db.Column(db.Integer, db.ForeignKey('pcs.id'), nullable=False)
@@ -231,7 +246,7 @@ class Connection(db.Model):
             'wall_point_cable_label': self.wall_point_cable_label
         }
 
-class ConnectionHop(db.Model):
+class ConnectionHop(RowVersionMixin, db.Model):
     __tablename__ = 'connection_hops'
     id = db.Column(db.Integer, primary_key=True)
     connection_id = db.Column(db.Integer, db.ForeignKey('connections.id'), nullable=False)
@@ -261,13 +276,19 @@ class PdfTemplate(db.Model):
     original_filename = db.Column(db.String(255), nullable=False)
     stored_filename = db.Column(db.String(255), unique=True, nullable=False)
     upload_date = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
+    # SHA-256 of the file content; the file itself is stored once per hash (see utils.blob_path).
+    # NULL for templates uploaded before content-addressed storage, stored as UPLOAD_FOLDER/stored_filename.
+    content_hash = db.Column(db.String(64), nullable=True, index=True)
+    size = db.Column(db.Integer, nullable=True) # Bytes
 
     def to_dict(self):
         return {
             'id': self.id,
             'original_filename': self.original_filename,
             'stored_filename': self.stored_filename,
-            'upload_date': self.upload_date.isoformat()
+            'upload_date': self.upload_date.isoformat(),
+            'content_hash': self.content_hash,
+            'size': self.size
         }
 
 class AppSettings(db.Model):
@@ -282,3 +303,74 @@ class AppSettings(db.Model):
             'default_pdf_id': self.default_pdf_id,
             'default_pdf_name': self.default_pdf.original_filename if self.default_pdf else None
         }
+
+class TableVersion(db.Model):
+    __tablename__ = 'table_versions'
+    table_name = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0) # Bumped on every committed write to the table
+
+    def to_dict(self):
+        return {
+            'table_name': self.table_name,
+            'version': self.version
+        }
+
+class PortStatusReport(db.Model):
+    """
+    The last link state reported by monitoring for a connection ('switch') or hop
+    ('patch_panel') row, with the time it was reported. Workers flush their buffers
+    independently, so a report is only applied when it is newer (see port_status.py).
+    """
+    __tablename__ = 'port_status_reports'
+    kind = db.Column(db.String(20), primary_key=True) # 'switch' (connections.id) or 'patch_panel' (connection_hops.id)
+    row_id = db.Column(db.Integer, primary_key=True)
+    up = db.Column(db.Boolean, nullable=False)
+    reported_at = db.Column(db.Float, nullable=False) # Unix time the worker accepted the report
+
+class PortKey(db.Model):
+    """
+    A monitored port (a switch or patch panel port, as documented), with its last recorded
+    link state and the incrementally maintained flap penalty (see port_history.py).
+    """
+    __tablename__ = 'port_keys'
+    id = db.Column(db.Integer, primary_key=True)
+    device_type = db.Column(db.String(20), nullable=False) # 'switch' or 'patch_panel'
+    device_id = db.Column(db.Integer, nullable=False)
+    port = db.Column(db.String(50), nullable=False)
+    last_up = db.Column(db.Boolean, nullable=True)
+    last_change = db.Column(db.Integer, nullable=True) # Unix time of the last transition
+    flap_penalty = db.Column(db.Float, nullable=False, default=0.0)
+    flap_updated = db.Column(db.Integer, nullable=True) # Unix time flap_penalty was last decayed to
+    __table_args__ = (db.UniqueConstraint('device_type', 'device_id', 'port', name='uq_port_keys_device_port'),)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'key': f"{self.device_type}:{self.device_id}:{self.port}",
+            'device_type': self.device_type,
+            'device_id': self.device_id,
+            'port': self.port,
+            'last_up': self.last_up,
+            'last_change': self.last_change,
+        }
+
+class PortStateEvent(db.Model):
+    """
+    One link-state transition: (port, Unix time, state). Clustered by port and time without
+    a rowid, so a row is a few bytes and a port's history is one contiguous range.
+    """
+    __tablename__ = 'port_state_events'
+    port_id = db.Column(db.Integer, db.ForeignKey('port_keys.id'), primary_key=True)
+    ts = db.Column(db.Integer, primary_key=True)
+    up = db.Column(db.Boolean, nullable=False)
+    __table_args__ = {'sqlite_with_rowid': False}
+
+class PortStateDaily(db.Model):
+    """Per port and UTC day (days since 1970-01-01): seconds up and down, and transitions."""
+    __tablename__ = 'port_state_daily'
+    port_id = db.Column(db.Integer, db.ForeignKey('port_keys.id'), primary_key=True)
+    day = db.Column(db.Integer, primary_key=True)
+    up_seconds = db.Column(db.Integer, nullable=False, default=0)
+    down_seconds = db.Column(db.Integer, nullable=False, default=0)
+    transitions = db.Column(db.Integer, nullable=False, default=0)
+    __table_args__ = {'sqlite_with_rowid': False}
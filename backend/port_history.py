@@ -0,0 +1,281 @@
+# backend/port_history.py
+# This file keeps the link-state history of monitored ports (fed by /port_status, see
+# port_status.py) and answers the history, flapping and uptime queries.
+#   port_keys          one row per port: device, documented port, last state, flap penalty
+#   port_state_events  (port_id, ts, up) per transition, clustered by port and time without a
+#                      rowid: a row is about 14 bytes on disk (SQLite stores small integers in
+#                      1-4 bytes and 0/1 in the record header), and a port's history is one range
+#   port_state_daily   (port_id, day) -> seconds up, seconds down, transitions
+# Everything is maintained incrementally when transitions are recorded: a transition closes
+# the interval since the previous one (added to the daily rows, split at midnight UTC) and
+# raises the port's flap penalty, which decays by half every FLAP_HALF_LIFE seconds, as in
+# route flap dampening. Queries over days read the daily rows; shorter buckets are computed
+# from the events. Timestamps are Unix seconds: transitions within one second keep the last,
+# and observations older than a port's last recorded transition are dropped, so the history
+# is append-only and always ends in the port's last_up.
+
+import time
+
+from sqlalchemy import select, update, insert, bindparam
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .extensions import db
+from .models import PortKey, PortStateEvent, PortStateDaily, Switch, PatchPanel
+from .device_output import normalize_interface, port_number
+
+DEVICE_TYPES = {'switch': Switch, 'patch_panel': PatchPanel}
+DAY = 86400
+FLAP_PENALTY = 1000.0 # Added per transition
+FLAP_HALF_LIFE = 900 # Seconds
+MAX_RAW_EVENTS = 2000 # History replies with more events than this are downsampled into buckets
+
+def _decayed(penalty, since, now):
+    if not penalty or since is None:
+        return 0.0
+    return penalty * 0.5 ** (max(0, now - since) / FLAP_HALF_LIFE)
+
+def _add_interval(daily, port_id, start, end, up):
+    """Adds the seconds of [start, end) in state 'up' to the daily totals, split at midnight UTC."""
+    while start < end:
+        day = start // DAY
+        stop = min(end, (day + 1) * DAY)
+        totals = daily.setdefault((port_id, day), [0, 0, 0])
+        totals[0 if up else 1] += stop - start
+        start = stop
+
+# --- Recording ---
+def _port_ids(connection, keys):
+    """{(device_type, device_id, port): port_keys row} for the keys, creating the missing ones."""
+    keys = list(keys)
+    table = PortKey.__table__
+    columns = [table.c.id, table.c.device_type, table.c.device_id, table.c.port, table.c.last_up,
+               table.c.last_change, table.c.flap_penalty, table.c.flap_updated]
+
+    wanted = set(keys)
+    devices = {}
+    for device_type, device_id, _ in keys:
+        devices.setdefault(device_type, set()).add(device_id)
+
+    def load(): # By device, a prefix of the unique index, then filtered to the keys
+        rows = {}
+        for device_type, ids in devices.items():
+            ids = list(ids)
+            for start in range(0, len(ids), 500):
+                stmt = select(*columns).where(table.c.device_type == device_type, table.c.device_id.in_(ids[start:start + 500]))
+                for row in connection.execute(stmt):
+                    if (row.device_type, row.device_id, row.port) in wanted:
+                        rows[(row.device_type, row.device_id, row.port)] = row._asdict()
+        return rows
+
+    rows = load()
+    missing = [k for k in keys if k not in rows]
+    if missing:
+        connection.execute(insert(table), [{'device_type': t, 'device_id': d, 'port': p, 'flap_penalty': 0.0} for t, d, p in missing])
+        rows = load()
+    return rows
+
+def record_transitions(connection, observations):
+    """
+    Records observed states. observations: {(device_type, device_id, port): [(ts, up), ...]}
+    in time order; states equal to the port's last recorded one are not transitions, and
+    states older than its last transition arrived too late; both are skipped. Runs on the
+    caller's connection, in its transaction. Returns the number of events.
+    """
+    if not observations:
+        return 0
+    ports = _port_ids(connection, observations)
+    events, daily, changes = {}, {}, []
+    for key, states in observations.items():
+        port = ports[key]
+        last_up, last_change = port['last_up'], port['last_change']
+        penalty, penalty_at = port['flap_penalty'], port['flap_updated']
+        for ts, up in states:
+            ts = int(ts)
+            if last_change is not None and ts < last_change or last_up is not None and up == last_up:
+                continue
+            if last_change is not None:
+                _add_interval(daily, port['id'], last_change, ts, last_up)
+                daily.setdefault((port['id'], ts // DAY), [0, 0, 0])[2] += 1
+                penalty, penalty_at = _decayed(penalty, penalty_at, ts) + FLAP_PENALTY, ts
+            events[(port['id'], ts)] = up
+            last_up, last_change = up, ts
+        if (last_up, last_change) != (port['last_up'], port['last_change']):
+            changes.append({'b_id': port['id'], 'b_up': last_up, 'b_change': last_change, 'b_penalty': penalty, 'b_penalty_at': penalty_at})
+
+    if events:
+        stmt = sqlite_insert(PortStateEvent.__table__)
+        connection.execute(stmt.on_conflict_do_update(index_elements=['port_id', 'ts'], set_={'up': stmt.excluded.up}),
+                           [{'port_id': p, 'ts': ts, 'up': up} for (p, ts), up in events.items()])
+    if daily:
+        table = PortStateDaily.__table__
+        stmt = sqlite_insert(table)
+        connection.execute(stmt.on_conflict_do_update(index_elements=['port_id', 'day'], set_={
+            'up_seconds': table.c.up_seconds + stmt.excluded.up_seconds,
+            'down_seconds': table.c.down_seconds + stmt.excluded.down_seconds,
+            'transitions': table.c.transitions + stmt.excluded.transitions,
+        }), [{'port_id': p, 'day': day, 'up_seconds': u, 'down_seconds': d, 'transitions': n} for (p, day), (u, d, n) in daily.items()])
+    if changes:
+        table = PortKey.__table__
+        connection.execute(update(table).where(table.c.id == bindparam('b_id')).values(
+            last_up=bindparam('b_up'), last_change=bindparam('b_change'),
+            flap_penalty=bindparam('b_penalty'), flap_updated=bindparam('b_penalty_at'),
+        ), changes)
+    return len(events)
+
+# --- Queries ---
+def find_port(key):
+    """
+    The PortKey for a URL key: its id, or '<device_type>:<device id or name>:<port>'
+    (e.g. 'switch:SW-01:Gi1/0/12'); the port also matches by interface name or number
+    as in /port_status. Returns None if unknown.
+    """
+    if key.isdigit():
+        return db.session.get(PortKey, int(key))
+    parts = key.split(':', 2)
+    if len(parts) != 3 or parts[0] not in DEVICE_TYPES:
+        return None
+    device_type, device, port = parts
+    if not device.isdigit():
+        model = DEVICE_TYPES[device_type]
+        device = db.session.execute(select(model.id).where(model.name == device).order_by(model.id)).scalar()
+        if device is None:
+            return None
+    candidates = db.session.execute(select(PortKey).where(PortKey.device_type == device_type, PortKey.device_id == int(device))).scalars().all()
+    wanted = normalize_interface(port)
+    match = next((c for c in candidates if normalize_interface(c.port) == wanted), None)
+    if match is None and port_number(wanted) is not None:
+        match = next((c for c in candidates if c.port == str(port_number(wanted))), None)
+    return match
+
+def _state_before(port_id, ts):
+    return db.session.execute(
+        select(PortStateEvent.up).where(PortStateEvent.port_id == port_id, PortStateEvent.ts < ts).order_by(PortStateEvent.ts.desc()).limit(1)
+    ).scalar()
+
+def port_history(port, start, end, buckets):
+    """
+    The states of a port in [start, end): the raw transitions when there are at most
+    MAX_RAW_EVENTS of them (and no bucket count was asked for), else 'buckets' buckets with
+    the uptime ratio, transitions and last state of each. Buckets of a day or more are
+    summed from the daily rollup.
+    """
+    initial = _state_before(port.id, start)
+    result = {'port': port.to_dict(), 'from': start, 'to': end, 'initial_up': initial}
+    if buckets and (end - start) / buckets >= DAY:
+        result['buckets'] = _daily_buckets(port, start, end, buckets)
+        return result
+    events = db.session.execute(
+        select(PortStateEvent.ts, PortStateEvent.up).where(PortStateEvent.port_id == port.id, PortStateEvent.ts >= start, PortStateEvent.ts < end)
+        .order_by(PortStateEvent.ts)
+    ).all()
+    if not buckets and len(events) <= MAX_RAW_EVENTS:
+        result['events'] = [{'ts': ts, 'up': up} for ts, up in events]
+        return result
+    result['buckets'] = _event_buckets(initial, events, start, end, buckets or 500)
+    return result
+
+def _event_buckets(state, events, start, end, count):
+    size = max(1, -(-(end - start) // count)) # Ceiling division: count buckets cover the range
+    out = []
+    position, i = start, 0
+    for bucket_start in range(start, end, size):
+        bucket_end = min(end, bucket_start + size)
+        up_seconds = known = transitions = 0
+        while True:
+            next_ts = events[i][0] if i < len(events) and events[i][0] < bucket_end else bucket_end
+            if state is not None:
+                known += next_ts - position
+                up_seconds += next_ts - position if state else 0
+            position = next_ts
+            if next_ts == bucket_end:
+                break
+            state = events[i][1]
+            transitions += 1
+            i += 1
+        out.append({'start': bucket_start, 'end': bucket_end, 'uptime': round(up_seconds / known, 4) if known else None,
+                    'transitions': transitions, 'up': state})
+    return out
+
+def _daily_buckets(port, start, end, count):
+    first_day, last_day = start // DAY, (end - 1) // DAY
+    rows = {day: (u, d, n) for day, u, d, n in db.session.execute(
+        select(PortStateDaily.day, PortStateDaily.up_seconds, PortStateDaily.down_seconds, PortStateDaily.transitions)
+        .where(PortStateDaily.port_id == port.id, PortStateDaily.day >= first_day, PortStateDaily.day <= last_day)
+    )}
+    _add_open_interval(rows, port, first_day, last_day)
+    total_days = last_day - first_day + 1
+    count = min(count, total_days)
+    out = []
+    for i in range(count): # Whole days, spread evenly over the buckets
+        bucket_start, bucket_end = first_day + i * total_days // count, first_day + (i + 1) * total_days // count
+        days = [rows.get(day, (0, 0, 0)) for day in range(bucket_start, bucket_end)]
+        up, down, transitions = (sum(column) for column in zip(*days))
+        out.append({'start': bucket_start * DAY, 'end': bucket_end * DAY,
+                    'uptime': round(up / (up + down), 4) if up + down else None, 'transitions': transitions})
+    return out
+
+def _add_open_interval(rows, port, first_day, last_day, now=None):
+    """Adds the still open interval since the port's last transition (not in the rollup yet) to rows."""
+    if port.last_change is None:
+        return
+    pending = {}
+    _add_interval(pending, port.id, port.last_change, int(now or time.time()), port.last_up)
+    for (_, day), (up, down, _) in pending.items():
+        if first_day <= day <= last_day:
+            u, d, n = rows.get(day, (0, 0, 0))
+            rows[day] = (u + up, d + down, n)
+
+def flapping_ports(threshold, now=None):
+    """The ports whose decayed flap penalty is at least 'threshold', highest first."""
+    now = int(now or time.time())
+    # A penalty can only have decayed since it was stored, so the stored value bounds the current one
+    ports = db.session.execute(select(PortKey).where(PortKey.flap_penalty >= threshold)).scalars().all()
+    names = _device_names(ports)
+    out = []
+    for port in ports:
+        penalty = _decayed(port.flap_penalty, port.flap_updated, now)
+        if penalty >= threshold:
+            out.append(dict(port.to_dict(), device_name=names.get((port.device_type, port.device_id)), penalty=round(penalty, 1)))
+    return sorted(out, key=lambda p: -p['penalty'])
+
+def _device_names(ports):
+    names = {}
+    for device_type, model in DEVICE_TYPES.items():
+        ids = {p.device_id for p in ports if p.device_type == device_type}
+        if ids:
+            for id_, name in db.session.execute(select(model.id, model.name).where(model.id.in_(ids))):
+                names[(device_type, id_)] = name
+    return names
+
+def switch_uptime(switch_id, first_day, last_day):
+    """Daily uptime of a switch's monitored ports (all ports summed) and per port, from the rollup."""
+    ports = db.session.execute(select(PortKey).where(PortKey.device_type == 'switch', PortKey.device_id == switch_id)).scalars().all()
+    by_port = {port.id: {} for port in ports}
+    if ports:
+        for port_id, day, u, d, n in db.session.execute(
+            select(PortStateDaily.port_id, PortStateDaily.day, PortStateDaily.up_seconds, PortStateDaily.down_seconds, PortStateDaily.transitions)
+            .where(PortStateDaily.port_id.in_(list(by_port)), PortStateDaily.day >= first_day, PortStateDaily.day <= last_day)
+        ):
+            by_port[port_id][day] = (u, d, n)
+    now = int(time.time())
+    days = {}
+    port_totals = []
+    for port in ports:
+        rows = by_port[port.id]
+        _add_open_interval(rows, port, first_day, last_day, now)
+        up = down = transitions = 0
+        for day, (u, d, n) in rows.items():
+            total = days.setdefault(day, [0, 0, 0])
+            total[0] += u; total[1] += d; total[2] += n
+            up += u; down += d; transitions += n
+        port_totals.append({'port': port.port, 'key': port.id, 'uptime': round(up / (up + down), 4) if up + down else None,
+                            'transitions': transitions, 'up': port.last_up})
+    up = sum(t[0] for t in days.values())
+    down = sum(t[1] for t in days.values())
+    return {
+        'switch_id': switch_id, 'from_day': first_day * DAY, 'to_day': last_day * DAY,
+        'uptime': round(up / (up + down), 4) if up + down else None,
+        'days': [{'day': day * DAY, 'uptime': round(u / (u + d), 4) if u + d else None, 'transitions': n}
+                 for day, (u, d, n) in sorted(days.items())],
+        'ports': sorted(port_totals, key=lambda p: p['port']),
+    }
@@ -0,0 +1,317 @@
+# backend/port_status.py
+# This file implements link-state ingestion for monitoring ('POST /port_status').
+# Updates are (device, port, state) tuples: a switch (name or IP address) or patch panel
+# name, a port as documented or as the device names it ('12', 'Gi1/0/12'), and up/down.
+# Accepted updates only go into an in-memory buffer of this worker process, keyed by
+# device and port, so repeated updates of a port coalesce to its latest state. A flusher
+# thread applies the buffer every PORT_STATUS_FLUSH_INTERVAL seconds (sooner when it holds
+# PORT_STATUS_MAX_PENDING ports): it resolves the ports with a few queries and sets
+# Connection.is_switch_port_up / ConnectionHop.is_port_up with one conditional UPDATE per
+# table and state, which skips rows already in that state. Each flush that changed something
+# writes one PORT_STATUS SystemLog entry summarizing it.
+# Every worker has its own buffer and flushes on its own schedule, so a flush may carry
+# reports older than ones another worker already applied. port_status_reports keeps the time
+# of the report last applied to each row, and a report only applies when it is not older.
+# The buffer also keeps each port's state changes with the time they were reported (at most
+# MAX_TRANSITIONS per port and flush), which the flush records as link-state history (see
+# port_history.py), so a port flapping between two flushes keeps its transitions.
+# Updates still buffered when a worker exits are flushed at exit; ones lost to a crash are
+# repaired by the next report of the same port, as monitoring re-sends state.
+
+import atexit
+import os
+import threading
+import time
+
+from sqlalchemy import select, update, func, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import OperationalError
+
+from .extensions import db
+from .models import Switch, PatchPanel, Connection, ConnectionHop, PortStatusReport
+from .services import SystemLogService
+from .versioning import bump_table_versions
+from .device_output import normalize_interface, port_number, link_up
+from .port_history import record_transitions
+
+UPDATE_CHUNK = 500 # Ids per UPDATE ... WHERE id IN (...)
+LOG_SAMPLE_SIZE = 20
+MAX_TRANSITIONS = 100 # Timestamped state changes buffered per port between flushes
+
+_STATES = {'up': True, 'down': False, 'true': True, 'false': False, '1': True, '0': False}
+
+class _Buffer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {} # (device key, port key) -> (device, port, up, [(ts, up), ...], reported at)
+        self.received = 0 # Updates accepted into 'pending' since the last flush
+        self.wake = threading.Event()
+        self.flush_lock = threading.Lock() # One flush at a time per process
+        self.last_flush = None
+        self.totals = {'received': 0, 'flushes': 0, 'changed': 0, 'unknown': 0, 'errors': 0}
+
+_buffer = _Buffer()
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+
+def parse_update(entry):
+    """(device, port, up) from {'device', 'port', 'state'} or [device, port, state]. Raises ValueError."""
+    if isinstance(entry, (list, tuple)) and len(entry) == 3:
+        device, port, state = entry
+    elif isinstance(entry, dict):
+        device, port, state = entry.get('device'), entry.get('port'), entry.get('state')
+    else:
+        raise ValueError("Expected {'device', 'port', 'state'} or [device, port, state].")
+    if not isinstance(device, str) or not device.strip():
+        raise ValueError("'device' must be a switch name or IP address, or a patch panel name.")
+    if isinstance(port, int) and not isinstance(port, bool):
+        port = str(port)
+    if not isinstance(port, str) or not port.strip():
+        raise ValueError("'port' must be a port number or interface name.")
+    if isinstance(state, bool):
+        up = state
+    elif isinstance(state, str):
+        up = _STATES.get(state.strip().lower())
+        if up is None:
+            up = link_up(state) # Also accept device wording: 'connected', 'notconnect', ...
+    else:
+        up = None
+    if up is None:
+        raise ValueError("'state' must be up/down or true/false.")
+    return device.strip(), port.strip(), up
+
+def submit(entries, max_pending):
+    """
+    Adds parsed updates to this process's buffer, replacing older states of the same ports.
+    Returns the number of ports now pending. Wakes the flusher when max_pending is reached.
+    """
+    now = time.time()
+    with _buffer.lock:
+        for device, port, up in entries:
+            key = (device.lower(), normalize_interface(port))
+            previous = _buffer.pending.pop(key, None) # Re-inserted at the end: 'pending' stays in order of the latest update
+            transitions = previous[3] if previous else []
+            if not transitions or transitions[-1][1] != up:
+                transitions.append((int(now), up))
+                del transitions[:-MAX_TRANSITIONS]
+            _buffer.pending[key] = (device, port, up, transitions, now)
+        _buffer.received += len(entries)
+        _buffer.totals['received'] += len(entries)
+        pending = len(_buffer.pending)
+    if pending >= max_pending:
+        _buffer.wake.set()
+    return pending
+
+def status():
+    """This process's buffer and flush statistics."""
+    with _buffer.lock:
+        return {
+            'pid': os.getpid(), 'pending': len(_buffer.pending), 'received_since_flush': _buffer.received,
+            'last_flush': _buffer.last_flush, 'totals': dict(_buffer.totals),
+        }
+
+# --- Applying ---
+def _device_ids(connection, names):
+    """{device key: ('switch' | 'patch_panel', id)}; a switch wins over a patch panel of the same name."""
+    devices = {}
+    for id_, name in connection.execute(select(PatchPanel.id, PatchPanel.name).where(func.lower(PatchPanel.name).in_(names)).order_by(PatchPanel.id.desc())):
+        devices[name.lower()] = ('patch_panel', id_)
+    for id_, name, ip in connection.execute(
+        select(Switch.id, Switch.name, Switch.ip_address).where(or_(func.lower(Switch.name).in_(names), Switch.ip_address.in_(names))).order_by(Switch.id.desc())
+    ):
+        for key in (name.lower(), ip):
+            if key in names:
+                devices[key] = ('switch', id_)
+    return devices
+
+def _port_index(connection, id_column, device_column, port_column, device_ids):
+    """{(device id, port key): [(row id, documented port)]} for the ports of the given devices."""
+    index = {}
+    ids = list(device_ids)
+    for start in range(0, len(ids), UPDATE_CHUNK):
+        for id_, device_id, port in connection.execute(select(id_column, device_column, port_column).where(device_column.in_(ids[start:start + UPDATE_CHUNK]))):
+            index.setdefault((device_id, normalize_interface(port)), []).append((id_, port))
+    return index
+
+def _lookup(index, device_id, port_key):
+    rows = index.get((device_id, port_key))
+    if rows is None and port_number(port_key) is not None:
+        rows = index.get((device_id, str(port_number(port_key)))) # 'Gi1/0/12' reported, '12' documented
+    return rows
+
+def _set_state(connection, table, column, ids, up):
+    """Sets column to 'up' where it differs, bumping version_id. Returns the ids that changed."""
+    changed = []
+    for start in range(0, len(ids), UPDATE_CHUNK):
+        changed += connection.execute(
+            update(table).where(table.c.id.in_(ids[start:start + UPDATE_CHUNK]), column != up)
+            .values({column.name: up, 'version_id': table.c.version_id + 1}).returning(table.c.id)
+        ).scalars().all()
+    return changed
+
+def _accept_reports(connection, reported):
+    """
+    Stores the reports in port_status_reports unless a newer one is there already (applied
+    by another worker). Returns the (kind, row id) pairs whose report was stored.
+    """
+    table = PortStatusReport.__table__
+    if not reported:
+        return set()
+    stmt = sqlite_insert(table)
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=['kind', 'row_id'], set_={'up': stmt.excluded.up, 'reported_at': stmt.excluded.reported_at},
+        where=table.c.reported_at <= stmt.excluded.reported_at,
+    ), [{'kind': kind, 'row_id': row_id, 'up': report[2], 'reported_at': report[3]} for (kind, row_id), report in reported.items()])
+    # This transaction holds the write lock now, so reading back shows which reports were stored
+    accepted = set()
+    for kind in ('switch', 'patch_panel'):
+        ids = [row_id for k, row_id in reported if k == kind]
+        for start in range(0, len(ids), UPDATE_CHUNK):
+            accepted.update(
+                (kind, row_id) for row_id, reported_at in connection.execute(
+                    select(table.c.row_id, table.c.reported_at).where(table.c.kind == kind, table.c.row_id.in_(ids[start:start + UPDATE_CHUNK]))
+                ) if reported_at == reported[(kind, row_id)][3]
+            )
+    return accepted
+
+def apply_updates(items, received):
+    """
+    Applies coalesced (device, port, up, transitions, reported at) updates in one transaction,
+    skipping rows that already have a newer report, records the transitions as port history
+    and logs a summary when any connection changed. Must run in an app context. Returns the
+    flush result dictionary.
+    """
+    started = time.perf_counter()
+    connection = db.session.connection()
+    devices = _device_ids(connection, {item[0].lower() for item in items} | {item[0] for item in items})
+    switch_ids = {id_ for kind, id_ in devices.values() if kind == 'switch'}
+    panel_ids = {id_ for kind, id_ in devices.values() if kind == 'patch_panel'}
+    switch_ports = _port_index(connection, Connection.id, Connection.switch_id, Connection.switch_port, switch_ids)
+    panel_ports = _port_index(connection, ConnectionHop.id, ConnectionHop.patch_panel_id, ConnectionHop.patch_panel_port, panel_ids)
+
+    # Two spellings of one port ('Gi1/0/12', '12') resolve to the same rows; the later report wins
+    reported = {}
+    port_reports = {} # (kind, device id, documented port) -> ([row ids], [(ts, up), ...])
+    unknown = []
+    for device, port, up, transitions, reported_at in items:
+        kind, device_id = devices.get(device.lower()) or devices.get(device) or (None, None)
+        rows = _lookup(switch_ports if kind == 'switch' else panel_ports, device_id, normalize_interface(port)) if kind else None
+        if not rows:
+            unknown.append({'device': device, 'port': port})
+            continue
+        for row_id, documented in rows:
+            if (kind, row_id) not in reported or reported[(kind, row_id)][3] <= reported_at:
+                reported[(kind, row_id)] = (device, port, up, reported_at)
+        row_ids, states = port_reports.setdefault((kind, device_id, documented), ([], []))
+        row_ids += [row_id for row_id, _ in rows]
+        # The report itself is a transition when another worker recorded a different state since
+        states += transitions + [(int(reported_at), up)]
+    accepted = _accept_reports(connection, reported)
+    observations = {}
+    for key, (row_ids, states) in port_reports.items():
+        if any((key[0], row_id) in accepted for row_id in row_ids): # Stale reports would rewind the history
+            observations[key] = sorted(states, key=lambda state: state[0]) # Stable: of two spellings reported in the same second, the later wins
+    targets = {('switch', True): [], ('switch', False): [], ('patch_panel', True): [], ('patch_panel', False): []}
+    for kind, row_id in accepted:
+        targets[(kind, reported[(kind, row_id)][2])].append(row_id)
+
+    changed = {'switch': [], 'patch_panel': []}
+    tables = {'switch': (Connection.__table__, Connection.__table__.c.is_switch_port_up),
+              'patch_panel': (ConnectionHop.__table__, ConnectionHop.__table__.c.is_port_up)}
+    for (kind, up), ids in targets.items():
+        if ids:
+            table, column = tables[kind]
+            changed[kind] += _set_state(connection, table, column, ids, up)
+
+    events = record_transitions(connection, observations)
+    result = {
+        'received': received, 'ports': len(items), 'history_events': events,
+        'changed': {'switch_ports': len(changed['switch']), 'patch_panel_ports': len(changed['patch_panel'])},
+        'unchanged': len(accepted) - len(changed['switch']) - len(changed['patch_panel']),
+        'stale': len(reported) - len(accepted),
+        'unknown': len(unknown), 'unknown_sample': unknown[:LOG_SAMPLE_SIZE],
+    }
+    if changed['switch'] or changed['patch_panel']:
+        bump_table_versions(connection, [tables[kind][0].name for kind in changed if changed[kind]])
+        sample = [
+            dict(zip(('device', 'port', 'up'), reported[(kind, row_id)][:3]))
+            for kind in changed for row_id in changed[kind]
+        ][:LOG_SAMPLE_SIZE]
+        SystemLogService.create_log('PORT_STATUS', 'Connection', None, 'port_status', details={
+            k: result[k] for k in ('received', 'ports', 'changed', 'unchanged', 'stale', 'unknown')
+        } | {'sample': sample})
+    db.session.commit()
+    result['seconds'] = round(time.perf_counter() - started, 3)
+    return result
+
+def flush_pending(logger=None):
+    """
+    Applies everything buffered in this process. Must run in an app context. Returns the flush
+    result, or None when nothing was pending (or the database was busy). When the flush fails
+    the updates go back into the buffer (behind any newer state of the same ports) for the
+    next flush; errors other than OperationalError are raised after that.
+    """
+    with _buffer.flush_lock:
+        with _buffer.lock:
+            if not _buffer.pending:
+                return None
+            pending, received = _buffer.pending, _buffer.received
+            _buffer.pending, _buffer.received = {}, 0
+        try:
+            result = apply_updates(list(pending.values()), received)
+        except Exception as e:
+            db.session.rollback()
+            with _buffer.lock:
+                for key, value in pending.items():
+                    newer = _buffer.pending.get(key)
+                    if newer is None:
+                        _buffer.pending[key] = value
+                    else: # Keep the newer state, with the failed batch's transitions before its own
+                        transitions = newer[3][1:] if newer[3][0][1] == value[3][-1][1] else newer[3]
+                        transitions = value[3] + transitions
+                        _buffer.pending[key] = newer[:3] + (transitions[-MAX_TRANSITIONS:], newer[4])
+                _buffer.received += received
+                _buffer.totals['errors'] += 1
+            if not isinstance(e, OperationalError):
+                raise
+            if logger:
+                logger.warning(f"Port status flush failed, retrying on the next one: {e}")
+            return None
+        with _buffer.lock:
+            _buffer.last_flush = dict(result, flushed_at=time.time())
+            _buffer.totals['flushes'] += 1
+            _buffer.totals['changed'] += result['changed']['switch_ports'] + result['changed']['patch_panel_ports']
+            _buffer.totals['unknown'] += result['unknown']
+        return result
+
+# --- Flusher thread ---
+def _flusher_loop(app):
+    interval = app.config['PORT_STATUS_FLUSH_INTERVAL']
+    while True:
+        _buffer.wake.wait(interval)
+        _buffer.wake.clear()
+        with app.app_context():
+            try:
+                flush_pending(app.logger)
+            except Exception as e:
+                db.session.rollback()
+                app.logger.error(f"Port status flush failed: {e}")
+
+def _flush_at_exit(app):
+    with app.app_context():
+        try:
+            flush_pending(app.logger)
+        except Exception as e:
+            app.logger.error(f"Port status flush at exit failed: {e}")
+
+def start_flusher(app):
+    """Starts this process's flusher thread (once per process, also after a fork)."""
+    global _flusher_pid
+    if _flusher_pid == os.getpid():
+        return
+    with _flusher_lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+        threading.Thread(target=_flusher_loop, args=(app,), name='port-status', daemon=True).start()
+        atexit.register(_flush_at_exit, app)
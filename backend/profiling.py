@@ -0,0 +1,172 @@
+# backend/profiling.py
+# This file implements on-demand profiling of individual production requests.
+# A request carrying '?__profile=<mode>' (or an 'X-Profile: <mode>' header) together with
+# an 'X-Profile-Token' header matching PROFILE_TOKEN is run under a profiler:
+#   mode 'sample' (default) - a background thread samples the request thread's stack
+#                             every PROFILE_SAMPLE_INTERVAL seconds and writes collapsed
+#                             stacks (.folded, the input format of flamegraph.pl / speedscope);
+#   mode 'cprofile'         - cProfile, written as a .pstats file (snakeviz, pstats).
+# Artifacts are stored in PROFILE_DIR and named in the X-Profile-Id response header.
+# At most one profile per PROFILE_MIN_INTERVAL seconds is taken across all workers.
+
+import cProfile
+import fcntl
+import hmac
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from flask import request, g, current_app, jsonify
+
+PROFILE_MODES = ('sample', 'cprofile')
+_EXTENSIONS = {'sample': '.folded', 'cprofile': '.pstats'}
+
+class StackSampler:
+    """Samples one thread's Python stack from a daemon thread and counts collapsed stacks."""
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if frames:
+                self.stacks[';'.join(reversed(frames))] += 1
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+def profile_token_valid():
+    """True if profiling is enabled and the request carries the right X-Profile-Token."""
+    expected = current_app.config.get('PROFILE_TOKEN')
+    supplied = request.headers.get('X-Profile-Token', '')
+    return bool(expected) and hmac.compare_digest(supplied.encode(), expected.encode())
+
+def _requested_mode():
+    mode = request.args.get('__profile') or request.headers.get('X-Profile')
+    if not mode or mode == '0':
+        return None
+    return 'sample' if mode == '1' else mode
+
+def _acquire_slot(profile_dir, min_interval):
+    """
+    Cross-worker rate limit: the time of the last profile is kept in a small file
+    guarded by an exclusive flock. Returns False while the interval has not elapsed.
+    """
+    os.makedirs(profile_dir, exist_ok=True)
+    with open(os.path.join(profile_dir, '.last_profile'), 'a+') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.seek(0)
+        try:
+            last = float(f.read() or 0)
+        except ValueError:
+            last = 0.0
+        now = time.time()
+        if now - last < min_interval:
+            return False
+        f.seek(0)
+        f.truncate()
+        f.write(str(now))
+        return True
+
+def _prune(profile_dir, max_files):
+    artifacts = sorted(
+        (os.path.join(profile_dir, name) for name in os.listdir(profile_dir) if not name.startswith('.')),
+        key=os.path.getmtime
+    )
+    for path in artifacts[:-max_files]:
+        os.remove(path)
+
+# --- Request hooks ---
+def _start_profile():
+    mode = _requested_mode()
+    if mode is None or not current_app.config.get('PROFILE_TOKEN'):
+        return None
+    if not profile_token_valid():
+        return jsonify({'error': 'Invalid or missing X-Profile-Token'}), 403
+    if mode not in PROFILE_MODES:
+        return jsonify({'error': f"Unknown profile mode '{mode}'. Use one of: {', '.join(PROFILE_MODES)}"}), 400
+    if not _acquire_slot(current_app.config['PROFILE_DIR'], current_app.config['PROFILE_MIN_INTERVAL']):
+        return jsonify({'error': 'A profile was taken recently, try again later'}), 429
+
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.enable()
+    else:
+        profiler = StackSampler(threading.get_ident(), current_app.config['PROFILE_SAMPLE_INTERVAL'])
+        profiler.start()
+    g.profile = (mode, profiler)
+    return None
+
+def _stop_profile():
+    """Stops the running profiler and stores its artifact. Returns the artifact name, or None."""
+    active = g.pop('profile', None)
+    if active is None:
+        return None
+    mode, profiler = active
+    if mode == 'cprofile':
+        profiler.disable()
+    else:
+        profiler.stop()
+
+    profile_dir = current_app.config['PROFILE_DIR']
+    endpoint = (request.endpoint or 'unmatched').replace('.', '_')
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}-{endpoint}-{uuid.uuid4().hex[:8]}{_EXTENSIONS[mode]}"
+    path = os.path.join(profile_dir, name)
+    if mode == 'cprofile':
+        profiler.dump_stats(path)
+    else:
+        profiler.write(path)
+    _prune(profile_dir, current_app.config['PROFILE_MAX_FILES'])
+    current_app.logger.info(f"Stored {mode} profile of {request.method} {request.full_path} as {name}")
+    return name
+
+def _finish_profile(response):
+    name = _stop_profile()
+    if name:
+        response.headers['X-Profile-Id'] = name
+    return response
+
+def _teardown_profile(exc):
+    # Only reached with an active profiler when the view raised and after_request was skipped
+    _stop_profile()
+
+# --- Artifact access (used by the /profiles endpoints) ---
+def list_profiles():
+    """Returns the stored artifacts, newest first."""
+    profile_dir = current_app.config['PROFILE_DIR']
+    if not os.path.isdir(profile_dir):
+        return []
+    profiles = []
+    for name in os.listdir(profile_dir):
+        if name.startswith('.'):
+            continue
+        stat = os.stat(os.path.join(profile_dir, name))
+        profiles.append({'name': name, 'size': stat.st_size, 'created_at': stat.st_mtime})
+    return sorted(profiles, key=lambda p: p['created_at'], reverse=True)
+
+def init_profiling(app):
+    """Registers the profiling hooks. They do nothing unless PROFILE_TOKEN is set."""
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_teardown_profile)
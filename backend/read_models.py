@@ -0,0 +1,381 @@
+# backend/read_models.py
+# This file contains the read-model layer used by the GET endpoints.
+# Each list and detail projection is a SQLAlchemy Core select with explicit joins,
+# and rows are turned straight into dictionaries without building ORM objects.
+# The dictionaries match the models' to_dict() output key for key.
+# List projections return a RowSet, which also exposes a per-row version key so
+# serialized rows can be cached (see serializers.py).
+
+from sqlalchemy import select, or_
+
+from .extensions import db
+from .models import Location, Rack, PC, PatchPanel, Switch, Connection, ConnectionHop
+
+locations_t = Location.__table__
+racks_t = Rack.__table__
+pcs_t = PC.__table__
+patch_panels_t = PatchPanel.__table__
+switches_t = Switch.__table__
+connections_t = Connection.__table__
+connection_hops_t = ConnectionHop.__table__
+
+# --- Column helpers ---
+# Every projection labels its columns with a prefix (e.g. 'rack__loc__') so that
+# the same table can be joined several times in one select.
+def _labelled(table, names, prefix):
+    return [table.c[name].label(f"{prefix}{name}") for name in names]
+
+# 'version_id' and 'updated_at' are selected for every entity so rows can be keyed by
+# version; they are not part of the dictionaries. updated_at keeps keys unique when
+# a restore (see backup.py) brings back rows whose ids and versions were seen before.
+LOCATION_FIELDS = ['id', 'version_id', 'updated_at', 'name', 'door_number', 'description']
+RACK_FIELDS = ['id', 'version_id', 'updated_at', 'name', 'location_id', 'description', 'total_units', 'orientation']
+PC_FIELDS = [
+    'id', 'version_id', 'updated_at', 'name', 'ip_address', 'username', 'in_domain', 'operating_system', 'model',
+    'office', 'description', 'multi_port', 'type', 'usage', 'row_in_rack', 'rack_id',
+    'units_occupied', 'serial_number', 'pc_specification', 'monitor_model', 'disk_info'
+]
+PATCH_PANEL_FIELDS = ['id', 'version_id', 'updated_at', 'name', 'location_id', 'row_in_rack', 'rack_id', 'units_occupied', 'total_ports', 'description']
+SWITCH_FIELDS = [
+    'id', 'version_id', 'updated_at', 'name', 'ip_address', 'location_id', 'row_in_rack', 'rack_id', 'units_occupied',
+    'total_ports', 'source_port', 'model', 'description', 'usage'
+]
+CONNECTION_FIELDS = [
+    'id', 'version_id', 'updated_at', 'pc_id', 'switch_id', 'switch_port', 'is_switch_port_up', 'cable_color', 'cable_label',
+    'wall_point_label', 'wall_point_cable_color', 'wall_point_cable_label'
+]
+HOP_FIELDS = ['id', 'version_id', 'updated_at', 'connection_id', 'patch_panel_id', 'patch_panel_port', 'is_port_up', 'sequence', 'cable_color', 'cable_label']
+
+# --- Projection builders ---
+# Each *_projection builder returns the labelled columns (and, for entities with
+# relations, the outer joins) for a table aliased under a prefix. The matching
+# *_from_row function converts a result mapping back into a dictionary.
+def _location_projection(loc, prefix):
+    return _labelled(loc, LOCATION_FIELDS, prefix)
+
+def _location_from_row(m, prefix):
+    if m[f"{prefix}id"] is None:
+        return None
+    return {
+        'id': m[f"{prefix}id"],
+        'name': m[f"{prefix}name"],
+        'door_number': m[f"{prefix}door_number"],
+        'description': m[f"{prefix}description"]
+    }
+
+def _rack_projection(rack, prefix):
+    """Columns and outer joins for a rack together with its location."""
+    loc = locations_t.alias(f"{prefix}loc")
+    columns = _labelled(rack, RACK_FIELDS, prefix) + _location_projection(loc, f"{prefix}loc__")
+    joins = [(loc, loc.c.id == rack.c.location_id)]
+    return columns, joins
+
+def _rack_from_row(m, prefix):
+    if m[f"{prefix}id"] is None:
+        return None
+    location = _location_from_row(m, f"{prefix}loc__")
+    return {
+        'id': m[f"{prefix}id"],
+        'name': m[f"{prefix}name"],
+        'location_id': m[f"{prefix}location_id"],
+        'location_name': location['name'] if location else None,
+        'location': location,
+        'description': m[f"{prefix}description"],
+        'total_units': m[f"{prefix}total_units"],
+        'orientation': m[f"{prefix}orientation"],
+    }
+
+def _pc_projection(pc, prefix):
+    """Columns and outer joins for a PC together with its rack (and the rack's location)."""
+    rack = racks_t.alias(f"{prefix}rack")
+    rack_columns, rack_joins = _rack_projection(rack, f"{prefix}rack__")
+    columns = _labelled(pc, PC_FIELDS, prefix) + rack_columns
+    joins = [(rack, rack.c.id == pc.c.rack_id)] + rack_joins
+    return columns, joins
+
+def _pc_from_row(m, prefix):
+    if m[f"{prefix}id"] is None:
+        return None
+    rack = _rack_from_row(m, f"{prefix}rack__")
+    return {
+        'id': m[f"{prefix}id"],
+        'name': m[f"{prefix}name"],
+        'ip_address': m[f"{prefix}ip_address"],
+        'username': m[f"{prefix}username"],
+        'in_domain': m[f"{prefix}in_domain"],
+        'operating_system': m[f"{prefix}operating_system"],
+        'model': m[f"{prefix}model"],
+        'office': m[f"{prefix}office"],
+        'description': m[f"{prefix}description"],
+        'multi_port': m[f"{prefix}multi_port"],
+        'type': m[f"{prefix}type"],
+        'usage': m[f"{prefix}usage"],
+        'row_in_rack': m[f"{prefix}row_in_rack"],
+        'rack_id': m[f"{prefix}rack_id"],
+        'units_occupied': m[f"{prefix}units_occupied"],
+        'rack_name': rack['name'] if rack else None,
+        'rack': rack,
+        'serial_number': m[f"{prefix}serial_number"],
+        'pc_specification': m[f"{prefix}pc_specification"],
+        'monitor_model': m[f"{prefix}monitor_model"],
+        'disk_info': m[f"{prefix}disk_info"],
+    }
+
+def _placed_projection(table, fields, prefix):
+    """Columns and outer joins for a device that has a location and a rack (patch panels, switches)."""
+    loc = locations_t.alias(f"{prefix}loc")
+    rack = racks_t.alias(f"{prefix}rack")
+    rack_columns, rack_joins = _rack_projection(rack, f"{prefix}rack__")
+    columns = _labelled(table, fields, prefix) + _location_projection(loc, f"{prefix}loc__") + rack_columns
+    joins = [(loc, loc.c.id == table.c.location_id), (rack, rack.c.id == table.c.rack_id)] + rack_joins
+    return columns, joins
+
+def _patch_panel_from_row(m, prefix):
+    if m[f"{prefix}id"] is None:
+        return None
+    location = _location_from_row(m, f"{prefix}loc__")
+    rack = _rack_from_row(m, f"{prefix}rack__")
+    return {
+        'id': m[f"{prefix}id"],
+        'name': m[f"{prefix}name"],
+        'location_id': m[f"{prefix}location_id"],
+        'location_name': location['name'] if location else None,
+        'row_in_rack': m[f"{prefix}row_in_rack"],
+        'rack_id': m[f"{prefix}rack_id"],
+        'units_occupied': m[f"{prefix}units_occupied"],
+        'rack_name': rack['name'] if rack else None,
+        'total_ports': m[f"{prefix}total_ports"],
+        'description': m[f"{prefix}description"],
+        'location': location,
+        'rack': rack,
+    }
+
+def _switch_from_row(m, prefix):
+    if m[f"{prefix}id"] is None:
+        return None
+    location = _location_from_row(m, f"{prefix}loc__")
+    rack = _rack_from_row(m, f"{prefix}rack__")
+    return {
+        'id': m[f"{prefix}id"],
+        'name': m[f"{prefix}name"],
+        'ip_address': m[f"{prefix}ip_address"],
+        'location_id': m[f"{prefix}location_id"],
+        'location_name': location['name'] if location else None,
+        'row_in_rack': m[f"{prefix}row_in_rack"],
+        'rack_id': m[f"{prefix}rack_id"],
+        'units_occupied': m[f"{prefix}units_occupied"],
+        'rack_name': rack['name'] if rack else None,
+        'total_ports': m[f"{prefix}total_ports"],
+        'source_port': m[f"{prefix}source_port"],
+        'model': m[f"{prefix}model"],
+        'description': m[f"{prefix}description"],
+        'usage': m[f"{prefix}usage"],
+        'location': location,
+        'rack': rack,
+    }
+
+def _hop_from_row(m, prefix):
+    return {
+        'id': m[f"{prefix}id"],
+        'patch_panel': _patch_panel_from_row(m, f"{prefix}pp__"),
+        'patch_panel_port': m[f"{prefix}patch_panel_port"],
+        'is_port_up': m[f"{prefix}is_port_up"],
+        'sequence': m[f"{prefix}sequence"],
+        'cable_color': m[f"{prefix}cable_color"],
+        'cable_label': m[f"{prefix}cable_label"]
+    }
+
+def _connection_from_row(m, prefix, hops):
+    return {
+        'id': m[f"{prefix}id"],
+        'pc_id': m[f"{prefix}pc_id"],
+        'switch_id': m[f"{prefix}switch_id"],
+        'pc': _pc_from_row(m, f"{prefix}pc__"),
+        'hops': hops,
+        'switch': _switch_from_row(m, f"{prefix}sw__"),
+        'switch_port': m[f"{prefix}switch_port"],
+        'is_switch_port_up': m[f"{prefix}is_switch_port_up"],
+        'cable_color': m[f"{prefix}cable_color"],
+        'cable_label': m[f"{prefix}cable_label"],
+        'wall_point_label': m[f"{prefix}wall_point_label"],
+        'wall_point_cable_color': m[f"{prefix}wall_point_cable_color"],
+        'wall_point_cable_label': m[f"{prefix}wall_point_cable_label"]
+    }
+
+def _select(base, columns, joins):
+    """Builds a select over 'base' with the given columns and LEFT OUTER JOINs."""
+    from_clause = base
+    for target, on_clause in joins:
+        from_clause = from_clause.outerjoin(target, on_clause)
+    return select(*columns).select_from(from_clause).order_by(base.c.id)
+
+def _execute(stmt):
+    return db.session.execute(stmt).mappings()
+
+# --- Statements ---
+def _locations_stmt():
+    return _select(locations_t, _location_projection(locations_t, ''), [])
+
+def _racks_stmt():
+    return _select(racks_t, *_rack_projection(racks_t, ''))
+
+def _pcs_stmt():
+    return _select(pcs_t, *_pc_projection(pcs_t, ''))
+
+def _patch_panels_stmt():
+    return _select(patch_panels_t, *_placed_projection(patch_panels_t, PATCH_PANEL_FIELDS, ''))
+
+def _switches_stmt():
+    return _select(switches_t, *_placed_projection(switches_t, SWITCH_FIELDS, ''))
+
+def _connections_stmt():
+    pc = pcs_t.alias('pc')
+    sw = switches_t.alias('sw')
+    pc_columns, pc_joins = _pc_projection(pc, 'pc__')
+    sw_columns, sw_joins = _placed_projection(sw, SWITCH_FIELDS, 'sw__')
+    columns = _labelled(connections_t, CONNECTION_FIELDS, '') + pc_columns + sw_columns
+    joins = [(pc, pc.c.id == connections_t.c.pc_id)] + pc_joins + [(sw, sw.c.id == connections_t.c.switch_id)] + sw_joins
+    return _select(connections_t, columns, joins)
+
+def _hops_stmt():
+    pp = patch_panels_t.alias('pp')
+    pp_columns, pp_joins = _placed_projection(pp, PATCH_PANEL_FIELDS, 'pp__')
+    columns = _labelled(connection_hops_t, HOP_FIELDS, '') + pp_columns
+    joins = [(pp, pp.c.id == connection_hops_t.c.patch_panel_id)] + pp_joins
+    return _select(connection_hops_t, columns, joins).order_by(None).order_by(
+        connection_hops_t.c.connection_id, connection_hops_t.c.sequence, connection_hops_t.c.id
+    )
+
+def _hop_rows_by_connection(connection_ids=None):
+    """Loads hop rows for the given connections (or all of them) grouped by connection id, in sequence order."""
+    stmt = _hops_stmt()
+    if connection_ids is not None:
+        stmt = stmt.where(connection_hops_t.c.connection_id.in_(connection_ids))
+    hops = {}
+    for m in _execute(stmt):
+        hops.setdefault(m['connection_id'], []).append(m)
+    return hops
+
+def _version_key_labels(stmt):
+    """Labels of every 'id', 'version_id' and 'updated_at' column in a select, i.e. of every row embedded in a result row."""
+    return [c.name for c in stmt.selected_columns if c.element.name in ('id', 'version_id', 'updated_at')]
+
+# --- Row sets ---
+class RowSet:
+    """
+    The result rows of a list projection. Dictionaries are built on demand.
+    version_key(m) returns a tuple of the (id, version_id, updated_at) of every row embedded
+    in a result row, so it changes whenever anything in the row's output changes.
+    """
+    def __init__(self, kind, stmt, from_row):
+        self.kind = kind
+        self.from_row = from_row
+        self.key_labels = _version_key_labels(stmt)
+        self.mappings = _execute(stmt).all()
+
+    def __len__(self):
+        return len(self.mappings)
+
+    def version_key(self, m):
+        return (self.kind,) + tuple(m[label] for label in self.key_labels)
+
+    def build(self, m):
+        return self.from_row(m, '')
+
+    def dicts(self):
+        return [self.build(m) for m in self.mappings]
+
+class ConnectionRowSet(RowSet):
+    """Connections carry their hops, which are fetched in a second query and folded into key and dictionary."""
+    def __init__(self, stmt, hop_rows):
+        super().__init__('connections', stmt, None)
+        self.hop_rows = hop_rows
+        self.hop_key_labels = _version_key_labels(_hops_stmt())
+
+    def version_key(self, m):
+        hop_keys = tuple(
+            tuple(h[label] for label in self.hop_key_labels) for h in self.hop_rows.get(m['id'], ())
+        )
+        return super().version_key(m) + (hop_keys,)
+
+    def build(self, m):
+        return _connection_from_row(m, '', [_hop_from_row(h, '') for h in self.hop_rows.get(m['id'], ())])
+
+# --- List projections ---
+def list_locations():
+    return RowSet('locations', _locations_stmt(), _location_from_row)
+
+def list_racks():
+    return RowSet('racks', _racks_stmt(), _rack_from_row)
+
+def list_pcs():
+    return RowSet('pcs', _pcs_stmt(), _pc_from_row)
+
+def list_available_pcs():
+    """PCs that are multi-port or not yet used by any connection."""
+    stmt = _pcs_stmt().where(or_(
+        pcs_t.c.multi_port.is_(True),
+        pcs_t.c.id.not_in(select(connections_t.c.pc_id))
+    ))
+    return RowSet('pcs', stmt, _pc_from_row)
+
+def list_patch_panels():
+    return RowSet('patch_panels', _patch_panels_stmt(), _patch_panel_from_row)
+
+def list_switches():
+    return RowSet('switches', _switches_stmt(), _switch_from_row)
+
+def list_connections():
+    hop_rows = _hop_rows_by_connection()
+    return ConnectionRowSet(_connections_stmt(), hop_rows)
+
+def select_connections(connection_ids=(), switch_ids=(), rack_ids=(), location_ids=()):
+    """
+    Connections matching any of the given selections: listed ids, a listed switch, or a
+    PC, switch or hop patch panel placed in a listed rack or location (directly or via its rack).
+    """
+    in_racks = select(racks_t.c.id).where(racks_t.c.location_id.in_(location_ids))
+    def placed(table):
+        return or_(table.c.rack_id.in_(rack_ids), table.c.rack_id.in_(in_racks))
+
+    conditions = [
+        connections_t.c.id.in_(connection_ids),
+        connections_t.c.switch_id.in_(switch_ids),
+        connections_t.c.switch_id.in_(select(switches_t.c.id).where(or_(placed(switches_t), switches_t.c.location_id.in_(location_ids)))),
+        connections_t.c.pc_id.in_(select(pcs_t.c.id).where(placed(pcs_t))),
+        connections_t.c.id.in_(
+            select(connection_hops_t.c.connection_id)
+            .join(patch_panels_t, patch_panels_t.c.id == connection_hops_t.c.patch_panel_id)
+            .where(or_(placed(patch_panels_t), patch_panels_t.c.location_id.in_(location_ids)))
+        ),
+    ]
+    selected = or_(*conditions)
+    hop_rows = _hop_rows_by_connection(select(connections_t.c.id).where(selected))
+    return ConnectionRowSet(_connections_stmt().where(selected), hop_rows)
+
+# --- Detail projections ---
+def _first(stmt, from_row):
+    m = _execute(stmt).first()
+    return from_row(m, '') if m else None
+
+def get_location(location_id):
+    return _first(_locations_stmt().where(locations_t.c.id == location_id), _location_from_row)
+
+def get_rack(rack_id):
+    return _first(_racks_stmt().where(racks_t.c.id == rack_id), _rack_from_row)
+
+def get_pc(pc_id):
+    return _first(_pcs_stmt().where(pcs_t.c.id == pc_id), _pc_from_row)
+
+def get_patch_panel(pp_id):
+    return _first(_patch_panels_stmt().where(patch_panels_t.c.id == pp_id), _patch_panel_from_row)
+
+def get_switch(switch_id):
+    return _first(_switches_stmt().where(switches_t.c.id == switch_id), _switch_from_row)
+
+def get_connection(conn_id):
+    m = _execute(_connections_stmt().where(connections_t.c.id == conn_id)).first()
+    if not m:
+        return None
+    hop_rows = _hop_rows_by_connection([conn_id]).get(conn_id, [])
+    return _connection_from_row(m, '', [_hop_from_row(h, '') for h in hop_rows])
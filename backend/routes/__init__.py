@@ -0,0 +1,17 @@
+# backend/routes/__init__.py
+# The API endpoints, split into one blueprint per subsystem. The blueprint modules
+# (and the services they use) are imported when an app registers them, not when
+# backend.app is imported.
+
+from importlib import import_module
+
+# Registration order only matters for 'flask routes' output; URLs do not overlap
+BLUEPRINT_MODULES = ['logs', 'admin', 'inventory', 'connections', 'import_export', 'pdfs', 'printing', 'backup', 'port_status', 'port_history']
+
+def register_routes(app):
+    """
+    Registers all API blueprints with the given Flask application instance.
+    This function is called from the main app.py to set up the routes.
+    """
+    for name in BLUEPRINT_MODULES:
+        app.register_blueprint(import_module(f"{__name__}.{name}").bp)
@@ -0,0 +1,35 @@
+# backend/routes/admin.py
+# Operational endpoints: response cache statistics, Prometheus metrics and request profiles.
+
+from flask import Blueprint, jsonify, send_from_directory, current_app
+from werkzeug.utils import secure_filename
+
+from ..cache import get_cache
+from ..metrics import metrics_response
+from ..profiling import profile_token_valid, list_profiles
+
+bp = Blueprint('admin', __name__)
+
+@bp.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    cache = get_cache()
+    if cache is None:
+        return jsonify({'error': 'Response cache is not configured'}), 404
+    return jsonify(cache.stats()), 200
+
+@bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    return metrics_response()
+
+# Request profiles (see profiling.py); both endpoints require X-Profile-Token
+@bp.route('/profiles', methods=['GET'])
+def get_profiles():
+    if not profile_token_valid():
+        return jsonify({'error': 'Invalid or missing X-Profile-Token'}), 403
+    return jsonify(list_profiles()), 200
+
+@bp.route('/profiles/<string:name>', methods=['GET'])
+def download_profile(name):
+    if not profile_token_valid():
+        return jsonify({'error': 'Invalid or missing X-Profile-Token'}), 403
+    return send_from_directory(current_app.config['PROFILE_DIR'], secure_filename(name), as_attachment=True)
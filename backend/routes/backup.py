@@ -0,0 +1,64 @@
+# backend/routes/backup.py
+# Full-database backup and restore (see backup.py).
+
+import time
+
+from flask import Blueprint, request, jsonify, current_app
+
+from ..extensions import db
+from ..backup import stream_archive, restore_archive, RestoreError
+from ..hot_backup import read_status, list_snapshots
+from ..services import SystemLogService
+
+bp = Blueprint('backup', __name__)
+
+@bp.route('/backup', methods=['GET'])
+def download_backup():
+    try:
+        chunks = stream_archive()
+    except Exception as e:
+        current_app.logger.error(f"Error creating backup: {str(e)}")
+        return jsonify({'error': f'Failed to create backup: {str(e)}'}), 500
+    response = current_app.response_class(chunks, mimetype='application/gzip')
+    response.headers['Content-Disposition'] = f'attachment; filename="network-doc-{time.strftime("%Y%m%dT%H%M%S")}.ndjson.gz"'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@bp.route('/restore', methods=['POST'])
+def restore_backup():
+    """
+    Replaces the whole database with a /backup archive, sent as the request body or
+    as the 'file' field of a form. Requires ?confirm=replace.
+    """
+    if request.args.get('confirm') != 'replace':
+        return jsonify({'error': "Restoring replaces all data. Repeat the request with '?confirm=replace'."}), 400
+    archive = request.files['file'].stream if 'file' in request.files else request.stream
+
+    try:
+        counts, seconds = restore_archive(archive)
+    except RestoreError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error restoring backup: {str(e)}")
+        return jsonify({'error': f'Failed to restore backup: {str(e)}'}), 500
+
+    total = sum(counts.values())
+    SystemLogService.create_log('RESTORE', 'Database', None, 'Backup archive', details={'rows': counts, 'seconds': round(seconds, 3)})
+    db.session.commit()
+    current_app.logger.info(f"Restored {total} rows from a backup archive in {seconds:.2f} s")
+    return jsonify({'message': f'Restored {total} rows.', 'rows': counts, 'seconds': round(seconds, 3)}), 200
+
+@bp.route('/backup/status', methods=['GET'])
+def get_backup_status():
+    """Outcome of the last scheduled hot backup (see hot_backup.py) and the stored snapshots."""
+    config = current_app.config
+    status = read_status(config['HOT_BACKUP_DIR'])
+    interval = config['HOT_BACKUP_INTERVAL']
+    return jsonify({
+        **status,
+        'enabled': interval > 0,
+        'interval_seconds': interval,
+        'next_due_at': status['last_started_at'] + interval if interval > 0 and status.get('last_started_at') else None,
+        'keep': config['HOT_BACKUP_KEEP'],
+        'snapshots': list_snapshots(config['HOT_BACKUP_DIR']),
+    }), 200
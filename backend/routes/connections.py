@@ -0,0 +1,69 @@
+# backend/routes/connections.py
+# Connection endpoints: PC-to-switch connections and their patch panel hops.
+
+from flask import Blueprint, request, jsonify
+
+from ..extensions import db
+from ..services import ConnectionService
+from ..serializers import list_response
+from .. import read_models
+from ..cache import etag_response
+from ..instrumentation import no_lazy_loads
+
+bp = Blueprint('connections', __name__)
+
+# Connection Endpoints
+@bp.route('/connections', methods=['GET', 'POST'])
+@etag_response('connections', 'connection_hops', 'pcs', 'switches', 'patch_panels', 'racks', 'locations')
+@no_lazy_loads
+def handle_connections():
+    if request.method == 'POST':
+        data = request.json
+        required_fields = ['pc_id', 'switch_id', 'switch_port', 'is_switch_port_up', 'hops']
+        if not all(field in data for field in required_fields):
+            return jsonify({'error': 'Missing required fields for connection'}), 400
+        try:
+            new_connection = ConnectionService.create(data)
+            return jsonify(new_connection.to_dict()), 201
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 409
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 500
+    else: # GET
+        return list_response(read_models.list_connections())
+
+@bp.route('/connections/<int:conn_id>', methods=['GET', 'PUT', 'DELETE'])
+@etag_response('connections', 'connection_hops', 'pcs', 'switches', 'patch_panels', 'racks', 'locations')
+def handle_connection_by_id(conn_id):
+    if request.method == 'GET':
+        connection_data = read_models.get_connection(conn_id)
+        if not connection_data:
+            return jsonify({'error': 'Connection not found'}), 404
+        return jsonify(connection_data)
+
+    connection = ConnectionService.get_by_id(conn_id)
+    if not connection:
+        return jsonify({'error': 'Connection not found'}), 404
+
+    if request.method == 'PUT':
+        data = request.json
+        if not data:
+            return jsonify({'error': 'No data provided for update'}), 400
+        try:
+            updated_connection = ConnectionService.update(connection, data)
+            return jsonify(updated_connection.to_dict())
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 409
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 500
+    else: # DELETE
+        try:
+            ConnectionService.delete(connection)
+            return jsonify({'message': 'Connection deleted successfully'}), 200
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 500
@@ -0,0 +1,640 @@
+# backend/routes/import_export.py
+# CSV export and import endpoints.
+
+import time
+
+from flask import Blueprint, request, jsonify, make_response, current_app, stream_with_context
+from sqlalchemy.exc import IntegrityError
+
+from ..extensions import db
+from ..services import PCService, PatchPanelService, SwitchService, ConnectionService, LocationService, RackService
+from ..models import Location, Rack, PC, PatchPanel, Switch, Connection
+from ..utils import WIDE_EXPORT_HOPS, validate_rack_unit_occupancy, validate_port_occupancy
+from ..metrics import record_import
+from ..import_validation import validate_import, port_in_range
+from ..import_sync import plan_sync, apply_sync, SyncError, LOG_ENTITY_TYPES
+from ..connection_csv import LONG_COLUMNS, long_rows, group_long_rows, hop_numbers
+from ..bulk_import import MODES as BULK_MODES, bulk_import, iter_lines
+from ..export_archive import stream_export
+
+bp = Blueprint('import_export', __name__)
+
+# CSV Export Endpoints
+@bp.route('/export/all', methods=['GET'])
+def export_all():
+    """Every entity CSV and a manifest (row counts, SHA-256) in one streamed ZIP; see export_archive.py."""
+    try:
+        chunks = stream_export()
+    except Exception as e:
+        current_app.logger.error(f"Error during full CSV export: {str(e)}")
+        return jsonify({'error': f'Failed to export data: {str(e)}'}), 500
+    response = current_app.response_class(chunks, mimetype='application/zip')
+    response.headers['Content-Disposition'] = f'attachment; filename="network-doc-csv-{time.strftime("%Y%m%dT%H%M%S")}.zip"'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@bp.route('/export/<entity_type>', methods=['GET'])
+def export_data(entity_type):
+    import csv # csv/io are imported on first use; only the CSV endpoints need them
+    import io
+
+    if request.args.get('format') == 'long':
+        if entity_type != 'connections':
+            return jsonify({'error': 'The long format is only available for connections.'}), 400
+        return _export_connections_long()
+
+    si = io.StringIO()
+    cw = csv.writer(si)
+
+    headers = []
+    data_rows = []
+    filename = f'{entity_type}.csv'
+    errors = []
+
+    try:
+        if entity_type == 'locations':
+            headers = ['id', 'name', 'door_number', 'description']
+            items = LocationService.get_all_locations()
+            data_rows = [[item.id, item.name, item.door_number, item.description] for item in items]
+        elif entity_type == 'racks':
+            headers = ['id', 'name', 'location_id', 'location_name', 'location_door_number', 'description', 'total_units', 'orientation']
+            items = RackService.get_all_racks()
+            data_rows = [[r.id, r.name, r.location_id, r.location.name if r.location else '', r.location.door_number if r.location else '', r.description, r.total_units, r.orientation] for r in items]
+        elif entity_type == 'pcs':
+            # UPDATED: Add new fields to PC export headers
+            headers = [
+                'id', 'name', 'ip_address', 'username', 'in_domain', 
+                'operating_system', 'model', 'office', 'description', 
+                'multi_port', 'type', 'usage', 'row_in_rack', 'units_occupied', 
+                'rack_id', 'rack_name', 'serial_number', 'pc_specification', 
+                'monitor_model', 'disk_info'
+            ]
+            items = PCService.get_all_pcs()
+            # UPDATED: Add new fields to PC export data
+            data_rows = [[
+                pc.id, pc.name, pc.ip_address, pc.username, pc.in_domain, 
+                pc.operating_system, pc.model, pc.office, pc.description, 
+                pc.multi_port, pc.type, pc.usage, pc.row_in_rack, pc.units_occupied, 
+                pc.rack_id, pc.rack.name if pc.rack else '', pc.serial_number, 
+                pc.pc_specification, pc.monitor_model, pc.disk_info
+            ] for pc in items]
+        elif entity_type == 'patch_panels':
+            headers = ['id', 'name', 'location_id', 'location_name', 'location_door_number', 'row_in_rack', 'units_occupied', 'rack_id', 'rack_name', 'total_ports', 'description']
+            items = PatchPanelService.get_all_patch_panels()
+            data_rows = [[pp.id, pp.name, pp.location_id, pp.location.name if pp.location else '', pp.location.door_number if pp.location else '', pp.row_in_rack, pp.units_occupied, pp.rack_id, pp.rack.name if pp.rack else '', pp.total_ports, pp.description] for pp in items]
+        elif entity_type == 'switches':
+            headers = ['id', 'name', 'ip_address', 'location_id', 'location_name', 'location_door_number', 'row_in_rack', 'units_occupied', 'rack_id', 'rack_name', 'total_ports', 'source_port', 'model', 'description', 'usage']
+            items = SwitchService.get_all_switches()
+            data_rows = [[s.id, s.name, s.ip_address, s.location_id, s.location.name if s.location else '', s.location.door_number if s.location else '', s.row_in_rack, s.units_occupied, s.rack_id, s.rack.name if s.rack else '', s.total_ports, s.source_port, s.model, s.description, s.usage] for s in items]
+        elif entity_type == 'connections':
+            headers = [
+                'connection_id', 'pc_id', 'pc_name', 'pc_ip_address', 'cable_color', 'cable_label',
+                'switch_id', 'switch_name', 'switch_ip_address',
+                'switch_port', 'is_switch_port_up',
+            ]
+            all_connections = ConnectionService.get_all_connections()
+            hop_groups = max([WIDE_EXPORT_HOPS] + [len(conn.hops) for conn in all_connections]) # Longer paths add hop columns
+            for i in range(hop_groups):
+                headers.extend([
+                    f'hop{i+1}_patch_panel_id', f'hop{i+1}_patch_panel_name', f'hop{i+1}_patch_panel_location_name', f'hop{i+1}_patch_panel_location_door_number', f'hop{i+1}_patch_panel_row_in_rack', f'hop{i+1}_patch_panel_rack_id', f'hop{i+1}_patch_panel_rack_name',
+                    f'hop{i+1}_patch_panel_port', f'hop{i+1}_is_port_up',
+                    f'hop{i+1}_cable_color', f'hop{i+1}_cable_label'
+                ])
+
+            for conn in all_connections:
+                row = [
+                    conn.id,
+                    conn.pc.id if conn.pc else '',
+                    conn.pc.name if conn.pc else '',
+                    conn.pc.ip_address if conn.pc else '',
+                    conn.cable_color,
+                    conn.cable_label,
+                    conn.switch.id if conn.switch else '',
+                    conn.switch.name if conn.switch else '',
+                    conn.switch.ip_address if conn.switch else '',
+                    conn.switch_port,
+                    conn.is_switch_port_up,
+                ]
+                for i in range(hop_groups):
+                    if i < len(conn.hops):
+                        hop = conn.hops[i]
+                        row.extend([
+                            hop.patch_panel.id if hop.patch_panel else '',
+                            hop.patch_panel.name if hop.patch_panel else '',
+                            hop.patch_panel.location.name if hop.patch_panel and hop.patch_panel.location else '',
+                            hop.patch_panel.location.door_number if hop.patch_panel and hop.patch_panel.location else '',
+                            hop.patch_panel.row_in_rack if hop.patch_panel else '',
+                            hop.patch_panel.rack_id if hop.patch_panel else '',
+                            hop.patch_panel.rack.name if hop.patch_panel and hop.patch_panel.rack else '',
+                            hop.patch_panel_port,
+                            hop.is_port_up,
+                            hop.cable_color,
+                            hop.cable_label
+                        ])
+                    else:
+                        row.extend([''] * 11) # Fill with empty strings for missing hop details
+                data_rows.append(row)
+        else:
+            return jsonify({'error': 'Invalid entity type for export.'}), 400
+
+        cw.writerow(headers)
+        cw.writerows(data_rows)
+
+        output = make_response(si.getvalue())
+        output.headers["Content-Disposition"] = f"attachment; filename={filename}"
+        output.headers["Content-type"] = "text/csv"
+        return output
+
+    except Exception as e:
+        current_app.logger.error(f"Error during CSV export for {entity_type}: {str(e)}")
+        return jsonify({'error': f'Failed to export {entity_type} data: {str(e)}'}), 500
+
+def _export_connections_long():
+    """The connections CSV in the long format (see connection_csv.py), streamed row by row."""
+    import csv
+    import io
+
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(LONG_COLUMNS)
+        for row in long_rows():
+            writer.writerow(row)
+            if buffer.tell() >= 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    response = current_app.response_class(stream_with_context(generate()), mimetype='text/csv')
+    response.headers["Content-Disposition"] = "attachment; filename=connections_long.csv"
+    return response
+
+def _check_rack_range(rack, row_in_rack, units_occupied, label):
+    """Raises ValueError when the units do not fit in the rack (the dry run's 'rack_units_out_of_range')."""
+    if row_in_rack + units_occupied - 1 > (rack.total_units or 0):
+        raise ValueError(f"{label} would occupy units {row_in_rack}-{row_in_rack + units_occupied - 1}, but rack '{rack.name}' has {rack.total_units}U. Skipped.")
+
+# CSV Import Endpoint
+@bp.route('/import/<entity_type>', methods=['POST'])
+def import_data(entity_type):
+    import csv
+    import io
+
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file part in the request.'}), 400
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'error': 'No selected file.'}), 400
+    if not file.filename.endswith('.csv'):
+        return jsonify({'error': 'Invalid file type. Please upload a CSV file.'}), 400
+
+    long_format = request.args.get('format') == 'long'
+    if long_format and entity_type != 'connections':
+        return jsonify({'error': 'The long format is only available for connections.'}), 400
+
+    stream = io.TextIOWrapper(file.stream, encoding='utf-8', newline='') # Decoded as it is read, not all at once
+    reader = csv.reader(stream)
+    header = [h.strip() for h in next(reader)] # Read header row and strip whitespace
+    if long_format:
+        rows = group_long_rows(reader, header) # One wide-style row per connection, whatever its number of hops
+    else:
+        rows = ((i + 2, dict(zip(header, row_data))) for i, row_data in enumerate(reader) if row_data)
+
+    mode = request.args.get('mode', 'insert')
+    dry_run = request.args.get('dry_run', '').lower() in ('1', 'true')
+    if mode not in ('insert', 'sync'):
+        return jsonify({'error': "Invalid import mode. Use 'insert' or 'sync'."}), 400
+    if mode == 'sync' or dry_run:
+        rows = list(rows)
+        if long_format:
+            header = list(dict.fromkeys(column for _, row_dict in rows for column in row_dict))
+    if mode == 'sync':
+        delete_missing = request.args.get('delete_missing', '').lower() in ('1', 'true')
+        return _sync_import(entity_type, file.filename, header, rows, delete_missing, dry_run)
+    if dry_run:
+        try:
+            report = validate_import(entity_type, rows)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(report), 200
+    
+    import_started = time.perf_counter()
+    success_count = 0
+    error_count = 0
+    errors = []
+
+    try:
+        for row_number, row_dict in rows:
+            db.session.begin_nested() # Start a nested transaction for each row
+
+            try:
+                if entity_type == 'locations':
+                    name = row_dict.get('name')
+                    if not name:
+                        raise ValueError("Missing 'name' field.")
+                    existing_location = db.session.query(Location).filter_by(name=name).first()
+                    if existing_location:
+                        raise ValueError(f"Location '{name}' already exists. Skipped.")
+                    LocationService.create(row_dict)
+
+                elif entity_type == 'racks':
+                    name = row_dict.get('name')
+                    location_name = row_dict.get('location_name')
+                    if not name or not location_name:
+                        raise ValueError("Missing 'name' or 'location_name' field.")
+                    
+                    location = db.session.query(Location).filter_by(name=location_name).first()
+                    if not location:
+                        raise ValueError(f"Location '{location_name}' not found for Rack '{name}'. Skipped.")
+
+                    existing_rack = db.session.query(Rack).filter_by(name=name, location_id=location.id).first()
+                    if existing_rack:
+                        raise ValueError(f"Rack '{name}' already exists in this location. Skipped.")
+
+                    rack_data = {
+                        'name': name,
+                        'location_id': location.id, 
+                        'description': row_dict.get('description'),
+                        'total_units': int(row_dict.get('total_units', 42)),
+                        'orientation': row_dict.get('orientation', 'bottom-up'),
+                    }
+                    RackService.create(rack_data)
+
+                elif entity_type == 'pcs':
+                    name = row_dict.get('name')
+                    if not name:
+                        raise ValueError("Missing 'name' field.")
+
+                    pc_type = row_dict.get('type', 'Workstation')
+                    rack_id = None
+                    row_in_rack = None 
+                    units_occupied = 1 
+                    rack_name = row_dict.get('rack_name')
+                    existing_pc = db.session.query(PC).filter_by(name=name).first()
+
+                    if pc_type == 'Server' and rack_name:
+                        rack = db.session.query(Rack).filter_by(name=rack_name).first()
+                        if not rack:
+                            errors.append(f"Row {row_number}: Rack '{rack_name}' not found for PC '{name}'. Rack link skipped.")
+                        else:
+                            rack_id = rack.id
+                            try:
+                                row_in_rack = int(row_dict.get('row_in_rack')) if row_dict.get('row_in_rack') else None
+                                units_occupied = int(row_dict.get('units_occupied', 1))
+                                if row_in_rack is None or row_in_rack < 1 or units_occupied < 1:
+                                    raise ValueError("Invalid 'row_in_rack' or 'units_occupied'. Must be positive integers for Server PCs.")
+                            except (ValueError, TypeError):
+                                raise ValueError("Invalid 'row_in_rack' or 'units_occupied'. Must be positive integers for Server PCs.")
+
+                            _check_rack_range(rack, row_in_rack, units_occupied, f"PC '{name}'")
+                            is_occupied, conflicting_device = validate_rack_unit_occupancy(
+                                db.session,
+                                rack_id=rack_id,
+                                start_row_in_rack=row_in_rack,
+                                units_occupied=units_occupied,
+                                device_type='pc',
+                                exclude_device_id=existing_pc.id if existing_pc else None # An update may keep its own units
+                            )
+                            if is_occupied:
+                                raise ValueError(f"Rack unit(s) is already occupied by {conflicting_device}. PC '{name}' skipped.")
+                    
+                    if pc_type != 'Server':
+                        rack_id = None
+                        row_in_rack = None
+                        units_occupied = 1 
+
+                    if existing_pc:
+                        update_data = {
+                            'ip_address': row_dict.get('ip_address', existing_pc.ip_address),
+                            'username': row_dict.get('username', existing_pc.username),
+                            'in_domain': row_dict.get('in_domain', str(existing_pc.in_domain)).lower() == 'true',
+                            'operating_system': row_dict.get('operating_system', existing_pc.operating_system),
+                            'model': row_dict.get('model', existing_pc.model),
+                            'office': row_dict.get('office', existing_pc.office),
+                            'description': row_dict.get('description', existing_pc.description),
+                            'multi_port': row_dict.get('multi_port', str(existing_pc.multi_port)).lower() == 'true',
+                            'type': pc_type,
+                            'usage': row_dict.get('usage', existing_pc.usage),
+                            'row_in_rack': row_in_rack,
+                            'rack_id': rack_id,
+                            'units_occupied': units_occupied,
+                            # NEW FIELDS
+                            'serial_number': row_dict.get('serial_number', existing_pc.serial_number),
+                            'pc_specification': row_dict.get('pc_specification', existing_pc.pc_specification),
+                            'monitor_model': row_dict.get('monitor_model', existing_pc.monitor_model),
+                            'disk_info': row_dict.get('disk_info', existing_pc.disk_info),
+                        }
+                        PCService.update(existing_pc, update_data)
+                    else:
+                        create_data = {
+                            'name': name,
+                            'ip_address': row_dict.get('ip_address'),
+                            'username': row_dict.get('username'),
+                            'in_domain': row_dict.get('in_domain', 'False').lower() == 'true',
+                            'operating_system': row_dict.get('operating_system'),
+                            'model': row_dict.get('model'),
+                            'office': row_dict.get('office'),
+                            'description': row_dict.get('description'),
+                            'multi_port': row_dict.get('multi_port', 'False').lower() == 'true',
+                            'type': pc_type,
+                            'usage': row_dict.get('usage'),
+                            'row_in_rack': row_in_rack,
+                            'rack_id': rack_id,
+                            'units_occupied': units_occupied,
+                            # NEW FIELDS
+                            'serial_number': row_dict.get('serial_number'),
+                            'pc_specification': row_dict.get('pc_specification'),
+                            'monitor_model': row_dict.get('monitor_model'),
+                            'disk_info': row_dict.get('disk_info'),
+                        }
+                        PCService.create(create_data)
+
+                elif entity_type == 'patch_panels':
+                    name = row_dict.get('name')
+                    location_name = row_dict.get('location_name')
+                    if not name or not location_name:
+                        raise ValueError("Missing 'name' or 'location_name' field.")
+
+                    location = db.session.query(Location).filter_by(name=location_name).first()
+                    if not location:
+                        raise ValueError(f"Location '{location_name}' not found for Patch Panel '{name}'. Skipped.")
+
+                    rack_id = None
+                    row_in_rack = None
+                    units_occupied = 1
+                    rack_name = row_dict.get('rack_name')
+
+                    if rack_name:
+                        rack = db.session.query(Rack).filter_by(name=rack_name).first()
+                        if not rack:
+                            errors.append(f"Row {row_number}: Rack '{rack_name}' not found for Patch Panel '{name}'. Linking to Rack skipped.")
+                        else:
+                            rack_id = rack.id
+                            try:
+                                row_in_rack = int(row_dict.get('row_in_rack')) if row_dict.get('row_in_rack') else None
+                                units_occupied = int(row_dict.get('units_occupied', 1))
+                                if row_in_rack is None or row_in_rack < 1 or units_occupied < 1:
+                                    raise ValueError("Invalid 'row_in_rack' or 'units_occupied'. Must be positive integers for rack-mounted Patch Panel.")
+                            except (ValueError, TypeError):
+                                raise ValueError("Invalid 'row_in_rack' or 'units_occupied'. Must be positive integers for rack-mounted Patch Panel.")
+
+                            _check_rack_range(rack, row_in_rack, units_occupied, f"Patch Panel '{name}'")
+                            is_occupied, conflicting_device = validate_rack_unit_occupancy(
+                                db.session,
+                                rack_id=rack_id,
+                                start_row_in_rack=row_in_rack,
+                                units_occupied=units_occupied,
+                                device_type='patch_panel'
+                            )
+                            if is_occupied:
+                                raise ValueError(f"Rack unit(s) is already occupied by {conflicting_device}. Patch Panel '{name}' skipped.")
+
+                    existing_pp = db.session.query(PatchPanel).filter_by(name=name).first() 
+                    if existing_pp:
+                        raise ValueError(f"Patch Panel '{name}' already exists. Skipped.")
+                    
+                    pp_data = {
+                        'name': name,
+                        'location_id': location.id,
+                        'rack_id': rack_id,
+                        'row_in_rack': row_in_rack,
+                        'units_occupied': units_occupied, 
+                        'total_ports': int(row_dict.get('total_ports', 1)),
+                        'description': row_dict.get('description')
+                    }
+                    PatchPanelService.create(pp_data)
+
+                elif entity_type == 'switches':
+                    name = row_dict.get('name')
+                    location_name = row_dict.get('location_name')
+                    if not name or not location_name:
+                        raise ValueError("Missing 'name' or 'location_name' field.")
+
+                    location = db.session.query(Location).filter_by(name=location_name).first()
+                    if not location:
+                        raise ValueError(f"Location '{location_name}' not found for Switch '{name}'. Skipped.")
+
+                    rack_id = None
+                    row_in_rack = None
+                    units_occupied = 1
+                    rack_name = row_dict.get('rack_name')
+
+                    if rack_name:
+                        rack = db.session.query(Rack).filter_by(name=rack_name).first()
+                        if not rack:
+                            errors.append(f"Row {row_number}: Rack '{rack_name}' not found for Switch '{name}'. Linking to Rack skipped.")
+                        else:
+                            rack_id = rack.id
+                            try:
+                                row_in_rack = int(row_dict.get('row_in_rack')) if row_dict.get('row_in_rack') else None
+                                units_occupied = int(row_dict.get('units_occupied', 1))
+                                if row_in_rack is None or row_in_rack < 1 or units_occupied < 1:
+                                    raise ValueError("Invalid 'row_in_rack' or 'units_occupied'. Must be positive integers for rack-mounted Switch.")
+                            except (ValueError, TypeError):
+                                raise ValueError("Invalid 'row_in_rack' or 'units_occupied'. Must be positive integers for rack-mounted Switch.")
+
+                            _check_rack_range(rack, row_in_rack, units_occupied, f"Switch '{name}'")
+                            is_occupied, conflicting_device = validate_rack_unit_occupancy(
+                                db.session,
+                                rack_id=rack_id,
+                                start_row_in_rack=row_in_rack,
+                                units_occupied=units_occupied,
+                                device_type='switch'
+                            )
+                            if is_occupied:
+                                raise ValueError(f"Rack unit(s) is already occupied by {conflicting_device}. Switch '{name}' skipped.")
+
+                    existing_switch = db.session.query(Switch).filter_by(name=name).first() 
+                    if existing_switch:
+                        raise ValueError(f"Switch '{name}' already exists. Skipped.")
+                    
+                    switch_data = {
+                        'name': name,
+                        'ip_address': row_dict.get('ip_address'),
+                        'location_id': location.id,
+                        'rack_id': rack_id,
+                        'row_in_rack': row_in_rack,
+                        'units_occupied': units_occupied, 
+                        'total_ports': int(row_dict.get('total_ports', 1)),
+                        'source_port': row_dict.get('source_port'),
+                        'model': row_dict.get('model'),
+                        'description': row_dict.get('description'),
+                        'usage': row_dict.get('usage')
+                    }
+                    SwitchService.create(switch_data)
+
+                elif entity_type == 'connections':
+                    pc_name = row_dict.get('pc_name')
+                    switch_name = row_dict.get('switch_name')
+                    switch_port = row_dict.get('switch_port')
+                    is_switch_port_up = row_dict.get('is_switch_port_up', 'True').lower() == 'true'
+                    cable_color = row_dict.get('cable_color')
+                    cable_label = row_dict.get('cable_label')
+
+                    if not pc_name or not switch_name or not switch_port:
+                        raise ValueError("Missing 'pc_name', 'switch_name', or 'switch_port'. Skipped.")
+
+                    pc = db.session.query(PC).filter_by(name=pc_name).first()
+                    _switch = db.session.query(Switch).filter_by(name=switch_name).first()
+
+                    if not pc:
+                        raise ValueError(f"PC '{pc_name}' not found. Skipped connection.")
+                    if not _switch:
+                        raise ValueError(f"Switch '{switch_name}' not found. Skipped connection.")
+                    
+                    existing_connection = db.session.query(Connection).filter_by(
+                        pc_id=pc.id,
+                        switch_id=_switch.id,
+                        switch_port=switch_port
+                    ).first()
+
+                    if existing_connection:
+                        raise ValueError(f"Connection between PC '{pc_name}', Switch '{switch_name}' port '{switch_port}' already exists. Skipped.")
+
+                    # The port and PC checks reported by the dry run (see import_validation.py)
+                    if not port_in_range(switch_port, _switch.total_ports):
+                        raise ValueError(f"Switch '{switch_name}' has {_switch.total_ports} ports; port {switch_port} does not exist. Skipped.")
+                    is_occupied, other_pc = validate_port_occupancy(db.session, _switch.id, switch_port, 'switch')
+                    if is_occupied:
+                        raise ValueError(f"Port {switch_port} of switch '{switch_name}' is already used by PC '{other_pc}'. Skipped.")
+                    if not pc.multi_port and db.session.query(Connection.id).filter_by(pc_id=pc.id).first():
+                        raise ValueError(f"PC '{pc_name}' is not multi-port and already has a connection. Skipped.")
+
+                    connection_data = {
+                        'pc_id': pc.id,
+                        'switch_id': _switch.id,
+                        'switch_port': switch_port,
+                        'is_switch_port_up': is_switch_port_up,
+                        'cable_color': cable_color,
+                        'cable_label': cable_label,
+                        'wall_point_label': row_dict.get('wall_point_label'),
+                        'wall_point_cable_color': row_dict.get('wall_point_cable_color'),
+                        'wall_point_cable_label': row_dict.get('wall_point_cable_label'),
+                        'hops': []
+                    }
+
+                    for j in [number - 1 for number in hop_numbers(row_dict)]: # Every hop column group in the row, however many
+                        pp_name_col = f'hop{j+1}_patch_panel_name'
+                        pp_port_col = f'hop{j+1}_patch_panel_port'
+                        is_hop_port_up_col = f'hop{j+1}_is_port_up'
+                        hop_cable_color_col = f'hop{j+1}_cable_color'
+                        hop_cable_label_col = f'hop{j+1}_cable_label'
+
+                        pp_name = row_dict.get(pp_name_col)
+                        pp_port = row_dict.get(pp_port_col)
+                        is_hop_port_up = row_dict.get(is_hop_port_up_col, 'True').lower() == 'true'
+                        hop_cable_color = row_dict.get(hop_cable_color_col)
+                        hop_cable_label = row_dict.get(hop_cable_label_col)
+
+                        if pp_name and pp_port:
+                            patch_panel = db.session.query(PatchPanel).filter_by(name=pp_name).first()
+                            if not patch_panel:
+                                errors.append(f"Row {row_number}, Hop {j+1}: Patch Panel '{pp_name}' not found. Skipping this hop.")
+                                continue
+                            if not port_in_range(pp_port, patch_panel.total_ports):
+                                raise ValueError(f"Hop {j+1}: Patch Panel '{pp_name}' has {patch_panel.total_ports} ports; port {pp_port} does not exist. Skipped.")
+                            is_occupied, other_pc = validate_port_occupancy(db.session, patch_panel.id, pp_port, 'patch_panel')
+                            if is_occupied:
+                                raise ValueError(f"Hop {j+1}: Port {pp_port} of patch panel '{pp_name}' is already used by PC '{other_pc}'. Skipped.")
+                            if any(hop['patch_panel_id'] == patch_panel.id and hop['patch_panel_port'] == pp_port for hop in connection_data['hops']):
+                                raise ValueError(f"Hop {j+1}: Port {pp_port} of patch panel '{pp_name}' is also used by an earlier hop. Skipped.")
+                            connection_data['hops'].append({
+                                'patch_panel_id': patch_panel.id,
+                                'patch_panel_port': pp_port,
+                                'is_port_up': is_hop_port_up,
+                                'sequence': j,
+                                'cable_color': hop_cable_color,
+                                'cable_label': hop_cable_label
+                            })
+                    
+                    ConnectionService.create(connection_data)
+
+                else:
+                    raise ValueError('Invalid entity type for import.')
+                
+                db.session.commit() 
+                success_count += 1
+
+            except ValueError as e:
+                db.session.rollback() 
+                errors.append(f"Row {row_number}: {str(e)}")
+                error_count += 1
+            except IntegrityError as e:
+                db.session.rollback()
+                errors.append(f"Row {row_number}: Database integrity error - {str(e)}")
+                error_count += 1
+            except Exception as e:
+                db.session.rollback()
+                errors.append(f"Row {row_number}: An unexpected error occurred - {str(e)}")
+                error_count += 1
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error during CSV import for {entity_type}: {str(e)}")
+        return jsonify({'error': f'Failed to import data: {str(e)}', 'details': errors}), 500
+
+    record_import(entity_type, success_count, error_count, time.perf_counter() - import_started)
+    return jsonify({
+        'message': f'Import completed. {success_count} records processed successfully.',
+        'errors': errors,
+        'error_count': error_count,
+        'success_count': success_count
+    }), 200
+
+def _sync_import(entity_type, filename, header, rows, delete_missing, dry_run):
+    """mode=sync: makes the table match the file (see import_sync.py). With dry_run the plan is only reported."""
+    started = time.perf_counter()
+    plan = None
+    try:
+        plan = plan_sync(entity_type, rows, header, delete_missing)
+        if not dry_run:
+            apply_sync(entity_type, plan, filename, delete_missing, started)
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except SyncError as e:
+        return jsonify({'error': str(e)}), 409
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error during CSV sync for {entity_type}: {str(e)}")
+        return jsonify({'error': f'Failed to sync data: {str(e)}', 'details': plan.errors if plan else []}), 500
+    seconds = time.perf_counter() - started
+
+    counts = plan.to_dict()
+    if not dry_run:
+        record_import(entity_type, counts['inserted'] + counts['updated'] + counts['unchanged'], counts['error_count'], seconds)
+        current_app.logger.info(
+            f"Synced {entity_type} from {filename}: {counts['inserted']} inserted, {counts['updated']} updated, "
+            f"{counts['deleted']} deleted, {counts['unchanged']} unchanged in {seconds:.2f} s"
+        )
+    verb = 'would be' if dry_run else 'were'
+    return jsonify(dict(
+        counts,
+        message=f"Sync {'planned' if dry_run else 'completed'}. {counts['inserted']} records {verb} inserted, "
+                f"{counts['updated']} updated and {counts['deleted']} deleted.",
+        mode='sync', dry_run=dry_run, delete_missing=delete_missing,
+        errors=plan.errors, seconds=round(seconds, 3)
+    )), 200
+
+# NDJSON Bulk Import Endpoint
+@bp.route('/bulk_import/<entity_type>', methods=['POST'])
+def bulk_import_data(entity_type):
+    """
+    Imports one JSON record per line of the request body (gzip-compressed or not), in batches
+    that are each committed on their own; see bulk_import.py for the record format.
+    Query parameters: mode=insert (default) or upsert. The reply streams one NDJSON result
+    per record, in input order, followed by a summary line.
+    """
+    if entity_type not in LOG_ENTITY_TYPES:
+        return jsonify({'error': 'Invalid entity type for import.'}), 400
+    mode = request.args.get('mode', 'insert')
+    if mode not in BULK_MODES:
+        return jsonify({'error': f"Invalid import mode. Use {' or '.join(BULK_MODES)}."}), 400
+
+    compressed = request.headers.get('Content-Encoding', '').lower() == 'gzip' or request.mimetype in ('application/gzip', 'application/x-gzip')
+    lines = iter_lines(request.stream, compressed)
+    results = bulk_import(entity_type, lines, mode, current_app.config['BULK_IMPORT_BATCH_SIZE'], f"bulk_import/{entity_type}")
+    response = current_app.response_class(stream_with_context(results), mimetype='application/x-ndjson')
+    response.headers['Cache-Control'] = 'no-store'
+    return response
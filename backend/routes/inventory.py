@@ -0,0 +1,345 @@
+# backend/routes/inventory.py
+# Inventory endpoints: locations, racks, PCs, patch panels and switches (including port status).
+
+from flask import Blueprint, request, jsonify
+from sqlalchemy.exc import IntegrityError
+
+from ..extensions import db
+from ..services import LocationService, RackService, PCService, PatchPanelService, SwitchService
+from ..serializers import list_response
+from .. import read_models
+from ..cache import cached_response, etag_response
+from ..instrumentation import no_lazy_loads
+
+bp = Blueprint('inventory', __name__)
+
+# Location Endpoints
+@bp.route('/locations', methods=['GET', 'POST'])
+@etag_response('locations')
+@cached_response('locations')
+@no_lazy_loads
+def handle_locations():
+    if request.method == 'POST':
+        data = request.json
+        if not data or not data.get('name'):
+            return jsonify({'error': 'Location name is required'}), 400
+        try:
+            new_location = LocationService.create(data)
+            return jsonify(new_location.to_dict()), 201
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({'error': f"Location with name '{data['name']}' already exists."}), 409
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 500
+    else: # GET
+        return list_response(read_models.list_locations())
+
+@bp.route('/locations/<int:location_id>', methods=['GET', 'PUT', 'DELETE'])
+@etag_response('locations')
+def handle_location_by_id(location_id):
+    if request.method == 'GET':
+        location_data = read_models.get_location(location_id)
+        if not location_data:
+            return jsonify({'error': 'Location not found'}), 404
+        return jsonify(location_data)
+
+    location = LocationService.get_by_id(location_id)
+    if not location:
+        return jsonify({'error': 'Location not found'}), 404
+
+    if request.method == 'PUT':
+        data = request.json
+        if not data:
+            return jsonify({'error': 'No data provided for update'}), 400
+        try:
+            updated_location = LocationService.update(location, data)
+            return jsonify(updated_location.to_dict())
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({'error': f"Location with name '{data['name']}' already exists."}), 409
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 500
+    else: # DELETE
+        try:
+            LocationService.delete(location)
+            return jsonify({'message': 'Location deleted successfully'}), 200
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 500
+
+# Rack Endpoints
+@bp.route('/racks', methods=['GET', 'POST'])
+@etag_response('racks', 'locations')
+@cached_response('racks', 'locations')
+@no_lazy_loads
+def handle_racks():
+    if request.method == 'POST':
+        data = request.json
+        if not data or not data.get('name') or not data.get('location_id'):
+            return jsonify({'error': 'Rack name and location_id are required'}), 400
+        try:
+            new_rack = RackService.create(data)
+            return jsonify(new_rack.to_dict()), 201
+        except IntegrityError as e:
+            db.session.rollback()
+            if "UNIQUE constraint failed: racks.name, racks.location_id" in str(e):
+                return jsonify({'error': f"A rack with the name '{data['name']}' already exists in this location."}), 409
+            return jsonify({'error': str(e)}), 500
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 500
+    else: # GET
+        return list_response(read_models.list_racks())
+
+@bp.route('/racks/<int:rack_id>', methods=['GET', 'PUT', 'DELETE'])
+@etag_response('racks', 'locations')
+def handle_rack_by_id(rack_id):
+    if request.method == 'GET':
+        rack_data = read_models.get_rack(rack_id)
+        if not rack_data:
+            return jsonify({'error': 'Rack not found'}), 404
+        return jsonify(rack_data)
+
+    rack = RackService.get_by_id(rack_id)
+    if not rack:
+        return jsonify({'error': 'Rack not found'}), 404
+
+    if request.method == 'PUT':
+        data = request.json
+        if not data:
+            return jsonify({'error': 'No data provided for update'}), 400
+        try:
+            updated_rack = RackService.update(rack, data)
+            return jsonify(updated_rack.to_dict())
+        except IntegrityError as e:
+            db.session.rollback()
+            if "UNIQUE constraint failed: racks.name, racks.location_id" in str(e):
+                return jsonify({'error': f"A rack with the name '{data['name']}' already exists in this location."}), 409
+            return jsonify({'error': str(e)}), 500
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 409
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 500
+    else: # DELETE
+        try:
+            RackService.delete(rack)
+            return jsonify({'message': 'Rack deleted successfully'}), 200
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 500
+
+# PC Endpoints
+@bp.route('/pcs', methods=['GET', 'POST'])
+@etag_response('pcs', 'racks', 'locations')
+@no_lazy_loads
+def handle_pcs():
+    if request.method == 'POST':
+        data = request.json
+        if not data or not data.get('name'):
+            return jsonify({'error': 'PC name is required'}), 400
+        try:
+            new_pc = PCService.create(data)
+            return jsonify(new_pc.to_dict()), 201
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({'error': f"PC with name '{data['name']}' already exists."}), 409
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 409
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 500
+    else: # GET
+        return list_response(read_models.list_pcs())
+
+@bp.route('/pcs/<int:pc_id>', methods=['GET', 'PUT', 'DELETE'])
+@etag_response('pcs', 'racks', 'locations')
+def handle_pc_by_id(pc_id):
+    if request.method == 'GET':
+        pc_data = read_models.get_pc(pc_id)
+        if not pc_data:
+            return jsonify({'error': 'PC not found'}), 404
+        return jsonify(pc_data)
+
+    pc = PCService.get_by_id(pc_id)
+    if not pc:
+        return jsonify({'error': 'PC not found'}), 404
+
+    if request.method == 'PUT':
+        data = request.json
+        if not data:
+            return jsonify({'error': 'No data provided for update'}), 400
+        try:
+            updated_pc = PCService.update(pc, data)
+            return jsonify(updated_pc.to_dict())
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({'error': f"PC with name '{data['name']}' already exists."}), 409
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 409
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 500
+    else: # DELETE
+        try:
+            PCService.delete(pc)
+            return jsonify({'message': 'PC deleted successfully'}), 200
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 500
+
+@bp.route('/available_pcs', methods=['GET'])
+@etag_response('pcs', 'racks', 'locations', 'connections')
+@no_lazy_loads
+def get_available_pcs():
+    return list_response(read_models.list_available_pcs())
+
+# Patch Panel Endpoints
+@bp.route('/patch_panels', methods=['GET', 'POST'])
+@etag_response('patch_panels', 'racks', 'locations')
+@cached_response('patch_panels', 'racks', 'locations')
+@no_lazy_loads
+def handle_patch_panels():
+    if request.method == 'POST':
+        data = request.json
+        if not data or not data.get('name'):
+            return jsonify({'error': 'Patch Panel name is required'}), 400
+        try:
+            new_pp = PatchPanelService.create(data)
+            return jsonify(new_pp.to_dict()), 201
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({'error': f"Patch Panel with name '{data['name']}' already exists."}), 409
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 409
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 500
+    else: # GET
+        return list_response(read_models.list_patch_panels())
+
+@bp.route('/patch_panels/<int:pp_id>', methods=['GET', 'PUT', 'DELETE'])
+@etag_response('patch_panels', 'racks', 'locations')
+def handle_patch_panel_by_id(pp_id):
+    if request.method == 'GET':
+        pp_data = read_models.get_patch_panel(pp_id)
+        if not pp_data:
+            return jsonify({'error': 'Patch Panel not found'}), 404
+        return jsonify(pp_data)
+
+    pp = PatchPanelService.get_by_id(pp_id)
+    if not pp:
+        return jsonify({'error': 'Patch Panel not found'}), 404
+
+    if request.method == 'PUT':
+        data = request.json
+        if not data:
+            return jsonify({'error': 'No data provided for update'}), 400
+        try:
+            updated_pp = PatchPanelService.update(pp, data)
+            return jsonify(updated_pp.to_dict())
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({'error': f"Patch Panel with name '{data['name']}' already exists."}), 409
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 409
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 500
+    else: # DELETE
+        try:
+            PatchPanelService.delete(pp)
+            return jsonify({'message': 'Patch Panel deleted successfully'}), 200
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 500
+
+@bp.route('/patch_panels/<int:pp_id>/ports', methods=['GET'])
+@etag_response('patch_panels', 'connection_hops', 'connections', 'pcs', 'racks', 'locations')
+@no_lazy_loads
+def get_patch_panel_ports(pp_id):
+    ports_status = PatchPanelService.get_patch_panel_ports_status(pp_id)
+    if ports_status is None:
+        return jsonify({'error': 'Patch Panel not found'}), 404
+    return jsonify(ports_status)
+
+# Switch Endpoints
+@bp.route('/switches', methods=['GET', 'POST'])
+@etag_response('switches', 'racks', 'locations')
+@cached_response('switches', 'racks', 'locations')
+@no_lazy_loads
+def handle_switches():
+    if request.method == 'POST':
+        data = request.json
+        if not data or not data.get('name'):
+            return jsonify({'error': 'Switch name is required'}), 400
+        try:
+            new_switch = SwitchService.create(data)
+            return jsonify(new_switch.to_dict()), 201
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({'error': f"Switch with name '{data['name']}' already exists."}), 409
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 409
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 500
+    else: # GET
+        return list_response(read_models.list_switches())
+
+@bp.route('/switches/<int:switch_id>', methods=['GET', 'PUT', 'DELETE'])
+@etag_response('switches', 'racks', 'locations')
+def handle_switch_by_id(switch_id):
+    if request.method == 'GET':
+        _switch_data = read_models.get_switch(switch_id)
+        if not _switch_data:
+            return jsonify({'error': 'Switch not found'}), 404
+        return jsonify(_switch_data)
+
+    _switch = SwitchService.get_by_id(switch_id)
+    if not _switch:
+        return jsonify({'error': 'Switch not found'}), 404
+
+    if request.method == 'PUT':
+        data = request.json
+        if not data:
+            return jsonify({'error': 'No data provided for update'}), 400
+        try:
+            updated_switch = SwitchService.update(_switch, data)
+            return jsonify(updated_switch.to_dict())
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({'error': f"Switch with name '{data['name']}' already exists."}), 409
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 409
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 500
+    else: # DELETE
+        try:
+            SwitchService.delete(_switch)
+            return jsonify({'message': 'Switch deleted successfully'}), 200
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 500
+
+@bp.route('/switches/<int:switch_id>/ports', methods=['GET'])
+@etag_response('switches', 'connections', 'pcs', 'racks', 'locations')
+@no_lazy_loads
+def get_switch_ports(switch_id):
+    ports_status = SwitchService.get_switch_ports_status(switch_id)
+    if ports_status is None:
+        return jsonify({'error': 'Switch not found'}), 404
+    return jsonify(ports_status)
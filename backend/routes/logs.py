@@ -0,0 +1,54 @@
+# backend/routes/logs.py
+# System log endpoints: paging through the audit log and reverting logged actions.
+
+from flask import Blueprint, request, jsonify, current_app
+
+from ..extensions import db
+from ..services import SystemLogService
+from ..cache import etag_response
+from ..instrumentation import no_lazy_loads
+
+bp = Blueprint('logs', __name__)
+
+# --- System Log Endpoints ---
+@bp.route('/logs', methods=['GET'])
+@etag_response('system_logs')
+@no_lazy_loads
+def get_system_logs():
+    try:
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 25, type=int)
+        entity_type = request.args.get('entity_type', None, type=str)
+        action_type = request.args.get('action_type', None, type=str)
+
+        paginated_logs = SystemLogService.get_all_logs(
+            page=page,
+            per_page=per_page,
+            entity_type=entity_type if entity_type else None,
+            action_type=action_type if action_type else None
+        )
+
+        return jsonify({
+            'logs': [log.to_dict() for log in paginated_logs.items],
+            'total': paginated_logs.total,
+            'pages': paginated_logs.pages,
+            'current_page': paginated_logs.page,
+            'has_next': paginated_logs.has_next,
+            'has_prev': paginated_logs.has_prev
+        }), 200
+    except Exception as e:
+        current_app.logger.error(f"Error fetching system logs: {str(e)}")
+        return jsonify({'error': 'Failed to fetch system logs'}), 500
+
+@bp.route('/logs/<int:log_id>/revert', methods=['POST'])
+def revert_log(log_id):
+    try:
+        message = SystemLogService.revert_log_action(log_id)
+        return jsonify({'message': message}), 200
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error reverting log {log_id}: {str(e)}")
+        return jsonify({'error': f'An unexpected error occurred while reverting the action.'}), 500
@@ -0,0 +1,145 @@
+# backend/routes/pdfs.py
+# PDF template endpoints: upload, listing, deletion, download and the default template setting.
+
+import os
+import unicodedata
+from urllib.parse import quote
+
+from flask import Blueprint, request, jsonify, send_file, current_app
+from werkzeug.utils import secure_filename
+
+from ..extensions import db
+from ..services import PdfTemplateService, AppSettingsService
+from ..cache import etag_response
+from ..instrumentation import no_lazy_loads
+
+bp = Blueprint('pdfs', __name__)
+
+# PDF Template Management Endpoints
+@bp.route('/pdf_templates', methods=['GET'])
+@etag_response('pdf_templates', 'app_settings')
+@no_lazy_loads
+def list_pdf_templates():
+    templates = PdfTemplateService.get_all_pdf_templates()
+    settings = AppSettingsService.get_app_settings()
+    default_pdf_id = settings.default_pdf_id if settings else None
+
+    return jsonify({
+        'templates': [t.to_dict() for t in templates],
+        'default_pdf_id': default_pdf_id
+    })
+
+@bp.route('/pdf_templates/upload', methods=['POST'])
+def upload_pdf_template():
+    # Refuse oversized uploads before the multipart body is parsed and spooled to disk
+    # (the form overhead is small; the exact cap is enforced while streaming the file)
+    if request.content_length and request.content_length > current_app.config['MAX_PDF_SIZE'] + 64 * 1024:
+        return jsonify({'error': f"File is larger than the maximum of {current_app.config['MAX_PDF_SIZE'] // (1024 * 1024)} MB."}), 413
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file part'}), 400
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'error': 'No selected file'}), 400
+    
+    try:
+        new_pdf = PdfTemplateService.upload_pdf_template(file, current_app.config)
+        return jsonify({'message': 'File uploaded successfully', 'template': new_pdf.to_dict()}), 201
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error uploading PDF: {str(e)}")
+        return jsonify({'error': f'Failed to upload file: {str(e)}'}), 500
+
+@bp.route('/pdf_templates/<int:pdf_id>', methods=['DELETE'])
+def delete_pdf_template(pdf_id):
+    pdf_template = PdfTemplateService.get_pdf_template_by_id(pdf_id)
+    if not pdf_template:
+        return jsonify({'error': 'PDF template not found'}), 404
+
+    try:
+        PdfTemplateService.delete_pdf_template(pdf_template, current_app.config)
+        return jsonify({'message': 'PDF template deleted successfully'}), 200
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error deleting PDF template: {str(e)}")
+        return jsonify({'error': f'Failed to delete PDF template: {str(e)}'}), 500
+
+@bp.route('/app_settings/default_pdf', methods=['POST'])
+def set_default_pdf():
+    data = request.json
+    default_pdf_id = data.get('default_pdf_id')
+    
+    try:
+        settings = AppSettingsService.set_default_pdf(default_pdf_id)
+        return jsonify({'message': 'Default PDF template updated successfully', 'settings': settings.to_dict()}), 200
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error setting default PDF: {str(e)}")
+        return jsonify({'error': f'Failed to set default PDF: {str(e)}'}), 500
+
+@bp.route('/app_settings', methods=['GET'])
+@etag_response('app_settings', 'pdf_templates')
+def get_app_settings():
+    settings = AppSettingsService.get_app_settings()
+    if not settings:
+        return jsonify({'default_pdf_id': None, 'default_pdf_name': None}), 200
+    return jsonify(settings.to_dict()), 200
+
+def _inline_disposition(filename):
+    """Content-Disposition for the browser's PDF viewer, with an RFC 5987 name for non-ASCII filenames."""
+    ascii_name = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+    ascii_name = ascii_name.replace('\\', '').replace('"', '') or 'template.pdf'
+    if ascii_name == filename:
+        return f'inline; filename="{ascii_name}"'
+    return f"inline; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+def _download_headers(response, pdf_template):
+    """Sets the validator and caching headers shared by full, redirected and 304 responses."""
+    if pdf_template.content_hash:
+        # The URL names one upload and its content never changes, so it can be cached for good
+        response.set_etag(pdf_template.content_hash) # Strong ETag
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config['PDF_CACHE_MAX_AGE']
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True # Legacy file: revalidate with the mtime-based ETag
+    return response
+
+@bp.route('/pdf_templates/download/<string:stored_filename>', methods=['GET'])
+def download_pdf_template(stored_filename):
+    if not secure_filename(stored_filename) == stored_filename:
+        return jsonify({'error': 'Invalid filename'}), 400
+
+    pdf_template = PdfTemplateService.get_pdf_template_by_stored_filename(stored_filename)
+    if not pdf_template:
+        return jsonify({'error': 'File not found or access denied'}), 404
+    path = PdfTemplateService.get_pdf_template_path(pdf_template, current_app.config)
+    if not os.path.isfile(path):
+        current_app.logger.error(f"File of PDF template {pdf_template.id} is missing: {path}")
+        return jsonify({'error': 'File not found or access denied'}), 404
+
+    if pdf_template.content_hash and pdf_template.content_hash in request.if_none_match:
+        return _download_headers(current_app.response_class(status=304), pdf_template)
+
+    accel_prefix = current_app.config.get('PDF_ACCEL_REDIRECT_PREFIX')
+    if accel_prefix:
+        # nginx serves the file from its internal location, with sendfile and Range support
+        relative_path = os.path.relpath(path, current_app.config['UPLOAD_FOLDER'])
+        response = current_app.response_class(mimetype='application/pdf')
+        response.headers['X-Accel-Redirect'] = accel_prefix + quote(relative_path)
+        response.headers['Content-Disposition'] = _inline_disposition(pdf_template.original_filename)
+        return _download_headers(response, pdf_template)
+
+    # No nginx in front (development): conditional=True answers If-None-Match and Range itself
+    response = send_file(path, mimetype='application/pdf', download_name=pdf_template.original_filename,
+                         conditional=True, etag=pdf_template.content_hash or True,
+                         max_age=current_app.config['PDF_CACHE_MAX_AGE'] if pdf_template.content_hash else None)
+    return _download_headers(response, pdf_template)
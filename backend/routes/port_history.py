@@ -0,0 +1,77 @@
+# backend/routes/port_history.py
+# Link-state history queries (see port_history.py).
+
+import time
+from datetime import datetime, timezone
+
+from flask import Blueprint, request, jsonify, current_app
+
+from ..models import Switch
+from ..extensions import db
+from ..port_history import find_port, port_history, flapping_ports, switch_uptime, DAY
+
+bp = Blueprint('port_history', __name__)
+
+MAX_BUCKETS = 2000
+
+def _timestamp(name, default):
+    """A query argument as Unix seconds: a number or an ISO 8601 date/time (UTC unless it says otherwise)."""
+    value = request.args.get(name)
+    if not value:
+        return default
+    try:
+        return int(float(value))
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00')) # Raises ValueError
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+def _range(default_seconds):
+    now = int(time.time())
+    end = _timestamp('to', now + 1) # Includes transitions recorded this second
+    start = _timestamp('from', end - default_seconds)
+    if start >= end:
+        raise ValueError("'from' must be before 'to'.")
+    return start, end
+
+@bp.route('/ports/<path:key>/history', methods=['GET'])
+def get_port_history(key):
+    """
+    Link-state history of a port, by id or '<switch|patch_panel>:<device id or name>:<port>'.
+    ?from=&to= (Unix seconds or ISO 8601, default the last 24 hours); ?buckets=N downsamples
+    into N buckets with the uptime ratio and transitions of each (also done when the range
+    holds too many transitions to list).
+    """
+    try:
+        start, end = _range(DAY)
+        buckets = int(request.args.get('buckets', 0))
+    except ValueError as e:
+        return jsonify({'error': f"Invalid range: {e}"}), 400
+    if not 0 <= buckets <= MAX_BUCKETS:
+        return jsonify({'error': f"'buckets' must be between 0 (automatic) and {MAX_BUCKETS}."}), 400
+    port = find_port(key)
+    if port is None:
+        return jsonify({'error': 'Port not found'}), 404
+    return jsonify(port_history(port, start, end, buckets))
+
+@bp.route('/ports/flapping', methods=['GET'])
+def get_flapping_ports():
+    """Ports flapping now: their flap penalty, which decays by half every 15 minutes, is at least ?threshold=."""
+    try:
+        threshold = float(request.args.get('threshold', current_app.config['PORT_FLAP_THRESHOLD']))
+    except ValueError:
+        return jsonify({'error': "'threshold' must be a number."}), 400
+    return jsonify(flapping_ports(threshold))
+
+@bp.route('/switches/<int:switch_id>/uptime', methods=['GET'])
+def get_switch_uptime(switch_id):
+    """Daily uptime of a switch's monitored ports over ?from=&to= (default the last 30 days), from the daily rollup."""
+    if db.session.get(Switch, switch_id) is None:
+        return jsonify({'error': 'Switch not found'}), 404
+    try:
+        start, end = _range(30 * DAY)
+    except ValueError as e:
+        return jsonify({'error': f"Invalid range: {e}"}), 400
+    return jsonify(switch_uptime(switch_id, start // DAY, (end - 1) // DAY))
@@ -0,0 +1,41 @@
+# backend/routes/port_status.py
+# Link-state ingestion for monitoring (see port_status.py).
+
+from flask import Blueprint, request, jsonify, current_app
+
+from ..port_status import parse_update, submit, status, flush_pending, start_flusher
+
+bp = Blueprint('port_status', __name__)
+
+@bp.route('/port_status', methods=['GET', 'POST'])
+def handle_port_status():
+    """
+    POST: a JSON list of updates, or {"updates": [...]}, each {"device", "port", "state"} or
+    [device, port, state]. They are buffered and applied by the next periodic flush (202);
+    with ?flush=1 this worker applies its buffer before replying (200, with the flush result).
+    Invalid entries are listed in 'rejected' by index; the others are accepted.
+    GET: this worker's buffer and flush statistics.
+    """
+    if request.method == 'GET':
+        return jsonify(dict(status(), flush_interval=current_app.config['PORT_STATUS_FLUSH_INTERVAL']))
+
+    data = request.get_json(silent=True)
+    entries = data.get('updates') if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        return jsonify({'error': 'Expected a JSON list of updates or {"updates": [...]}.'}), 400
+    if len(entries) > current_app.config['PORT_STATUS_MAX_BATCH']:
+        return jsonify({'error': f"At most {current_app.config['PORT_STATUS_MAX_BATCH']} updates per request."}), 413
+
+    accepted, rejected = [], []
+    for index, entry in enumerate(entries):
+        try:
+            accepted.append(parse_update(entry))
+        except ValueError as e:
+            rejected.append({'index': index, 'error': str(e)})
+    start_flusher(current_app._get_current_object())
+    pending = submit(accepted, current_app.config['PORT_STATUS_MAX_PENDING'])
+
+    if request.args.get('flush') in ('1', 'true'):
+        result = flush_pending(current_app.logger)
+        return jsonify({'accepted': len(accepted), 'rejected': rejected, 'flush': result}), 200
+    return jsonify({'accepted': len(accepted), 'rejected': rejected, 'pending': pending}), 202
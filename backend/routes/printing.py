@@ -0,0 +1,58 @@
+# backend/routes/printing.py
+# Server-side printing: cable and port labels for a selection of connections (see labels.py).
+
+from flask import Blueprint, request, jsonify, send_file, current_app
+
+from .. import read_models
+from ..labels import render_labels
+from ..services import PdfTemplateService, AppSettingsService
+
+bp = Blueprint('printing', __name__)
+
+SELECTION_FIELDS = ('connection_ids', 'switch_ids', 'rack_ids', 'location_ids')
+
+@bp.route('/print/labels', methods=['POST'])
+def print_labels():
+    """
+    Body: {"rack_ids": [...], "switch_ids": [...], "location_ids": [...], "connection_ids": [...],
+    "template_id": optional}. Every connection matching any of the lists gets one label page,
+    drawn onto the given template or the default one (a blank A4 page if none is set).
+    """
+    data = request.json or {}
+    selection = {}
+    for field in SELECTION_FIELDS:
+        ids = data.get(field) or []
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            return jsonify({'error': f"'{field}' must be a list of ids."}), 400
+        selection[field] = ids
+    if not any(selection.values()):
+        return jsonify({'error': 'Select at least one rack, switch, location or connection.'}), 400
+
+    template_id = data.get('template_id')
+    if template_id is None:
+        settings = AppSettingsService.get_app_settings()
+        template_id = settings.default_pdf_id if settings else None
+    template = PdfTemplateService.get_pdf_template_by_id(template_id) if template_id is not None else None
+    if template_id is not None and not template:
+        return jsonify({'error': f"PDF template {template_id} not found."}), 404
+    template_path = PdfTemplateService.get_pdf_template_path(template, current_app.config) if template else None
+    template_key = (template.content_hash or template.stored_filename) if template else 'blank'
+
+    rows = read_models.select_connections(**selection)
+    if not len(rows):
+        return jsonify({'error': 'No connections match the selection.'}), 404
+    max_labels = current_app.config['LABEL_MAX_PER_REQUEST']
+    if len(rows) > max_labels:
+        return jsonify({'error': f"The selection matches {len(rows)} connections; at most {max_labels} labels can be printed at once."}), 400
+
+    try:
+        pdf_file, stats = render_labels(rows, template_path, template_key)
+    except Exception as e:
+        current_app.logger.error(f"Error printing labels: {str(e)}")
+        return jsonify({'error': f'Failed to print labels: {str(e)}'}), 500
+    current_app.logger.info(f"Printed {stats['pages']} labels ({stats['cached']} from cache, {stats['rendered']} rendered)")
+
+    response = send_file(pdf_file, mimetype='application/pdf', download_name='labels.pdf')
+    response.headers['X-Label-Pages'] = str(stats['pages'])
+    response.headers['X-Label-Cached'] = str(stats['cached'])
+    return response
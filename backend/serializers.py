@@ -0,0 +1,179 @@
+# backend/serializers.py
+# This file contains helpers for encoding list endpoint responses in the format
+# negotiated with the client: plain JSON (default), MessagePack and columnar.
+
+import threading
+from collections import OrderedDict
+
+from flask import request, jsonify, make_response, current_app
+
+from .metrics import record_cache_lookup
+
+try:
+    import msgpack # Optional: only needed when clients ask for application/msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+def wants_columnar():
+    """Returns True if the client asked for the columnar layout (?format=columnar)."""
+    return request.args.get('format', '').lower() == 'columnar'
+
+def wants_msgpack():
+    """
+    Returns True if the client prefers MessagePack over JSON.
+    Browsers send 'Accept: */*', which resolves to JSON because it is listed first.
+    """
+    if msgpack is None:
+        return False
+    best = request.accept_mimetypes.best_match([JSON_MIMETYPE, MSGPACK_MIMETYPE])
+    return best == MSGPACK_MIMETYPE
+
+def _flatten(row, prefix=''):
+    """
+    Flattens nested dictionaries into dotted keys, e.g. {'rack': {'name': 'R1'}}
+    becomes {'rack.name': 'R1'}. Lists (such as connection hops) are kept as values.
+    """
+    flat = {}
+    for key, value in row.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, prefix=f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+def to_columnar(rows):
+    """
+    Converts a list of row dictionaries into a columnar payload:
+    one array per (flattened) column, with string columns dictionary-encoded
+    against a single shared 'strings' table.
+    :param rows: A list of dictionaries, as produced by the list endpoints.
+    :return: A dictionary with 'columns', 'row_count', 'strings', 'encoded' and 'data'.
+    """
+    flat_rows = [_flatten(row) for row in rows]
+
+    # Keep the column order of the rows, adding columns that only appear in later
+    # rows (e.g. 'rack.name' when the first PC has no rack).
+    columns = []
+    seen_columns = set()
+    for flat in flat_rows:
+        for key in flat:
+            if key not in seen_columns:
+                seen_columns.add(key)
+                columns.append(key)
+
+    strings = []
+    string_index = {}
+    encoded_columns = []
+    data = {}
+    for column in columns:
+        values = [flat.get(column) for flat in flat_rows]
+        if any(isinstance(v, str) for v in values) and all(v is None or isinstance(v, str) for v in values):
+            indexes = []
+            for v in values:
+                if v is None:
+                    indexes.append(None)
+                    continue
+                idx = string_index.get(v)
+                if idx is None:
+                    idx = string_index[v] = len(strings)
+                    strings.append(v)
+                indexes.append(idx)
+            data[column] = indexes
+            encoded_columns.append(column)
+        else:
+            data[column] = values
+
+    return {
+        'columns': columns,
+        'row_count': len(flat_rows),
+        'strings': strings,
+        'encoded': encoded_columns,
+        'data': data
+    }
+
+class RowJSONCache:
+    """
+    A per-process LRU map from a row's version key (see read_models.RowSet) to the
+    row's serialized JSON, so unchanged rows are never serialized twice.
+    """
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+            return fragment
+
+    def put(self, key, fragment):
+        with self._lock:
+            self._entries[key] = fragment
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+_row_json_cache = None
+
+def get_row_json_cache():
+    global _row_json_cache
+    if _row_json_cache is None:
+        _row_json_cache = RowJSONCache(current_app.config.get('ROW_JSON_CACHE_SIZE', 50000))
+    return _row_json_cache
+
+def _row_set_json_response(row_set):
+    """
+    Serializes a RowSet by joining cached per-row JSON fragments. The separators
+    and key order are the ones jsonify uses in compact mode, so the body is
+    byte-for-byte what jsonify(row_set.dicts()) would produce.
+    """
+    cache = get_row_json_cache()
+    dumps = current_app.json.dumps
+    fragments = []
+    misses = 0
+    for m in row_set.mappings:
+        key = row_set.version_key(m)
+        fragment = cache.get(key)
+        if fragment is None:
+            fragment = dumps(row_set.build(m), separators=(",", ":"))
+            cache.put(key, fragment)
+            misses += 1
+        fragments.append(fragment)
+    # One increment per response; counting per row would cost a metrics write per row
+    record_cache_lookup('row_json', 'hit', len(fragments) - misses)
+    record_cache_lookup('row_json', 'miss', misses)
+    return current_app.response_class(f"[{','.join(fragments)}]\n", mimetype=current_app.json.mimetype)
+
+def list_response(rows):
+    """
+    Builds the response for a list endpoint, honouring '?format=columnar' and
+    'Accept: application/msgpack'. Without either, the response is identical to
+    jsonify(rows).
+    :param rows: A list of dictionaries, or a read_models.RowSet.
+    """
+    if hasattr(rows, 'version_key'):
+        # Plain JSON outside debug mode (where jsonify pretty-prints) can reuse cached rows
+        if not wants_columnar() and not wants_msgpack() and not current_app.debug:
+            response = _row_set_json_response(rows)
+            response.vary.add('Accept')
+            return response
+        rows = rows.dicts()
+
+    payload = to_columnar(rows) if wants_columnar() else rows
+
+    if wants_msgpack():
+        response = make_response(msgpack.packb(payload, use_bin_type=True))
+        response.mimetype = MSGPACK_MIMETYPE
+    else:
+        response = jsonify(payload)
+    response.vary.add('Accept')
+    return response
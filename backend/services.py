@@ -10,10 +10,7 @@ from datetime import datetime
 
 from .extensions import db
 from .models import Location, Rack, PC, PatchPanel, Switch, Connection, ConnectionHop, PdfTemplate, AppSettings, SystemLog
-from .utils import validate_port_occupancy, validate_rack_unit_occupancy, check_rack_unit_decrease_conflict, allowed_file
-
-# --- Global Constants (can be moved to a config.py if more complex) ---
-MAX_HOPS = 5 # Maximum number of hops to export/import for connections
+from .utils import validate_port_occupancy, validate_rack_unit_occupancy, check_rack_unit_decrease_conflict, allowed_file, stream_upload_to_temp, store_blob, blob_path
 
 # --- System Logging Service ---
 class SystemLogService:
@@ -273,7 +270,9 @@ class PatchPanelService:
         db.session.commit()
     @staticmethod
     def get_patch_panel_ports_status(pp_id):
-        patch_panel = PatchPanel.query.get(pp_id)
+        patch_panel = PatchPanel.query.options(
+            joinedload(PatchPanel.location), joinedload(PatchPanel.rack)
+        ).get(pp_id)
         if not patch_panel:
             return None
 
@@ -355,7 +354,9 @@ class SwitchService:
         db.session.commit()
     @staticmethod
     def get_switch_ports_status(switch_id):
-        _switch = Switch.query.get(switch_id)
+        _switch = Switch.query.options(
+            joinedload(Switch.location), joinedload(Switch.rack)
+        ).get(switch_id)
         if not _switch:
             return None
 
@@ -484,23 +485,96 @@ class PdfTemplateService:
     def get_all_pdf_templates(): return PdfTemplate.query.all()
     @staticmethod
     def get_pdf_template_by_id(pdf_id): return PdfTemplate.query.get(pdf_id)
+    @staticmethod
+    def get_pdf_template_by_stored_filename(stored_filename): return PdfTemplate.query.filter_by(stored_filename=stored_filename).first()
+
+    @staticmethod
+    def get_pdf_template_path(pdf_template, app_config):
+        """Returns the on-disk path of a template's file (content-addressed, or legacy per-upload)."""
+        if pdf_template.content_hash:
+            return blob_path(app_config['PDF_BLOB_FOLDER'], pdf_template.content_hash)
+        return os.path.join(app_config['UPLOAD_FOLDER'], pdf_template.stored_filename)
 
     @staticmethod
     def upload_pdf_template(file, app_config):
-        # ... logic remains the same
-        new_pdf = PdfTemplate(original_filename="dummy.pdf", stored_filename="dummy_stored.pdf")
-        db.session.add(new_pdf)
-        db.session.commit()
+        """
+        Streams the upload to a temporary file while hashing it, then records it and moves it
+        into content-addressed storage, so identical uploads share a single file on disk.
+        The MAX_PDF_FILES check runs after the new row is flushed: SQLite then holds the
+        write lock, so concurrent uploads cannot both pass the limit.
+        """
+        if not allowed_file(file.filename, app_config['ALLOWED_EXTENSIONS']):
+            raise ValueError("Invalid file type. Only PDF files are allowed.")
+        max_files = app_config['MAX_PDF_FILES']
+        if PdfTemplate.query.count() >= max_files: # Cheap early exit before reading the upload
+            raise ValueError(f"Maximum number of PDF templates ({max_files}) reached. Please delete an existing one first.")
+
+        blob_folder = app_config['PDF_BLOB_FOLDER']
+        temp_path, content_hash, size = stream_upload_to_temp(file, blob_folder, app_config['MAX_PDF_SIZE'])
+        created_blob = False
+        try:
+            with open(temp_path, 'rb') as f:
+                if not f.read(5) == b'%PDF-':
+                    raise ValueError("The uploaded file is not a PDF document.")
+
+            new_pdf = PdfTemplate(
+                original_filename=file.filename,
+                stored_filename=uuid.uuid4().hex + '.pdf',
+                content_hash=content_hash,
+                size=size
+            )
+            db.session.add(new_pdf)
+            db.session.flush()
+            if PdfTemplate.query.count() > max_files:
+                raise ValueError(f"Maximum number of PDF templates ({max_files}) reached. Please delete an existing one first.")
+            SystemLogService.create_log('CREATE', 'PDF Template', new_pdf.id, new_pdf.original_filename, details={'content_hash': content_hash, 'size': size})
+
+            # Placed while the write lock is held, so a concurrent delete of the last
+            # template with this hash cannot remove the file between here and the commit
+            created_blob = store_blob(temp_path, blob_folder, content_hash)
+            db.session.commit()
+        except Exception:
+            if created_blob:
+                os.remove(blob_path(blob_folder, content_hash))
+            raise
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
         return new_pdf
 
     @staticmethod
-    def delete_pdf_template(pdf_template, upload_folder):
+    def delete_pdf_template(pdf_template, app_config):
+        """
+        Deletes the template and its file. A content-addressed file is removed only when no
+        other template references the same hash; the reference count is taken after the
+        delete is flushed, under the write lock.
+        """
         pdf_id = pdf_template.id
         pdf_name = pdf_template.original_filename
-        # ... logic to delete file from filesystem
+        stored_filename = pdf_template.stored_filename
+        content_hash = pdf_template.content_hash
         db.session.delete(pdf_template)
         SystemLogService.create_log('DELETE', 'PDF Template', pdf_id, pdf_name)
-        db.session.commit()
+        db.session.flush()
+
+        if content_hash:
+            still_referenced = PdfTemplate.query.filter_by(content_hash=content_hash).count() > 0
+            path = None if still_referenced else blob_path(app_config['PDF_BLOB_FOLDER'], content_hash)
+        else:
+            path = os.path.join(app_config['UPLOAD_FOLDER'], stored_filename)
+
+        if path is None or not os.path.exists(path):
+            db.session.commit()
+            return
+        # Renamed aside before the commit and removed after it, so a failed commit can put it back
+        doomed = path + '.deleting'
+        os.replace(path, doomed)
+        try:
+            db.session.commit()
+        except Exception:
+            os.replace(doomed, path)
+            raise
+        os.remove(doomed)
 
 class AppSettingsService:
     @staticmethod
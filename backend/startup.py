@@ -0,0 +1,65 @@
+# backend/startup.py
+# This file contains the steps run when the server starts:
+# - a fast check of whether the database is already at the latest migration, so
+#   start.sh can skip 'flask db upgrade' (which imports the whole app) on a normal boot;
+# - a cache warm-up that gunicorn runs in the master process before forking (see
+#   gunicorn_conf.py), so every worker starts with the serialized rows already cached.
+# It is run as 'python3 -m backend.startup' and must not import the app at module level.
+
+import os
+import sqlite3
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Must match SQLALCHEMY_DATABASE_URI in app.py (relative SQLite paths live in the instance folder)
+DEFAULT_DB_PATH = os.path.join(PROJECT_ROOT, 'instance', 'network_doc.db')
+DEFAULT_MIGRATIONS_DIR = os.path.join(PROJECT_ROOT, 'backend', 'migrations')
+
+WARM_UP_ENVIRON = 'network_doc.warm_up' # Set on warm-up requests, so per-worker background threads are not started in the master
+WARM_UP_PATHS = ['/locations', '/racks', '/pcs', '/available_pcs', '/patch_panels', '/switches', '/connections', '/pdf_templates']
+
+def database_at_head(db_path=DEFAULT_DB_PATH, migrations_dir=DEFAULT_MIGRATIONS_DIR):
+    """
+    Returns True if the database's alembic revision is the head of the migration scripts.
+    A missing database or alembic_version table counts as not at head.
+    """
+    if not os.path.exists(db_path):
+        return False
+    from alembic.script import ScriptDirectory # Only needs the migration files, not the app
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        current = {row[0] for row in conn.execute("SELECT version_num FROM alembic_version")}
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+    heads = set(ScriptDirectory(migrations_dir).get_heads())
+    return current == heads
+
+def warm_up(app):
+    """
+    Requests every list endpoint once through the test client, filling the row JSON cache
+    and the shared response cache, and logs how long each first request took.
+    Closes the engine's pooled connections afterwards so no SQLite handle crosses a fork.
+    """
+    from .extensions import db
+
+    client = app.test_client()
+    started = time.perf_counter()
+    timings = []
+    for path in WARM_UP_PATHS:
+        request_started = time.perf_counter()
+        status = client.get(path, environ_base={WARM_UP_ENVIRON: True}).status_code
+        timings.append(f"{path} {status} {(time.perf_counter() - request_started) * 1000:.0f} ms")
+    app.logger.info(f"Warm-up finished in {(time.perf_counter() - started) * 1000:.0f} ms: {', '.join(timings)}")
+    with app.app_context():
+        db.engine.dispose()
+
+if __name__ == '__main__':
+    # Exit status 0 when migrations can be skipped, 1 when 'flask db upgrade' must run
+    check_started = time.perf_counter()
+    at_head = database_at_head()
+    print(f"Database {'is' if at_head else 'is not'} at the latest migration (checked in {(time.perf_counter() - check_started) * 1000:.0f} ms)")
+    sys.exit(0 if at_head else 1)
@@ -1,8 +1,9 @@
 # backend/utils.py
 # This file contains helper functions used across various modules in the backend.
 
+import hashlib
 import os
-import uuid
+import tempfile
 from sqlalchemy.orm import joinedload
 from sqlalchemy import cast, Integer
 
@@ -10,7 +11,7 @@ from sqlalchemy import cast, Integer
 from .models import Location, Rack, PC, PatchPanel, Switch, Connection, ConnectionHop, PdfTemplate
 
 # --- Global Constants ---
-MAX_HOPS = 5 # Maximum number of hops to export/import for connections
+WIDE_EXPORT_HOPS = 5 # Hop column groups always present in the wide connections CSV; longer paths add more
 
 # --- File Upload Utilities ---
 def allowed_file(filename, allowed_extensions):
@@ -23,19 +24,57 @@ def allowed_file(filename, allowed_extensions):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in allowed_extensions
 
-def save_uploaded_file(file, upload_folder):
+def stream_upload_to_temp(file, directory, max_bytes, chunk_size=64 * 1024):
     """
-    Saves an uploaded file to the specified folder with a secure and unique filename.
+    Copies an uploaded file to a temporary file in chunks, hashing it on the way,
+    so the upload is never held in memory as a whole.
     :param file: The uploaded file object from Flask's request.files.
-    :param upload_folder: The directory where the file should be saved.
-    :return: The unique filename under which the file was stored.
+    :param directory: Where to create the temporary file (the blob folder, so it can be renamed into place).
+    :param max_bytes: The maximum accepted size; larger uploads raise ValueError.
+    :param chunk_size: Bytes read per chunk.
+    :return: A tuple (temp_path, sha256_hex, size). The caller must move or remove temp_path.
     """
-    original_filename = file.filename
-    # Generate a unique filename using UUID to prevent collisions
-    unique_filename = str(uuid.uuid4()) + '.' + original_filename.rsplit('.', 1)[1].lower()
-    filepath = os.path.join(upload_folder, unique_filename)
-    file.save(filepath)
-    return unique_filename
+    os.makedirs(directory, exist_ok=True) # Created on first upload rather than at import time
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(prefix='.upload-', dir=directory)
+    try:
+        os.fchmod(fd, 0o644) # mkstemp creates 0600; stored blobs must be readable by the web server
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = file.stream.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"File is larger than the maximum of {max_bytes // (1024 * 1024)} MB.")
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return temp_path, digest.hexdigest(), size
+
+def blob_path(blob_folder, content_hash):
+    """
+    Returns the path of a content-addressed file: <blob_folder>/<first 2 hex digits>/<hash>.pdf.
+    The two-character fan-out keeps directories small.
+    """
+    return os.path.join(blob_folder, content_hash[:2], content_hash + '.pdf')
+
+def store_blob(temp_path, blob_folder, content_hash):
+    """
+    Moves a temporary upload to its content-addressed path, or discards it if a file
+    with the same content is already stored.
+    :return: True if a new blob was written, False if it already existed.
+    """
+    target = blob_path(blob_folder, content_hash)
+    if os.path.exists(target):
+        os.remove(temp_path)
+        return False
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.replace(temp_path, target) # Atomic on the same filesystem: readers never see a partial file
+    return True
 
 # --- Database Validation Utilities ---
 def validate_port_occupancy(db_session, target_id, port_number, entity_type, exclude_connection_id=None):
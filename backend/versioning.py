@@ -0,0 +1,82 @@
+# backend/versioning.py
+# This file maintains the per-table generation counters stored in 'table_versions'.
+# Every ORM write (services, imports, reverts) bumps the counter of the tables it
+# touched inside the same transaction, so all gunicorn workers see a new version
+# exactly when the write commits. Caches use these counters to detect changes.
+
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import object_session
+
+from .extensions import db
+from .models import TableVersion
+
+_CHANGED_TABLES_KEY = 'changed_tables'
+
+_BUMP_SQL = text(
+    "INSERT INTO table_versions (table_name, version) VALUES (:table_name, 1) "
+    "ON CONFLICT(table_name) DO UPDATE SET version = version + 1"
+)
+
+def bump_table_versions(connection, table_names):
+    """
+    Increments the version of each given table using the given connection,
+    so the bump commits (or rolls back) together with the write itself.
+    Bulk write paths that bypass the ORM unit of work should call this directly.
+    :param connection: A SQLAlchemy Connection taking part in the write transaction.
+    :param table_names: An iterable of table names.
+    """
+    params = [{'table_name': name} for name in sorted(set(table_names)) if name != TableVersion.__tablename__]
+    if params:
+        connection.execute(_BUMP_SQL, params)
+
+def get_table_versions(table_names):
+    """
+    Returns {table_name: version} for the given tables. Tables that were never
+    written to since versioning was introduced report version 0.
+    """
+    rows = db.session.execute(
+        select(TableVersion.table_name, TableVersion.version).where(TableVersion.table_name.in_(table_names))
+    ).all()
+    versions = {name: 0 for name in table_names}
+    versions.update({name: version for name, version in rows})
+    return versions
+
+# --- Session hooks ---
+def _record_table(mapper, connection, target):
+    """Mapper event: remembers which table a flushed row belongs to."""
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_CHANGED_TABLES_KEY, set()).add(mapper.local_table.name)
+
+def _record_updated_table(mapper, connection, target):
+    """Like _record_table, but ignores objects that were marked dirty without a net change."""
+    session = object_session(target)
+    if session is not None and session.is_modified(target, include_collections=False):
+        _record_table(mapper, connection, target)
+
+def _after_flush(session, flush_context):
+    changed = session.info.pop(_CHANGED_TABLES_KEY, None)
+    if changed:
+        bump_table_versions(session.connection(), changed)
+
+def _do_orm_execute(orm_execute_state):
+    """Catches bulk INSERT/UPDATE/DELETE statements run through session.execute()."""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, 'table', None)
+    if table is not None and getattr(table, 'name', None):
+        bump_table_versions(orm_execute_state.session.connection(), [table.name])
+
+def _after_rollback(session):
+    session.info.pop(_CHANGED_TABLES_KEY, None)
+
+def init_versioning():
+    """Registers the mapper and session events. Safe to call more than once."""
+    if event.contains(db.Model, 'after_insert', _record_table):
+        return
+    event.listen(db.Model, 'after_insert', _record_table, propagate=True)
+    event.listen(db.Model, 'after_update', _record_updated_table, propagate=True)
+    event.listen(db.Model, 'after_delete', _record_table, propagate=True)
+    event.listen(db.session, 'after_flush', _after_flush)
+    event.listen(db.session, 'do_orm_execute', _do_orm_execute)
+    event.listen(db.session, 'after_rollback', _after_rollback)
@@ -13,15 +13,32 @@ export PYTHONPATH=/app:$PYTHONPATH
 # IMPORTANT: DO NOT change directory to /app/backend here.
 # Flask and Gunicorn will be run from /app, referencing 'backend/app.py'.
 
-# Run Flask database upgrade (applies all pending migrations)
-echo "Running Flask database upgrade..."
-python3 -m flask --app backend/app.py db upgrade -d /app/backend/migrations
+# Run Flask database upgrade (applies all pending migrations).
+# The quick check only reads alembic_version, so a normal boot skips importing the app here.
+if python3 -m backend.startup; then
+    echo "Skipping Flask database upgrade."
+else
+    echo "Running Flask database upgrade..."
+    python3 -m flask --app backend/app.py db upgrade -d /app/backend/migrations
+fi
 
 # Start Nginx in the background
 echo "Starting Nginx..."
 nginx -g "daemon off;" & # Start Nginx in background, redirecting its output to /dev/null if desired
 
+# Prometheus metrics are shared between Gunicorn workers through files in this
+# directory (see backend/metrics.py). It must start empty on every boot.
+export PROMETHEUS_MULTIPROC_DIR=/tmp/prometheus_multiproc
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+# PDF template downloads are handed to Nginx with X-Accel-Redirect (see nginx.conf);
+# without this variable the backend sends the files itself.
+export PDF_ACCEL_REDIRECT_PREFIX=/_protected/pdf_templates/
+
 # Start Flask backend using Gunicorn in the foreground
 # This command will keep the container running as it is the primary process.
 echo "Starting Flask backend (Gunicorn) in foreground..."
-exec gunicorn -w 4 -b 0.0.0.0:5000 backend.app:app
\ No newline at end of file
+# Workers, threads and the worker class come from backend/gunicorn_conf.py (see the
+# GUNICORN_* variables there); the app is preloaded and its caches warmed before forking.
+exec gunicorn -c backend/gunicorn_conf.py backend.app:app
\ No newline at end of file